@@ -1,12 +1,12 @@
 """Memory Management Agent for handling long-term and working memory."""
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import timedelta
 import asyncio
 import json
 
 from core.interfaces import Agent
-from core.caching import Cache, CacheStrategy
+from core.caching import Cache, CacheStrategy, estimate_size
 from core.monitoring import MetricsCollector, MetricType, Timer
 from core.error_handling import ErrorHandler, ErrorCategory, RecoveryStrategy
 from core.logging_config import get_logger
@@ -21,7 +21,9 @@ class MemoryAgent(Agent):
         metrics_collector: MetricsCollector,
         error_handler: ErrorHandler,
         working_memory_size: int = 1000,
-        long_term_memory_size: int = 10000
+        long_term_memory_size: int = 10000,
+        working_memory_bytes: Optional[int] = None,
+        long_term_memory_bytes: Optional[int] = None
     ):
         self.metrics = metrics_collector
         self.error_handler = error_handler
@@ -30,15 +32,35 @@ class MemoryAgent(Agent):
         self.working_memory = Cache[Dict[str, Any]](
             max_size=working_memory_size,
             strategy=CacheStrategy.LRU,
-            default_ttl=timedelta(hours=1)
+            default_ttl=timedelta(hours=1),
+            max_bytes=working_memory_bytes
         )
         
         self.long_term_memory = Cache[Dict[str, Any]](
             max_size=long_term_memory_size,
             strategy=CacheStrategy.LFU,
-            default_ttl=timedelta(days=30)
+            default_ttl=timedelta(days=30),
+            max_bytes=long_term_memory_bytes
         )
         
+        # Pre-registered timers for the store/retrieve hot paths
+        self._store_timers = {
+            long_term: metrics_collector.timer(
+                "memory_store",
+                "memory_agent",
+                {"type": "long_term" if long_term else "working"}
+            )
+            for long_term in (False, True)
+        }
+        self._retrieve_timers = {
+            long_term: metrics_collector.timer(
+                "memory_retrieve",
+                "memory_agent",
+                {"type": "long_term" if long_term else "working"}
+            )
+            for long_term in (False, True)
+        }
+        
         # Set up error handling
         self.error_handler.set_recovery_strategy(
             ErrorCategory.RESOURCE,
@@ -64,22 +86,18 @@ class MemoryAgent(Agent):
         key: str,
         data: Dict[str, Any],
         long_term: bool = False,
-        ttl: Optional[timedelta] = None
+        ttl: Optional[timedelta] = None,
+        tags: Optional[List[str]] = None
     ) -> None:
-        """Store data in memory."""
+        """Store data in memory, optionally tagged for bulk invalidation."""
         try:
-            async with Timer(
-                "memory_store",
-                "memory_agent",
-                self.metrics,
-                {"type": "long_term" if long_term else "working"}
-            ):
+            with self._store_timers[long_term].time():
                 cache = self.long_term_memory if long_term else self.working_memory
-                await cache.set(key, data, ttl)
+                await cache.set(key, data, ttl, tags=tags or ())
                 
                 self.metrics.record(
                     name="memory_store_size_bytes",
-                    value=len(json.dumps(data)),
+                    value=estimate_size(data),
                     metric_type=MetricType.HISTOGRAM,
                     component="memory_agent",
                     labels={"memory_type": "long_term" if long_term else "working"}
@@ -103,12 +121,7 @@ class MemoryAgent(Agent):
     ) -> Optional[Dict[str, Any]]:
         """Retrieve data from memory."""
         try:
-            async with Timer(
-                "memory_retrieve",
-                "memory_agent",
-                self.metrics,
-                {"type": "long_term" if long_term else "working"}
-            ):
+            with self._retrieve_timers[long_term].time():
                 cache = self.long_term_memory if long_term else self.working_memory
                 data = await cache.get(key)
                 
@@ -151,25 +164,27 @@ class MemoryAgent(Agent):
                 "memory_agent",
                 self.metrics
             ):
-                # Get frequently accessed working memories
-                working_entries = self.working_memory._cache
-                
-                for key, entry in working_entries.items():
-                    # If memory has been accessed frequently, store in long-term
+                # Frequently accessed working memories move to long-term,
+                # grouped by tags so invalidate_memories still reaches them
+                frequent: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+                for key, entry in self.working_memory._cache.items():
                     if entry.hits >= 5:
-                        await self.store_memory(
-                            key,
-                            entry.value,
-                            long_term=True,
-                            ttl=timedelta(days=30)
-                        )
-                        
-                        self.metrics.record(
-                            name="memory_consolidations",
-                            value=1,
-                            metric_type=MetricType.COUNTER,
-                            component="memory_agent"
-                        )
+                        frequent.setdefault(entry.tags, {})[key] = entry.value
+                
+                for tags, entries in frequent.items():
+                    await self.long_term_memory.set_many(
+                        entries,
+                        ttl=timedelta(days=30),
+                        tags=tags
+                    )
+                
+                if frequent:
+                    self.metrics.record(
+                        name="memory_consolidations",
+                        value=sum(len(entries) for entries in frequent.values()),
+                        metric_type=MetricType.COUNTER,
+                        component="memory_agent"
+                    )
                 
         except Exception as e:
             await self.error_handler.handle_error(
@@ -225,6 +240,34 @@ class MemoryAgent(Agent):
             )
             return []
     
+    async def invalidate_memories(self, tag: str) -> int:
+        """Drop working and long-term memories carrying a tag."""
+        try:
+            removed = (
+                await self.working_memory.invalidate_tag(tag)
+                + await self.long_term_memory.invalidate_tag(tag)
+            )
+            
+            self.metrics.record(
+                name="memory_invalidations",
+                value=removed,
+                metric_type=MetricType.COUNTER,
+                component="memory_agent"
+            )
+            
+            return removed
+            
+        except Exception as e:
+            await self.error_handler.handle_error(
+                e,
+                {
+                    "component": "memory_agent",
+                    "operation": "invalidate",
+                    "tag": tag
+                }
+            )
+            return 0
+    
     async def cleanup_memories(self) -> None:
         """Clean up old or unused memories."""
         try:
@@ -256,15 +299,21 @@ class MemoryAgent(Agent):
     async def get_memory_stats(self) -> Dict[str, Any]:
         """Get memory usage statistics."""
         try:
-            working_size = len(self.working_memory._cache)
-            long_term_size = len(self.long_term_memory._cache)
+            working = self.working_memory.get_stats()
+            long_term = self.long_term_memory.get_stats()
             
             stats = {
-                "working_memory_size": working_size,
-                "long_term_memory_size": long_term_size,
-                "working_memory_utilization": working_size / self.working_memory.max_size,
-                "long_term_memory_utilization": long_term_size / self.long_term_memory.max_size
+                "working_memory_size": working["entries"],
+                "long_term_memory_size": long_term["entries"],
+                "working_memory_bytes": working["bytes"],
+                "long_term_memory_bytes": long_term["bytes"],
+                "working_memory_utilization": working["utilization"],
+                "long_term_memory_utilization": long_term["utilization"]
             }
+            if working["bytes_utilization"] is not None:
+                stats["working_memory_bytes_utilization"] = working["bytes_utilization"]
+            if long_term["bytes_utilization"] is not None:
+                stats["long_term_memory_bytes_utilization"] = long_term["bytes_utilization"]
             
             # Record metrics
             for name, value in stats.items():
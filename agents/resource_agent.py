@@ -2,11 +2,11 @@
 
 from typing import Dict, Any, Optional, List
 import asyncio
-import psutil
 from datetime import datetime, timedelta
 
 from core.interfaces import Agent
 from core.monitoring import MetricsCollector, MetricType, Timer
+from core.system_sampler import SystemSampler, system_sampler
 from core.error_handling import ErrorHandler, ErrorCategory, RecoveryStrategy
 from core.logging_config import get_logger
 
@@ -28,11 +28,13 @@ class ResourceAgent(Agent):
         self,
         metrics_collector: MetricsCollector,
         error_handler: ErrorHandler,
-        check_interval: float = 5.0
+        check_interval: float = 5.0,
+        sampler: Optional[SystemSampler] = None
     ):
         self.metrics = metrics_collector
         self.error_handler = error_handler
         self.check_interval = check_interval
+        self.sampler = sampler or system_sampler
         self._monitoring_task: Optional[asyncio.Task] = None
         self._running = False
         
@@ -50,11 +52,15 @@ class ResourceAgent(Agent):
             return
         
         self._running = True
+        self.sampler.acquire()
         self._monitoring_task = asyncio.create_task(self._monitor_resources())
         self.logger.info("Resource monitoring started")
     
     async def stop(self) -> None:
         """Stop resource monitoring."""
+        if not self._running:
+            return
+        
         self._running = False
         if self._monitoring_task:
             self._monitoring_task.cancel()
@@ -62,6 +68,7 @@ class ResourceAgent(Agent):
                 await self._monitoring_task
             except asyncio.CancelledError:
                 pass
+        self.sampler.release()
         self.logger.info("Resource monitoring stopped")
     
     async def _monitor_resources(self) -> None:
@@ -91,44 +98,43 @@ class ResourceAgent(Agent):
     async def _check_resources(self) -> None:
         """Check current resource usage."""
         try:
+            # Latest snapshot from the background sampler; never blocks
+            snapshot = self.sampler.snapshot
+            
             # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
             self.metrics.record(
                 name="system_cpu_percent",
-                value=cpu_percent,
+                value=snapshot.cpu_percent,
                 metric_type=MetricType.GAUGE,
                 component="resource_agent"
             )
             
             # Memory usage
-            memory = psutil.virtual_memory()
             self.metrics.record(
                 name="system_memory_percent",
-                value=memory.percent,
+                value=snapshot.memory_percent,
                 metric_type=MetricType.GAUGE,
                 component="resource_agent"
             )
             
             # Disk usage
-            disk = psutil.disk_usage('/')
             self.metrics.record(
                 name="system_disk_percent",
-                value=disk.percent,
+                value=snapshot.disk_usage_percent,
                 metric_type=MetricType.GAUGE,
                 component="resource_agent"
             )
             
             # Process information
-            process = psutil.Process()
             self.metrics.record(
                 name="system_open_files",
-                value=len(process.open_files()),
+                value=snapshot.open_files,
                 metric_type=MetricType.GAUGE,
                 component="resource_agent"
             )
             self.metrics.record(
                 name="system_threads",
-                value=process.num_threads(),
+                value=snapshot.thread_count,
                 metric_type=MetricType.GAUGE,
                 component="resource_agent"
             )
@@ -145,9 +151,10 @@ class ResourceAgent(Agent):
     async def _handle_resource_issues(self) -> None:
         """Handle resource usage issues."""
         try:
-            cpu_percent = psutil.cpu_percent()
-            memory_percent = psutil.virtual_memory().percent
-            disk_percent = psutil.disk_usage('/').percent
+            snapshot = self.sampler.snapshot
+            cpu_percent = snapshot.cpu_percent
+            memory_percent = snapshot.memory_percent
+            disk_percent = snapshot.disk_usage_percent
             
             # Check CPU usage
             if cpu_percent >= ResourceThresholds.CPU_CRITICAL:
@@ -251,35 +258,34 @@ class ResourceAgent(Agent):
     async def get_resource_report(self) -> Dict[str, Any]:
         """Get a comprehensive resource usage report."""
         try:
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            process = psutil.Process()
+            snapshot = self.sampler.snapshot
             
             report = {
                 "timestamp": datetime.now().isoformat(),
                 "cpu": {
-                    "percent": cpu_percent,
-                    "count": psutil.cpu_count(),
-                    "status": self._get_resource_status(cpu_percent)
+                    "percent": snapshot.cpu_percent,
+                    "count": snapshot.cpu_count,
+                    "status": self._get_resource_status(snapshot.cpu_percent)
                 },
                 "memory": {
-                    "percent": memory.percent,
-                    "available": memory.available,
-                    "total": memory.total,
-                    "status": self._get_resource_status(memory.percent)
+                    "percent": snapshot.memory_percent,
+                    "available": snapshot.memory_available,
+                    "total": snapshot.memory_total,
+                    "status": self._get_resource_status(snapshot.memory_percent)
                 },
                 "disk": {
-                    "percent": disk.percent,
-                    "free": disk.free,
-                    "total": disk.total,
-                    "status": self._get_resource_status(disk.percent)
+                    "percent": snapshot.disk_usage_percent,
+                    "free": snapshot.disk_free,
+                    "total": snapshot.disk_total,
+                    "status": self._get_resource_status(snapshot.disk_usage_percent)
                 },
                 "process": {
-                    "open_files": len(process.open_files()),
-                    "threads": process.num_threads(),
-                    "memory_percent": process.memory_percent()
-                }
+                    "open_files": snapshot.open_files,
+                    "threads": snapshot.thread_count,
+                    "memory_percent": snapshot.process_memory_percent
+                },
+                "containerized": snapshot.containerized,
+                "sampled_at": snapshot.timestamp.isoformat()
             }
             
             return report
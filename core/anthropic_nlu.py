@@ -1,14 +1,20 @@
 import json
 import anthropic
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .interfaces import Intent, NLUInterface
+from .intent_cache import IntentCache
 from .logging_config import get_logger
 
 class AnthropicNLU(NLUInterface):
-    """NLU implementation using Anthropic's Claude."""
+    """NLU implementation using Anthropic's Claude.
     
-    def __init__(self, api_key: str):
+    With an ``IntentCache``, repeated and near-duplicate queries are
+    answered from the cache instead of a new Claude request.
+    """
+    
+    def __init__(self, api_key: str, intent_cache: Optional[IntentCache] = None):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.intent_cache = intent_cache
         self.logger = get_logger(self.__class__.__name__)
     
     async def parse(self, query: str) -> Intent:
@@ -16,6 +22,12 @@ class AnthropicNLU(NLUInterface):
         try:
             self.logger.info(f"Parsing query: {query}")
             
+            if self.intent_cache is not None:
+                cached = await self.intent_cache.get(query)
+                if cached is not None:
+                    self.logger.debug(f"Intent cache hit: {cached}")
+                    return cached
+            
             # Create system prompt for intent parsing
             system_prompt = """
             Parse the user query into a structured intent. Return a JSON object with:
@@ -37,7 +49,10 @@ class AnthropicNLU(NLUInterface):
             intent_dict = json.loads(response_content)
             
             self.logger.debug(f"Parsed intent: {intent_dict}")
-            return Intent(**intent_dict)
+            intent = Intent(**intent_dict)
+            if self.intent_cache is not None:
+                await self.intent_cache.put(query, intent)
+            return intent
             
         except Exception as e:
             self.logger.error(f"Error parsing query: {str(e)}")
@@ -1,14 +1,26 @@
 """Caching system for Arcana Agent Framework."""
 
-from typing import Dict, Any, Optional, Callable, TypeVar, Generic
+from typing import Dict, Any, Optional, Callable, TypeVar, Generic, List, Tuple, Iterable
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import asyncio
-import json
+import functools
+import heapq
+import itertools
 import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import time
+import weakref
 from dataclasses import dataclass
 from enum import Enum
 
 from .logging_config import get_logger
+from .monitoring import MetricsCollector, MetricType
 
 logger = get_logger(__name__)
 
@@ -28,8 +40,10 @@ class CacheEntry(Generic[T]):
     created_at: datetime
     expires_at: Optional[datetime]
     hits: int = 0
-    last_accessed: Optional[datetime] = None
+    last_accessed: Optional[float] = None  # time.monotonic() of last hit
     size_bytes: int = 0
+    deadline: Optional[float] = None  # time.monotonic() expiry
+    tags: Tuple[str, ...] = ()
 
 class CacheStrategy(Enum):
     """Cache eviction strategies."""
@@ -38,6 +52,663 @@ class CacheStrategy(Enum):
     FIFO = "fifo"  # First In First Out
     TTL = "ttl"    # Time To Live
 
+def estimate_size(value: Any) -> int:
+    """Estimate the size of a value in bytes without serializing it.
+    
+    Walks containers once and approximates their JSON footprint; strings
+    and bytes count their length, scalars a fixed width.
+    """
+    size = 0
+    stack = [value]
+    seen = set()
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (str, bytes, bytearray)):
+            size += len(item)
+        elif item is None or isinstance(item, bool):
+            size += 4
+        elif isinstance(item, (int, float)):
+            size += 8
+        elif isinstance(item, (dict, list, tuple, set, frozenset)):
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            if isinstance(item, dict):
+                # Braces plus quotes, colon and comma per pair
+                size += 2 + 4 * len(item)
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            else:
+                size += 2 + len(item)
+                stack.extend(item)
+        else:
+            size += sys.getsizeof(item)
+    return size
+
+_MISSING = object()  # Sentinel for in-memory misses
+
+def make_key(*args, **kwargs) -> str:
+    """Build a cache key from call arguments.
+    
+    Short argument lists are used verbatim as the key; long ones are
+    hashed with BLAKE2b to keep keys bounded. Positional and keyword
+    arguments are labelled so one can never be mistaken for the other.
+    """
+    key_string = repr(("args", args, "kwargs", tuple(sorted(kwargs.items()))))
+    if len(key_string) <= 128:
+        return key_string
+    return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+
+class EvictionPolicy:
+    """Tracks cache keys and picks eviction victims in O(1) (amortized)."""
+    
+    def on_insert(self, key: str, entry: CacheEntry) -> None:
+        """Register a newly inserted entry."""
+        raise NotImplementedError
+    
+    def on_access(self, key: str, entry: CacheEntry) -> None:
+        """Record a cache hit for an entry."""
+    
+    def on_remove(self, key: str) -> None:
+        """Forget an entry that left the cache."""
+        raise NotImplementedError
+    
+    def victim(self) -> Optional[str]:
+        """Return the key that should be evicted next."""
+        raise NotImplementedError
+    
+    def clear(self) -> None:
+        """Forget all tracked entries."""
+        raise NotImplementedError
+
+class FIFOEviction(EvictionPolicy):
+    """Evicts entries in insertion order."""
+    
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+    
+    def on_insert(self, key: str, entry: CacheEntry) -> None:
+        self._order[key] = None
+    
+    def on_remove(self, key: str) -> None:
+        self._order.pop(key, None)
+    
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+    
+    def clear(self) -> None:
+        self._order.clear()
+
+class LRUEviction(FIFOEviction):
+    """Evicts the least recently used entry."""
+    
+    def on_access(self, key: str, entry: CacheEntry) -> None:
+        self._order.move_to_end(key)
+
+class LFUEviction(EvictionPolicy):
+    """Evicts the least frequently used entry using frequency buckets.
+    
+    Ties within a frequency are broken by insertion order.
+    """
+    
+    def __init__(self):
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+    
+    def _bucket(self, freq: int) -> "OrderedDict[str, None]":
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = self._buckets[freq] = OrderedDict()
+        return bucket
+    
+    def _unlink(self, key: str, freq: int) -> None:
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+    
+    def on_insert(self, key: str, entry: CacheEntry) -> None:
+        self._freq[key] = entry.hits
+        self._bucket(entry.hits)[key] = None
+        if len(self._freq) == 1 or entry.hits < self._min_freq:
+            self._min_freq = entry.hits
+    
+    def on_access(self, key: str, entry: CacheEntry) -> None:
+        old = self._freq.get(key)
+        if old is None:
+            return
+        self._unlink(key, old)
+        self._freq[key] = entry.hits
+        self._bucket(entry.hits)[key] = None
+        if entry.hits < self._min_freq:
+            self._min_freq = entry.hits
+    
+    def on_remove(self, key: str) -> None:
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+    
+    def victim(self) -> Optional[str]:
+        if not self._freq:
+            return None
+        bucket = self._buckets.get(self._min_freq)
+        if bucket is None:
+            # The minimum bucket was emptied by a removal; rescan the
+            # (small) set of distinct frequencies once.
+            self._min_freq = min(self._buckets)
+            bucket = self._buckets[self._min_freq]
+        return next(iter(bucket))
+    
+    def clear(self) -> None:
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+class TTLEviction(EvictionPolicy):
+    """Evicts the entry closest to expiration using a lazily pruned heap."""
+    
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._live: Dict[str, int] = {}
+        self._counter = itertools.count()
+    
+    def on_insert(self, key: str, entry: CacheEntry) -> None:
+        seq = next(self._counter)
+        self._live[key] = seq
+        deadline = entry.deadline if entry.deadline is not None else float("inf")
+        heapq.heappush(self._heap, (deadline, seq, key))
+    
+    def on_remove(self, key: str) -> None:
+        self._live.pop(key, None)
+        # Rebuild once stale heap items dominate so memory stays bounded
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [
+                item for item in self._heap
+                if self._live.get(item[2]) == item[1]
+            ]
+            heapq.heapify(self._heap)
+    
+    def victim(self) -> Optional[str]:
+        while self._heap:
+            _, seq, key = self._heap[0]
+            if self._live.get(key) == seq:
+                return key
+            heapq.heappop(self._heap)
+        return None
+    
+    def clear(self) -> None:
+        self._heap.clear()
+        self._live.clear()
+
+_EVICTION_POLICIES = {
+    CacheStrategy.LRU: LRUEviction,
+    CacheStrategy.LFU: LFUEviction,
+    CacheStrategy.FIFO: FIFOEviction,
+    CacheStrategy.TTL: TTLEviction,
+}
+
+class TimerWheel:
+    """Buckets keys by expiry time so sweeps only touch due entries.
+    
+    Deadlines are grouped into ``resolution``-second slots and a heap of
+    occupied slots is kept, so an idle gap of any length costs nothing.
+    """
+    
+    def __init__(self, resolution: float = 1.0):
+        self.resolution = resolution
+        self._slots: Dict[int, set] = {}
+        self._ticks: List[int] = []
+    
+    def _tick(self, deadline: float) -> int:
+        return int(deadline // self.resolution)
+    
+    def add(self, key: str, deadline: float) -> None:
+        """Schedule a key to expire at a monotonic deadline."""
+        tick = self._tick(deadline)
+        slot = self._slots.get(tick)
+        if slot is None:
+            slot = self._slots[tick] = set()
+            heapq.heappush(self._ticks, tick)
+        slot.add(key)
+    
+    def remove(self, key: str, deadline: float) -> None:
+        """Unschedule a key."""
+        slot = self._slots.get(self._tick(deadline))
+        if slot is not None:
+            slot.discard(key)
+    
+    def due(self, now: float) -> List[str]:
+        """Pop keys in elapsed slots and list keys in the current slot.
+        
+        Keys from elapsed slots are all expired; keys from the current
+        slot are candidates the caller must check against ``now``.
+        """
+        current = self._tick(now)
+        keys: List[str] = []
+        while self._ticks and self._ticks[0] < current:
+            keys.extend(self._slots.pop(heapq.heappop(self._ticks), ()))
+        keys.extend(self._slots.get(current, ()))
+        return keys
+    
+    def clear(self) -> None:
+        """Unschedule all keys."""
+        self._slots.clear()
+        self._ticks.clear()
+
+class CacheMaintenance:
+    """Drives expiry for every started cache from one shared task."""
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._caches: "weakref.WeakSet[Cache]" = weakref.WeakSet()
+        self._task: Optional[asyncio.Task] = None
+        self.logger = get_logger(self.__class__.__name__)
+    
+    def register(self, cache: 'Cache') -> None:
+        """Include a cache in maintenance sweeps."""
+        self._caches.add(cache)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+            self.logger.info("Cache maintenance task started")
+    
+    async def unregister(self, cache: 'Cache') -> None:
+        """Remove a cache, stopping the task once none are left."""
+        self._caches.discard(cache)
+        if self._caches or self._task is None:
+            return
+        task, self._task = self._task, None
+        if task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.logger.info("Cache maintenance task stopped")
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            for cache in list(self._caches):
+                try:
+                    await cache._cleanup_expired()
+                except Exception as e:
+                    self.logger.error(f"Error in cache cleanup: {str(e)}")
+
+_maintenance = CacheMaintenance()
+
+class CacheBackend:
+    """Storage tier behind a Cache's in-memory entries.
+    
+    The in-memory entries act as an L1 in front of the backend: reads
+    fall through to the backend on a miss and writes go to both. Backends
+    shared between processes set ``near_cache_ttl`` to bound how long the
+    L1 copy may be served before it is re-read.
+    """
+    policy = CachePolicy.MEMORY
+    near_cache_ttl: Optional[timedelta] = None
+    
+    async def get(self, key: str) -> Optional[Tuple[Any, Optional[datetime]]]:
+        """Get a stored value and its expiration time."""
+        raise NotImplementedError
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Store a value."""
+        raise NotImplementedError
+    
+    async def delete(self, key: str) -> None:
+        """Delete a stored value."""
+        raise NotImplementedError
+    
+    async def get_many(
+        self,
+        keys: List[str]
+    ) -> Dict[str, Tuple[Any, Optional[datetime]]]:
+        """Get several stored values, omitting missing keys."""
+        results = {}
+        for key in keys:
+            stored = await self.get(key)
+            if stored is not None:
+                results[key] = stored
+        return results
+    
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Store several values with a shared expiration time and tags."""
+        for key, value in items.items():
+            await self.set(key, value, expires_at, tags)
+    
+    async def delete_many(self, keys: List[str]) -> None:
+        """Delete several stored values."""
+        for key in keys:
+            await self.delete(key)
+    
+    async def delete_tag(self, tag: str) -> List[str]:
+        """Delete values carrying a tag, returning their keys."""
+        raise NotImplementedError
+    
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        """Delete values whose key starts with a prefix, returning their keys."""
+        raise NotImplementedError
+    
+    async def clear(self) -> None:
+        """Delete all stored values."""
+        raise NotImplementedError
+    
+    async def purge_expired(self) -> int:
+        """Delete expired values, returning how many were removed."""
+        return 0
+    
+    async def close(self) -> None:
+        """Release backend resources."""
+
+class SQLiteCacheBackend(CacheBackend):
+    """Persistent cache tier stored in an SQLite database in WAL mode.
+    
+    All database work runs on a single dedicated thread so the event loop
+    never blocks on disk I/O. When ``max_entries`` is set, the least
+    recently written entries are evicted once the store is full.
+    """
+    policy = CachePolicy.PERSISTENT
+    
+    def __init__(self, path: str, max_entries: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._count = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.logger = get_logger(self.__class__.__name__)
+    
+    async def get(self, key: str) -> Optional[Tuple[Any, Optional[datetime]]]:
+        """Get a stored value and its expiration time."""
+        return await self._run(self._get_sync, key)
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Store a value."""
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = expires_at.timestamp() if expires_at else None
+        await self._run(self._set_sync, key, blob, expires, tags)
+    
+    async def delete(self, key: str) -> None:
+        """Delete a stored value."""
+        await self._run(self._delete_sync, key)
+    
+    async def get_many(
+        self,
+        keys: List[str]
+    ) -> Dict[str, Tuple[Any, Optional[datetime]]]:
+        """Get several stored values in one thread hop."""
+        return await self._run(self._get_many_sync, keys)
+    
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Store several values in one transaction."""
+        expires = expires_at.timestamp() if expires_at else None
+        rows = [
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            for key, value in items.items()
+        ]
+        await self._run(self._set_many_sync, rows, expires, tags)
+    
+    async def delete_many(self, keys: List[str]) -> None:
+        """Delete several stored values in one transaction."""
+        await self._run(self._delete_many_sync, keys)
+    
+    async def delete_tag(self, tag: str) -> List[str]:
+        """Delete values carrying a tag, returning their keys."""
+        return await self._run(self._delete_tag_sync, tag)
+    
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        """Delete values whose key starts with a prefix, returning their keys."""
+        return await self._run(self._delete_prefix_sync, prefix)
+    
+    async def clear(self) -> None:
+        """Delete all stored values."""
+        await self._run(self._clear_sync)
+    
+    async def purge_expired(self) -> int:
+        """Delete expired values, returning how many were removed."""
+        return await self._run(self._purge_expired_sync)
+    
+    async def count(self) -> int:
+        """Get the number of stored entries."""
+        return await self._run(self._count_sync)
+    
+    async def close(self) -> None:
+        """Close the database; it is reopened on next use."""
+        if self._executor is None:
+            return
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+    
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        """Run a database operation on the backend thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="sqlite-cache"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_expires "
+                "ON cache_entries(expires_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_updated "
+                "ON cache_entries(updated_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_tags ("
+                "tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags(key)"
+            )
+            self._count = conn.execute(
+                "SELECT COUNT(*) FROM cache_entries"
+            ).fetchone()[0]
+            self._conn = conn
+            self.logger.info(f"Opened persistent cache {self.path} ({self._count} entries)")
+        return self._conn
+    
+    def _get_sync(self, key: str) -> Optional[Tuple[Any, Optional[datetime]]]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        blob, expires = row
+        if expires is not None and expires <= time.time():
+            self._delete_sync(key)
+            return None
+        
+        expires_at = datetime.fromtimestamp(expires) if expires is not None else None
+        return pickle.loads(blob), expires_at
+    
+    def _set_sync(
+        self,
+        key: str,
+        blob: bytes,
+        expires: Optional[float],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        conn = self._connection()
+        exists = conn.execute(
+            "SELECT 1 FROM cache_entries WHERE key = ?",
+            (key,)
+        ).fetchone() is not None
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+            (key, blob, expires, time.time())
+        )
+        if exists:
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+        if tags:
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tags VALUES (?, ?)",
+                [(tag, key) for tag in tags]
+            )
+        if not exists:
+            self._count += 1
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict_sync()
+    
+    def _get_many_sync(self, keys: List[str]) -> Dict[str, Tuple[Any, Optional[datetime]]]:
+        results = {}
+        for key in keys:
+            stored = self._get_sync(key)
+            if stored is not None:
+                results[key] = stored
+        return results
+    
+    @contextmanager
+    def _transaction(self):
+        """Group statements into one transaction unless already inside one."""
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _set_many_sync(
+        self,
+        rows: List[Tuple[str, bytes]],
+        expires: Optional[float],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        with self._transaction():
+            for key, blob in rows:
+                self._set_sync(key, blob, expires, tags)
+    
+    def _delete_many_sync(self, keys: List[str]) -> None:
+        with self._transaction():
+            for key in keys:
+                self._delete_sync(key)
+    
+    def _delete_sync(self, key: str) -> None:
+        conn = self._connection()
+        cursor = conn.execute(
+            "DELETE FROM cache_entries WHERE key = ?",
+            (key,)
+        )
+        self._count -= cursor.rowcount
+        conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+    
+    def _delete_keys_where(self, condition: str, params: Tuple[Any, ...]) -> List[str]:
+        """Delete entries matching a condition along with their tags."""
+        with self._transaction() as conn:
+            keys = [
+                row[0] for row in conn.execute(
+                    f"SELECT key FROM cache_entries WHERE {condition}",
+                    params
+                )
+            ]
+            for key in keys:
+                self._delete_sync(key)
+        return keys
+    
+    def _delete_tag_sync(self, tag: str) -> List[str]:
+        keys = self._delete_keys_where(
+            "key IN (SELECT key FROM cache_tags WHERE tag = ?)",
+            (tag,)
+        )
+        self._connection().execute("DELETE FROM cache_tags WHERE tag = ?", (tag,))
+        return keys
+    
+    def _delete_prefix_sync(self, prefix: str) -> List[str]:
+        if not prefix:
+            return self._delete_keys_where("1", ())
+        # Range scan on the primary key instead of LIKE, which would need
+        # escaping and cannot use the index for case-sensitive matches
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self._delete_keys_where("key >= ? AND key < ?", (prefix, upper))
+    
+    def _clear_sync(self) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_tags")
+        self._count = 0
+    
+    def _purge_expired_sync(self) -> int:
+        return len(self._delete_keys_where(
+            "expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),)
+        ))
+    
+    def _evict_sync(self) -> None:
+        """Bring the store back under max_entries."""
+        if self._purge_expired_sync() and self._count <= self.max_entries:
+            return
+        self._delete_keys_where(
+            "key IN (SELECT key FROM cache_entries ORDER BY updated_at LIMIT ?)",
+            (self._count - self.max_entries,)
+        )
+    
+    def _count_sync(self) -> int:
+        self._connection()
+        return self._count
+    
+    def _close_sync(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
 class Cache(Generic[T]):
     """Generic cache implementation with multiple strategies."""
     
@@ -45,191 +716,496 @@ class Cache(Generic[T]):
         self,
         max_size: int = 1000,
         strategy: CacheStrategy = CacheStrategy.LRU,
-        default_ttl: Optional[timedelta] = timedelta(hours=1)
+        default_ttl: Optional[timedelta] = timedelta(hours=1),
+        max_bytes: Optional[int] = None,
+        backend: Optional[CacheBackend] = None,
+        prefix_separator: Optional[str] = None
     ):
         self.max_size = max_size
         self.strategy = strategy
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.prefix_separator = prefix_separator
+        self.policy = backend.policy if backend else CachePolicy.MEMORY
         self._cache: Dict[str, CacheEntry[T]] = {}
-        self._cleanup_task: Optional[asyncio.Task] = None
+        self._total_bytes = 0
+        self._eviction: EvictionPolicy = _EVICTION_POLICIES[strategy]()
+        self._expiry = TimerWheel()
+        self._tags: Dict[str, set] = {}
+        self._prefixes: Dict[str, set] = {}
+        self._next_backend_purge = 0.0
+        self.backend_purge_interval = 60.0
+        self._started = False
         self.logger = get_logger(self.__class__.__name__)
     
     async def start(self) -> None:
-        """Start cache maintenance tasks."""
-        if not self._cleanup_task:
-            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
-            self.logger.info("Cache maintenance tasks started")
+        """Start cache maintenance."""
+        if not self._started:
+            _maintenance.register(self)
+            self._started = True
+            self.logger.debug("Cache registered for maintenance")
     
     async def stop(self) -> None:
-        """Stop cache maintenance tasks."""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-            self._cleanup_task = None
-            self.logger.info("Cache maintenance tasks stopped")
+        """Stop cache maintenance."""
+        if self._started:
+            await _maintenance.unregister(self)
+            self._started = False
+            self.logger.debug("Cache unregistered from maintenance")
+        if self.backend:
+            await self.backend.close()
     
     def _generate_key(self, *args, **kwargs) -> str:
         """Generate a cache key from arguments."""
-        key_parts = [str(arg) for arg in args]
-        key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-        key_string = "|".join(key_parts)
-        return hashlib.sha256(key_string.encode()).hexdigest()
+        return make_key(*args, **kwargs)
     
     async def get(self, key: str) -> Optional[T]:
         """Get a value from the cache."""
         try:
-            entry = self._cache.get(key)
-            if not entry:
-                return None
-            
-            # Check expiration
-            if entry.expires_at and entry.expires_at <= datetime.now():
-                del self._cache[key]
+            value = self._get_local(key)
+            if value is _MISSING:
+                if self.backend:
+                    return await self._load(key)
                 return None
+            return value
             
-            # Update metadata
-            entry.hits += 1
-            entry.last_accessed = datetime.now()
+        except Exception as e:
+            self.logger.error(f"Error retrieving from cache: {str(e)}")
+            return None
+    
+    async def get_many(self, keys: List[str]) -> Dict[str, T]:
+        """Get several values, omitting keys that are not cached.
+        
+        Keys missing from memory are fetched from the backend in one call.
+        """
+        try:
+            found: Dict[str, T] = {}
+            missing = []
+            for key in keys:
+                value = self._get_local(key)
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    found[key] = value
             
-            self.logger.debug(f"Cache hit for key: {key}")
-            return entry.value
+            if missing and self.backend:
+                stored = await self.backend.get_many(missing)
+                for key, (value, expires_at) in stored.items():
+                    if self._store_loaded(key, value, expires_at):
+                        found[key] = value
+            return found
             
         except Exception as e:
             self.logger.error(f"Error retrieving from cache: {str(e)}")
-            return None
+            return {}
+    
+    def get_nowait(self, key: str) -> Optional[T]:
+        """Get a value from the in-memory tier without awaiting."""
+        value = self._get_local(key)
+        return None if value is _MISSING else value
     
     async def set(
         self,
         key: str,
         value: T,
-        ttl: Optional[timedelta] = None
+        ttl: Optional[timedelta] = None,
+        tags: Iterable[str] = ()
     ) -> None:
-        """Set a value in the cache."""
+        """Set a value in the cache, optionally tagging it for bulk invalidation."""
         try:
-            # Check cache size before adding
-            if len(self._cache) >= self.max_size:
-                await self._evict()
-            
             # Calculate expiration time
-            expires_at = None
-            if ttl or self.default_ttl:
-                expires_at = datetime.now() + (ttl or self.default_ttl)
-            
-            # Create cache entry
-            entry = CacheEntry(
-                key=key,
-                value=value,
-                created_at=datetime.now(),
-                expires_at=expires_at,
-                size_bytes=self._estimate_size(value)
-            )
+            ttl = ttl or self.default_ttl
+            ttl_seconds = ttl.total_seconds() if ttl else None
+            tags = tuple(tags)
             
-            self._cache[key] = entry
-            self.logger.debug(f"Cached value for key: {key}")
+            self._store(key, value, self._near_ttl(ttl_seconds), tags)
+            if self.backend:
+                expires_at = datetime.now() + ttl if ttl else None
+                await self.backend.set(key, value, expires_at, tags)
             
         except Exception as e:
             self.logger.error(f"Error setting cache value: {str(e)}")
     
+    async def set_many(
+        self,
+        items: Dict[str, T],
+        ttl: Optional[timedelta] = None,
+        tags: Iterable[str] = ()
+    ) -> None:
+        """Set several values with a shared TTL and tags."""
+        try:
+            ttl = ttl or self.default_ttl
+            ttl_seconds = self._near_ttl(ttl.total_seconds() if ttl else None)
+            tags = tuple(tags)
+            for key, value in items.items():
+                self._store(key, value, ttl_seconds, tags)
+            
+            if self.backend:
+                expires_at = datetime.now() + ttl if ttl else None
+                await self.backend.set_many(items, expires_at, tags)
+            
+        except Exception as e:
+            self.logger.error(f"Error setting cache values: {str(e)}")
+    
+    def set_nowait(
+        self,
+        key: str,
+        value: T,
+        ttl: Optional[timedelta] = None,
+        tags: Iterable[str] = ()
+    ) -> None:
+        """Set a value without awaiting; only valid without a backend."""
+        if self.backend:
+            raise RuntimeError(
+                f"set_nowait cannot write through to the {self.policy.value} backend"
+            )
+        ttl = ttl or self.default_ttl
+        self._store(key, value, ttl.total_seconds() if ttl else None, tuple(tags))
+    
     async def invalidate(self, key: str) -> None:
         """Invalidate a cache entry."""
         try:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 self.logger.debug(f"Invalidated cache key: {key}")
+            if self.backend:
+                await self.backend.delete(key)
         except Exception as e:
             self.logger.error(f"Error invalidating cache: {str(e)}")
     
+    async def invalidate_many(self, keys: List[str]) -> None:
+        """Invalidate several cache entries."""
+        try:
+            for key in keys:
+                if key in self._cache:
+                    self._remove(key)
+            if self.backend:
+                await self.backend.delete_many(keys)
+        except Exception as e:
+            self.logger.error(f"Error invalidating cache: {str(e)}")
+    
+    async def invalidate_tag(self, tag: str) -> int:
+        """Invalidate every entry carrying a tag.
+        
+        Uses the tag index, so the cost is proportional to the number of
+        entries removed. Returns how many in-memory entries were dropped.
+        """
+        try:
+            keys = list(self._tags.get(tag, ()))
+            if self.backend:
+                keys.extend(
+                    key for key in await self.backend.delete_tag(tag)
+                    if key in self._cache
+                )
+            removed = self._remove_keys(keys)
+            self.logger.debug(f"Invalidated {removed} cache entries tagged {tag}")
+            return removed
+        except Exception as e:
+            self.logger.error(f"Error invalidating cache tag: {str(e)}")
+            return 0
+    
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """Invalidate every entry whose key starts with a prefix.
+        
+        When ``prefix_separator`` is set and the prefix ends with it, the
+        prefix index is used; other prefixes fall back to a key scan.
+        Returns how many in-memory entries were dropped.
+        """
+        try:
+            if self.prefix_separator and prefix.endswith(self.prefix_separator):
+                keys = list(self._prefixes.get(prefix, ()))
+            else:
+                keys = [key for key in self._cache if key.startswith(prefix)]
+            if self.backend:
+                keys.extend(
+                    key for key in await self.backend.delete_prefix(prefix)
+                    if key in self._cache
+                )
+            removed = self._remove_keys(keys)
+            self.logger.debug(f"Invalidated {removed} cache entries with prefix {prefix}")
+            return removed
+        except Exception as e:
+            self.logger.error(f"Error invalidating cache prefix: {str(e)}")
+            return 0
+    
     async def clear(self) -> None:
         """Clear all cache entries."""
         try:
             self._cache.clear()
+            self._eviction.clear()
+            self._expiry.clear()
+            self._tags.clear()
+            self._prefixes.clear()
+            self._total_bytes = 0
+            if self.backend:
+                await self.backend.clear()
             self.logger.info("Cache cleared")
         except Exception as e:
             self.logger.error(f"Error clearing cache: {str(e)}")
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current entry and byte usage."""
+        return {
+            "entries": len(self._cache),
+            "max_size": self.max_size,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "utilization": len(self._cache) / self.max_size,
+            "bytes_utilization": (
+                self._total_bytes / self.max_bytes if self.max_bytes else None
+            )
+        }
+    
+    def _get_local(self, key: str) -> Any:
+        """Look a key up in the in-memory tier, returning _MISSING on a miss."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return _MISSING
+        
+        # Check expiration
+        now = time.monotonic()
+        if entry.deadline is not None and entry.deadline <= now:
+            self._remove(key)
+            return _MISSING
+        
+        # Update metadata
+        entry.hits += 1
+        entry.last_accessed = now
+        self._eviction.on_access(key, entry)
+        return entry.value
+    
+    def _store(
+        self,
+        key: str,
+        value: T,
+        ttl_seconds: Optional[float],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Add an entry to the in-memory tier, evicting as needed."""
+        # Replacing a key starts a fresh entry; drop the old one even if
+        # the new value turns out too large to cache
+        if key in self._cache:
+            self._remove(key)
+        
+        size_bytes = self._estimate_size(value)
+        if self.max_bytes is not None and size_bytes > self.max_bytes:
+            self.logger.warning(
+                f"Value for key {key} ({size_bytes} bytes) exceeds cache "
+                f"byte budget of {self.max_bytes}; not cached in memory"
+            )
+            return
+        
+        # Make room by entry count and byte budget before adding
+        while self._is_full(size_bytes):
+            if not self._evict():
+                break
+        
+        created_at = datetime.now()
+        entry = CacheEntry(
+            key=key,
+            value=value,
+            created_at=created_at,
+            expires_at=None,
+            size_bytes=size_bytes,
+            tags=tags
+        )
+        if ttl_seconds is not None:
+            entry.expires_at = created_at + timedelta(seconds=ttl_seconds)
+            entry.deadline = time.monotonic() + ttl_seconds
+            self._expiry.add(key, entry.deadline)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        for prefix in self._key_prefixes(key):
+            self._prefixes.setdefault(prefix, set()).add(key)
+        
+        self._cache[key] = entry
+        self._total_bytes += size_bytes
+        self._eviction.on_insert(key, entry)
+        self.logger.debug(f"Cached value for key: {key}")
+    
+    async def _load(self, key: str) -> Optional[T]:
+        """Load a value from the backend into the in-memory tier."""
+        stored = await self.backend.get(key)
+        if stored is None:
+            return None
+        
+        value, expires_at = stored
+        if not self._store_loaded(key, value, expires_at):
+            return None
+        self.logger.debug(f"Loaded key from {self.policy.value} backend: {key}")
+        return value
+    
+    def _store_loaded(
+        self,
+        key: str,
+        value: T,
+        expires_at: Optional[datetime]
+    ) -> bool:
+        """Promote a backend value into memory unless it has expired."""
+        ttl_seconds = None
+        if expires_at:
+            ttl_seconds = (expires_at - datetime.now()).total_seconds()
+            if ttl_seconds <= 0:
+                return False
+        self._store(key, value, self._near_ttl(ttl_seconds))
+        return True
+    
+    def _near_ttl(self, ttl_seconds: Optional[float]) -> Optional[float]:
+        """Cap in-memory TTL by the backend's near-cache TTL."""
+        if not self.backend or not self.backend.near_cache_ttl:
+            return ttl_seconds
+        near = self.backend.near_cache_ttl.total_seconds()
+        return min(ttl_seconds, near) if ttl_seconds is not None else near
+    
+    def _is_full(self, incoming_bytes: int = 0) -> bool:
+        """Check whether an entry must be evicted before adding a new one."""
+        if not self._cache:
+            return False
+        if len(self._cache) >= self.max_size:
+            return True
+        return (
+            self.max_bytes is not None
+            and self._total_bytes + incoming_bytes > self.max_bytes
+        )
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its eviction bookkeeping."""
+        entry = self._cache.pop(key)
+        self._total_bytes -= entry.size_bytes
+        self._eviction.on_remove(key)
+        if entry.deadline is not None:
+            self._expiry.remove(key, entry.deadline)
+        for tag in entry.tags:
+            self._unindex(self._tags, tag, key)
+        for prefix in self._key_prefixes(key):
+            self._unindex(self._prefixes, prefix, key)
+    
+    def _remove_keys(self, keys: Iterable[str]) -> int:
+        """Remove any of the given keys that are present."""
+        removed = 0
+        for key in keys:
+            if key in self._cache:
+                self._remove(key)
+                removed += 1
+        return removed
+    
+    def _key_prefixes(self, key: str) -> List[str]:
+        """List the separator-terminated prefixes of a key."""
+        separator = self.prefix_separator
+        if not separator:
+            return []
+        prefixes = []
+        index = key.find(separator)
+        while index != -1:
+            prefixes.append(key[:index + len(separator)])
+            index = key.find(separator, index + len(separator))
+        return prefixes
+    
+    @staticmethod
+    def _unindex(index: Dict[str, set], name: str, key: str) -> None:
+        """Drop a key from a secondary index, pruning empty sets."""
+        keys = index.get(name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[name]
+    
     def _estimate_size(self, value: T) -> int:
         """Estimate the size of a cached value in bytes."""
         try:
-            if isinstance(value, (str, bytes)):
-                return len(value)
-            return len(json.dumps(value))
-        except:
+            return estimate_size(value)
+        except Exception:
             return 0
     
-    async def _cleanup_loop(self) -> None:
-        """Periodic cleanup of expired entries."""
-        while True:
-            try:
-                await self._cleanup_expired()
-                await asyncio.sleep(60)  # Cleanup every minute
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Error in cache cleanup: {str(e)}")
-                await asyncio.sleep(5)  # Brief pause before retry
-    
     async def _cleanup_expired(self) -> None:
-        """Remove expired cache entries."""
-        now = datetime.now()
-        expired_keys = [
-            key
-            for key, entry in self._cache.items()
-            if entry.expires_at and entry.expires_at <= now
-        ]
+        """Remove expired cache entries that are due on the timer wheel."""
+        now = time.monotonic()
+        expired = 0
+        for key in self._expiry.due(now):
+            entry = self._cache.get(key)
+            if entry is not None and entry.deadline is not None and entry.deadline <= now:
+                self._remove(key)
+                expired += 1
         
-        for key in expired_keys:
-            del self._cache[key]
+        if expired:
+            self.logger.debug(f"Cleaned up {expired} expired cache entries")
         
-        if expired_keys:
-            self.logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+        if self.backend and now >= self._next_backend_purge:
+            self._next_backend_purge = now + self.backend_purge_interval
+            purged = await self.backend.purge_expired()
+            if purged:
+                self.logger.debug(f"Purged {purged} expired entries from backend")
     
-    async def _evict(self) -> None:
-        """Evict entries based on the chosen strategy."""
-        if not self._cache:
-            return
+    def _evict(self) -> bool:
+        """Evict an entry based on the chosen strategy."""
+        key_to_evict = self._eviction.victim()
+        if key_to_evict is None:
+            return False
         
-        if self.strategy == CacheStrategy.LRU:
-            # Evict least recently accessed
-            key_to_evict = min(
-                self._cache.items(),
-                key=lambda x: x[1].last_accessed or x[1].created_at
-            )[0]
-        
-        elif self.strategy == CacheStrategy.LFU:
-            # Evict least frequently used
-            key_to_evict = min(
-                self._cache.items(),
-                key=lambda x: x[1].hits
-            )[0]
-        
-        elif self.strategy == CacheStrategy.FIFO:
-            # Evict oldest entry
-            key_to_evict = min(
-                self._cache.items(),
-                key=lambda x: x[1].created_at
-            )[0]
-        
-        else:  # TTL strategy
-            # Evict nearest to expiration
-            key_to_evict = min(
-                self._cache.items(),
-                key=lambda x: x[1].expires_at or datetime.max
-            )[0]
-        
-        del self._cache[key_to_evict]
+        self._remove(key_to_evict)
         self.logger.debug(f"Evicted cache key: {key_to_evict}")
+        return True
 
 def cached(
     ttl: Optional[timedelta] = None,
-    key_generator: Optional[Callable[..., str]] = None
+    key_generator: Optional[Callable[..., str]] = None,
+    stale_while_revalidate: Optional[timedelta] = None,
+    metrics: Optional[MetricsCollector] = None,
+    name: Optional[str] = None
 ):
-    """Decorator for caching function results."""
+    """Decorator for caching function results.
+    
+    Concurrent misses for the same key share a single call to the wrapped
+    function. With ``stale_while_revalidate``, an entry past its TTL is
+    still served for that long while one background refresh runs. Hit,
+    miss, coalesced and stale counts are kept in ``wrapper.cache_stats``
+    and recorded as counters when a ``MetricsCollector`` is given.
+    """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        cache = Cache[T]()
+        cache = Cache[Tuple[T, Optional[float]]]()
+        fresh_for = ttl or cache.default_ttl
+        keep_for = fresh_for
+        if stale_while_revalidate and fresh_for:
+            keep_for = fresh_for + stale_while_revalidate
+        in_flight: Dict[str, asyncio.Task] = {}
+        stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0}
+        labels = {"function": name or func.__qualname__}
+        
+        def count(event: str) -> None:
+            stats[event] += 1
+            if metrics:
+                metrics.record(
+                    name=f"cache_{event}_total",
+                    value=1,
+                    metric_type=MetricType.COUNTER,
+                    component="cache",
+                    labels=labels
+                )
         
+        async def load(key: str, args: tuple, kwargs: dict) -> T:
+            result = await func(*args, **kwargs)
+            fresh_until = None
+            if fresh_for:
+                fresh_until = time.monotonic() + fresh_for.total_seconds()
+            await cache.set(key, (result, fresh_until), keep_for)
+            return result
+        
+        def finished(key: str, task: asyncio.Task) -> None:
+            in_flight.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    f"Cached call {labels['function']} failed: {task.exception()}"
+                )
+        
+        def start_load(key: str, args: tuple, kwargs: dict) -> asyncio.Task:
+            task = in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(load(key, args, kwargs))
+                in_flight[key] = task
+                task.add_done_callback(functools.partial(finished, key))
+            return task
+        
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> T:
             # Generate cache key
             if key_generator:
@@ -240,12 +1216,21 @@ def cached(
             # Try to get from cache
             cached_value = await cache.get(key)
             if cached_value is not None:
-                return cached_value
+                value, fresh_until = cached_value
+                if fresh_until is None or time.monotonic() < fresh_until:
+                    count("hits")
+                    return value
+                if stale_while_revalidate:
+                    count("stale")
+                    start_load(key, args, kwargs)
+                    return value
             
-            # Calculate and cache result
-            result = await func(*args, **kwargs)
-            await cache.set(key, result, ttl)
-            return result
+            # Join an in-flight call for this key or start one; shielding
+            # keeps a cancelled caller from cancelling the shared call
+            count("coalesced" if key in in_flight else "misses")
+            return await asyncio.shield(start_load(key, args, kwargs))
         
+        wrapper.cache = cache
+        wrapper.cache_stats = stats
         return wrapper
     return decorator
@@ -1,5 +1,5 @@
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import anthropic
 from .interfaces import (
     Intent,
@@ -8,15 +8,21 @@ from .interfaces import (
     TaskPlannerInterface,
     ResponseBuilderInterface
 )
+from .intent_cache import IntentCache
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
 class AnthropicNLU(NLUInterface):
-    """NLU implementation using Anthropic's Claude."""
+    """NLU implementation using Anthropic's Claude.
     
-    def __init__(self, api_key: str):
+    With an ``IntentCache``, repeated and near-duplicate queries are
+    answered from the cache instead of a new Claude request.
+    """
+    
+    def __init__(self, api_key: str, intent_cache: Optional[IntentCache] = None):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.intent_cache = intent_cache
         self.logger = get_logger(self.__class__.__name__)
     
     async def parse(self, query: str) -> Intent:
@@ -24,6 +30,12 @@ class AnthropicNLU(NLUInterface):
         try:
             self.logger.info(f"Parsing query: {query}")
             
+            if self.intent_cache is not None:
+                cached = await self.intent_cache.get(query)
+                if cached is not None:
+                    self.logger.debug(f"Intent cache hit: {cached}")
+                    return cached
+            
             # Create system prompt for intent parsing
             system_prompt = """
             Parse the user query into a structured intent. Return a JSON object with:
@@ -45,7 +57,10 @@ class AnthropicNLU(NLUInterface):
             intent_dict = json.loads(response_content)
             
             self.logger.debug(f"Parsed intent: {intent_dict}")
-            return Intent(**intent_dict)
+            intent = Intent(**intent_dict)
+            if self.intent_cache is not None:
+                await self.intent_cache.put(query, intent)
+            return intent
             
         except Exception as e:
             self.logger.error(f"Error parsing query: {str(e)}")
@@ -117,15 +132,7 @@ class SmartResponseBuilder(ResponseBuilderInterface):
             # Build a context-aware response
             response_parts = []
             for result in results:
-                status = result.get("status", "unknown")
-                action = result.get("action", "unknown action")
-                
-                if status == "completed":
-                    response_parts.append(f"Successfully {action.replace('_', ' ')}")
-                    if "result" in result:
-                        response_parts.append(str(result["result"]))
-                else:
-                    response_parts.append(f"Could not complete {action}")
+                response_parts.extend(self._describe_result(result))
             
             response = ". ".join(response_parts)
             self.logger.debug(f"Built response: {response}")
@@ -135,6 +142,22 @@ class SmartResponseBuilder(ResponseBuilderInterface):
             self.logger.error(f"Error building response: {str(e)}")
             raise
     
+    async def build_partial_response(self, result: Dict[str, Any]) -> str:
+        """Build the response fragment for one result as soon as it arrives."""
+        return ". ".join(self._describe_result(result))
+    
+    def _describe_result(self, result: Dict[str, Any]) -> List[str]:
+        """Describe one task result as response sentences."""
+        status = result.get("status", "unknown")
+        action = result.get("action", "unknown action")
+        
+        if status != "completed":
+            return [f"Could not complete {action}"]
+        parts = [f"Successfully {action.replace('_', ' ')}"]
+        if "result" in result:
+            parts.append(str(result["result"]))
+        return parts
+    
     async def build_error_response(self, error: Exception) -> str:
         """Build an error response."""
         try:
@@ -0,0 +1,151 @@
+"""Adaptive concurrency limits for Arcana Agent Framework."""
+
+from typing import Deque, Optional
+from collections import deque
+import asyncio
+import time
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class LimitOutcome:
+    """How a unit of work that held a permit ended."""
+    SUCCESS = "success"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+    IGNORED = "ignored"     # Cancelled or otherwise not a signal about load
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit that adapts to observed latency and failures.
+    
+    Uses additive increase, multiplicative decrease (AIMD). While smoothed
+    latency stays within ``latency_tolerance`` times the baseline and the
+    limit is actually in use, each success raises the limit by
+    ``1 / limit``, about one slot per round of requests. A timeout, latency
+    growing past the tolerance, or an error rate above ``max_error_rate``
+    multiplies the limit by ``backoff``, at most once per smoothed latency
+    so a burst of failures from one round only counts once.
+    
+    The baseline is a slow moving average of latency, so it absorbs the
+    normal spread between quick and slow tasks and only a sustained shift
+    reads as congestion. A permanently slower service eventually becomes
+    the new baseline instead of being throttled forever.
+    """
+    
+    def __init__(
+        self,
+        name: str = "default",
+        initial_limit: int = 5,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.5,
+        smoothing: float = 0.2,
+        baseline_drift: float = 0.02
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.smoothing = smoothing
+        self.baseline_drift = baseline_drift
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._error_rate = 0.0
+        self._last_decrease = float("-inf")
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @property
+    def limit(self) -> int:
+        """Current number of permits."""
+        return int(self._limit)
+    
+    @property
+    def in_flight(self) -> int:
+        """Permits currently held."""
+        return self._in_flight
+    
+    @property
+    def queued(self) -> int:
+        """Callers waiting for a permit."""
+        return len(self._waiters)
+    
+    async def acquire(self) -> None:
+        """Wait for a permit. Every acquire must be paired with ``release``."""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Permit was handed over just before cancellation
+                self._in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+    
+    def release(self, outcome: str = LimitOutcome.SUCCESS, latency: float = 0.0) -> None:
+        """Return a permit, adjusting the limit from how the work went."""
+        saturated = self._in_flight >= self.limit
+        self._in_flight -= 1
+        if outcome != LimitOutcome.IGNORED:
+            self._update(outcome, latency, saturated)
+        self._wake()
+    
+    def _update(self, outcome: str, latency: float, saturated: bool) -> None:
+        failed = outcome != LimitOutcome.SUCCESS
+        self._error_rate += self.smoothing * (failed - self._error_rate)
+        
+        if outcome == LimitOutcome.TIMEOUT:
+            self._decrease("timeout", latency)
+            return
+        if outcome == LimitOutcome.ERROR:
+            if self._error_rate > self.max_error_rate:
+                self._decrease(f"error rate {self._error_rate:.0%}", latency)
+            return
+        
+        if self._latency is None:
+            self._latency = self._baseline = latency
+        else:
+            self._latency += self.smoothing * (latency - self._latency)
+            self._baseline += self.baseline_drift * (latency - self._baseline)
+        
+        if self._latency > self._baseline * self.latency_tolerance:
+            self._decrease(f"latency {self._latency * 1000:.0f}ms", latency)
+        elif saturated and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+    
+    def _decrease(self, reason: str, latency: float) -> None:
+        # Until a success sets the smoothed latency, the failure's own
+        # duration stands in for one round
+        window = self._latency if self._latency is not None else latency
+        now = time.monotonic()
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        if self.limit < previous:
+            self.logger.info(
+                f"Concurrency limit for {self.name} lowered {previous} -> {self.limit} ({reason})"
+            )
+    
+    def _wake(self) -> None:
+        """Hand permits to waiters while the limit allows."""
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
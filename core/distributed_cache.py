@@ -0,0 +1,791 @@
+"""Distributed cache tier for Arcana Agent Framework.
+
+Implements ``CachePolicy.DISTRIBUTED`` on top of the Redis wire protocol
+(RESP) so several worker processes can share cached results. The client
+has no third-party dependencies; ``LocalRedisServer`` speaks the same
+protocol in-process for tests and local development.
+"""
+
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Set, Tuple, Sequence, Union
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import asyncio
+import pickle
+import re
+import time
+
+from .caching import CacheBackend, CachePolicy
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+RESPValue = Union[None, int, bytes, str, List[Any]]
+
+class RedisError(Exception):
+    """Error reply or protocol failure from a Redis server."""
+
+def _encode_command(args: Sequence[Any]) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+async def _read_reply(reader: asyncio.StreamReader) -> RESPValue:
+    """Read one RESP reply from a stream."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by Redis server")
+    
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        raise RedisError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        # Error elements (as in EXEC replies) are returned in place so the
+        # rest of the array is still read
+        items: List[Any] = []
+        for _ in range(length):
+            try:
+                items.append(await _read_reply(reader))
+            except RedisError as e:
+                items.append(e)
+        return items
+    raise RedisError(f"Unexpected reply prefix: {prefix!r}")
+
+def _escape_glob(text: str) -> str:
+    """Escape Redis glob metacharacters so text matches literally."""
+    return re.sub(r"([*?\[\]\\])", r"\\\1", text)
+
+def _glob_to_regex(pattern: str) -> "re.Pattern":
+    """Translate a Redis glob pattern, including backslash escapes."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        if char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                parts.append("[" + pattern[i + 1:end].replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return re.compile("".join(parts) + r"\Z", re.DOTALL)
+
+class RedisConnection:
+    """A single RESP connection."""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+    
+    @classmethod
+    async def open(
+        cls,
+        host: str,
+        port: int,
+        password: Optional[str] = None,
+        db: int = 0,
+        timeout: float = 5.0
+    ) -> 'RedisConnection':
+        """Open and authenticate a connection."""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port),
+            timeout
+        )
+        conn = cls(reader, writer)
+        if password:
+            await conn.execute("AUTH", password)
+        if db:
+            await conn.execute("SELECT", db)
+        return conn
+    
+    async def execute(self, *args: Any) -> RESPValue:
+        """Send one command and wait for its reply."""
+        self.writer.write(_encode_command(args))
+        await self.writer.drain()
+        return await _read_reply(self.reader)
+    
+    async def pipeline(self, commands: List[Sequence[Any]]) -> List[RESPValue]:
+        """Send several commands in one write and read all replies.
+        
+        Error replies are returned in place rather than raised so callers
+        can see which command failed.
+        """
+        self.writer.write(b"".join(_encode_command(cmd) for cmd in commands))
+        await self.writer.drain()
+        replies: List[RESPValue] = []
+        for _ in commands:
+            try:
+                replies.append(await _read_reply(self.reader))
+            except RedisError as e:
+                replies.append(e)
+        return replies
+    
+    async def close(self) -> None:
+        """Close the connection."""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+class RedisConnectionPool:
+    """Bounded pool of reusable RESP connections."""
+    
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        password: Optional[str] = None,
+        db: int = 0,
+        max_connections: int = 10,
+        timeout: float = 5.0
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.db = db
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle: List[RedisConnection] = []
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @asynccontextmanager
+    async def connection(self):
+        """Check out a connection for the duration of a block.
+        
+        Connections that fail mid-command are discarded instead of being
+        returned, since their reply stream may be out of sync.
+        """
+        async with self._semaphore:
+            conn = self._idle.pop() if self._idle else await RedisConnection.open(
+                self.host,
+                self.port,
+                self.password,
+                self.db,
+                self.timeout
+            )
+            try:
+                yield conn
+            except RedisError:
+                # An error reply leaves the stream in sync
+                self._idle.append(conn)
+                raise
+            except BaseException:
+                await conn.close()
+                raise
+            else:
+                self._idle.append(conn)
+    
+    async def close(self) -> None:
+        """Close all idle connections."""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache tier stored in Redis.
+    
+    Keys are namespaced so several caches can share one server. Values are
+    pickled. Batch operations are pipelined over a single connection, and
+    ``near_cache_ttl`` bounds how long a worker serves its in-memory copy
+    of a value written by another worker.
+    
+    Tags are kept as Redis sets of member keys, alongside a set of each
+    key's own tags. Writes and deletes move a key's memberships in the
+    same MULTI/EXEC transaction as the value itself, watching the sets
+    they read, so overwrites drop old tags and ``delete_tag`` cannot race
+    a concurrent write. Tag sets expire no earlier than their members.
+    """
+    policy = CachePolicy.DISTRIBUTED
+    
+    # Optimistic transactions give up after this many aborts
+    MAX_TRANSACTION_ATTEMPTS = 10
+    
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        namespace: str = "arcana",
+        password: Optional[str] = None,
+        db: int = 0,
+        max_connections: int = 10,
+        near_cache_ttl: Optional[timedelta] = timedelta(seconds=5)
+    ):
+        self.namespace = namespace
+        self.near_cache_ttl = near_cache_ttl
+        self.pool = RedisConnectionPool(
+            host=host,
+            port=port,
+            password=password,
+            db=db,
+            max_connections=max_connections
+        )
+        self.logger = get_logger(self.__class__.__name__)
+    
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    def _decode(
+        self,
+        blob: RESPValue,
+        pttl: RESPValue
+    ) -> Optional[Tuple[Any, Optional[datetime]]]:
+        """Decode a GET/PTTL reply pair."""
+        if not isinstance(blob, bytes):
+            return None
+        expires_at = None
+        if isinstance(pttl, int) and pttl > 0:
+            expires_at = datetime.now() + timedelta(milliseconds=pttl)
+        return pickle.loads(blob), expires_at
+    
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:__tags__:{tag}"
+    
+    def _key_tags_key(self, key: str) -> str:
+        return f"{self.namespace}:__keytags__:{key}"
+    
+    def _is_internal(self, redis_key: str) -> bool:
+        """Whether a namespaced key is a tag set rather than a value."""
+        return redis_key.startswith((
+            f"{self.namespace}:__tags__:",
+            f"{self.namespace}:__keytags__:"
+        ))
+    
+    async def _watch_key_tags(
+        self,
+        conn: RedisConnection,
+        keys: Sequence[str],
+        tags: Sequence[str] = ()
+    ) -> Tuple[List[Set[str]], List[int]]:
+        """WATCH and read the tags of ``keys`` and the PTTLs of ``tags``' sets."""
+        if not keys and not tags:
+            return [], []
+        commands: List[List[Any]] = [[
+            "WATCH",
+            *(self._key_tags_key(key) for key in keys),
+            *(self._tag_key(tag) for tag in tags)
+        ]]
+        commands.extend(["SMEMBERS", self._key_tags_key(key)] for key in keys)
+        commands.extend(["PTTL", self._tag_key(tag)] for tag in tags)
+        replies = await conn.pipeline(commands)
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        key_tags = [
+            {member.decode() for member in reply or []}
+            for reply in replies[1:len(keys) + 1]
+        ]
+        return key_tags, replies[len(keys) + 1:]
+    
+    async def _transaction(
+        self,
+        prepare: Callable[[RedisConnection], Awaitable[List[List[Any]]]]
+    ) -> List[RESPValue]:
+        """Run commands atomically in MULTI/EXEC.
+        
+        ``prepare`` WATCHes and reads the keys the commands depend on, then
+        returns the commands. If a watched key changes before EXEC, Redis
+        aborts the transaction and it is prepared again.
+        """
+        async with self.pool.connection() as conn:
+            for _ in range(self.MAX_TRANSACTION_ATTEMPTS):
+                try:
+                    commands = await prepare(conn)
+                except RedisError:
+                    # The connection goes back to the pool; drop its watches
+                    await conn.execute("UNWATCH")
+                    raise
+                if not commands:
+                    await conn.execute("UNWATCH")
+                    return []
+                replies = await conn.pipeline([["MULTI"], *commands, ["EXEC"]])
+                for reply in replies:
+                    if isinstance(reply, RedisError):
+                        raise reply
+                result = replies[-1]
+                if result is not None:
+                    for reply in result:
+                        if isinstance(reply, RedisError):
+                            raise reply
+                    return result
+        raise RedisError(
+            f"Transaction aborted {self.MAX_TRANSACTION_ATTEMPTS} times by concurrent writes"
+        )
+    
+    def _write_commands(
+        self,
+        key: str,
+        blob: bytes,
+        ttl_ms: Optional[int],
+        tags: Tuple[str, ...],
+        old_tags: Set[str]
+    ) -> List[List[Any]]:
+        """Build the commands that store a value and move its tag memberships."""
+        commands: List[List[Any]] = [
+            ["SREM", self._tag_key(tag), key] for tag in sorted(old_tags.difference(tags))
+        ]
+        command = ["SET", self._key(key), blob]
+        if ttl_ms is not None:
+            command.extend(["PX", ttl_ms])
+        commands.append(command)
+        commands.append(["DEL", self._key_tags_key(key)])
+        if tags:
+            commands.append(["SADD", self._key_tags_key(key), *tags])
+            if ttl_ms is not None:
+                commands.append(["PEXPIRE", self._key_tags_key(key), ttl_ms])
+            commands.extend(["SADD", self._tag_key(tag), key] for tag in tags)
+        return commands
+    
+    def _delete_commands(self, key: str, old_tags: Set[str]) -> List[List[Any]]:
+        """Build the commands that delete a value and its tag memberships."""
+        commands: List[List[Any]] = [
+            ["SREM", self._tag_key(tag), key] for tag in sorted(old_tags)
+        ]
+        commands.append(["DEL", self._key(key), self._key_tags_key(key)])
+        return commands
+    
+    def _tag_expiry_commands(
+        self,
+        tags: Tuple[str, ...],
+        ttl_ms: Optional[int],
+        pttls: List[int]
+    ) -> List[List[Any]]:
+        """Keep each tag set alive at least as long as its newest members."""
+        commands: List[List[Any]] = []
+        for tag, pttl in zip(tags, pttls):
+            if ttl_ms is None:
+                if pttl >= 0:
+                    commands.append(["PERSIST", self._tag_key(tag)])
+            elif pttl == -2 or 0 <= pttl < ttl_ms:
+                # -2: the set is created by this write; -1: already persistent
+                commands.append(["PEXPIRE", self._tag_key(tag), ttl_ms])
+        return commands
+    
+    async def _store(
+        self,
+        items: Dict[str, Any],
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...]
+    ) -> None:
+        """Store values and register their tags in one transaction."""
+        keys = list(items)
+        tags = tuple(dict.fromkeys(tags))
+        blobs = [pickle.dumps(items[key], pickle.HIGHEST_PROTOCOL) for key in keys]
+        
+        async def prepare(conn: RedisConnection) -> List[List[Any]]:
+            old_tags, pttls = await self._watch_key_tags(conn, keys, tags)
+            ttl_ms = None
+            if expires_at:
+                ttl_ms = int((expires_at - datetime.now()).total_seconds() * 1000)
+                if ttl_ms <= 0:
+                    # Already expired: make sure no stale copy survives
+                    return [
+                        command
+                        for key, key_tags in zip(keys, old_tags)
+                        for command in self._delete_commands(key, key_tags)
+                    ]
+            commands = [
+                command
+                for key, blob, key_tags in zip(keys, blobs, old_tags)
+                for command in self._write_commands(key, blob, ttl_ms, tags, key_tags)
+            ]
+            return commands + self._tag_expiry_commands(tags, ttl_ms, pttls)
+        
+        await self._transaction(prepare)
+    
+    async def get(self, key: str) -> Optional[Tuple[Any, Optional[datetime]]]:
+        """Get a stored value and its expiration time."""
+        async with self.pool.connection() as conn:
+            blob, pttl = await conn.pipeline([
+                ("GET", self._key(key)),
+                ("PTTL", self._key(key))
+            ])
+        return self._decode(blob, pttl)
+    
+    async def get_many(
+        self,
+        keys: List[str]
+    ) -> Dict[str, Tuple[Any, Optional[datetime]]]:
+        """Get several stored values in one round trip."""
+        if not keys:
+            return {}
+        commands = []
+        for key in keys:
+            commands.append(("GET", self._key(key)))
+            commands.append(("PTTL", self._key(key)))
+        async with self.pool.connection() as conn:
+            replies = await conn.pipeline(commands)
+        
+        results = {}
+        for i, key in enumerate(keys):
+            stored = self._decode(replies[2 * i], replies[2 * i + 1])
+            if stored is not None:
+                results[key] = stored
+        return results
+    
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Store a value."""
+        await self._store({key: value}, expires_at, tags)
+    
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        expires_at: Optional[datetime],
+        tags: Tuple[str, ...] = ()
+    ) -> None:
+        """Store several values in one transaction."""
+        if not items:
+            return
+        await self._store(items, expires_at, tags)
+    
+    async def delete(self, key: str) -> None:
+        """Delete a stored value."""
+        await self.delete_many([key])
+    
+    async def delete_many(self, keys: List[str]) -> None:
+        """Delete several stored values and their tag memberships."""
+        if not keys:
+            return
+        
+        async def prepare(conn: RedisConnection) -> List[List[Any]]:
+            old_tags, _ = await self._watch_key_tags(conn, keys)
+            return [
+                command
+                for key, key_tags in zip(keys, old_tags)
+                for command in self._delete_commands(key, key_tags)
+            ]
+        
+        await self._transaction(prepare)
+    
+    async def delete_tag(self, tag: str) -> List[str]:
+        """Delete values carrying a tag, returning their keys."""
+        tag_key = self._tag_key(tag)
+        keys: List[str] = []
+        
+        async def prepare(conn: RedisConnection) -> List[List[Any]]:
+            nonlocal keys
+            _, members = await conn.pipeline([["WATCH", tag_key], ["SMEMBERS", tag_key]])
+            if isinstance(members, RedisError):
+                raise members
+            keys = sorted(member.decode() for member in members or [])
+            old_tags, _ = await self._watch_key_tags(conn, keys)
+            commands: List[List[Any]] = [["DEL", tag_key]]
+            for key, key_tags in zip(keys, old_tags):
+                commands.extend(self._delete_commands(key, key_tags - {tag}))
+            return commands
+        
+        await self._transaction(prepare)
+        return keys
+    
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        """Delete values whose key starts with a prefix, returning their keys."""
+        pattern = _escape_glob(self._key(prefix)) + "*"
+        offset = len(self.namespace) + 1
+        keys = [
+            redis_key[offset:]
+            for redis_key in await self._scan(pattern)
+            if not self._is_internal(redis_key)
+        ]
+        await self.delete_many(keys)
+        return keys
+    
+    async def clear(self) -> None:
+        """Delete every key in this backend's namespace, tag sets included."""
+        async with self.pool.connection() as conn:
+            cursor = b"0"
+            while True:
+                cursor, keys = await conn.execute(
+                    "SCAN", cursor, "MATCH", f"{_escape_glob(self.namespace)}:*", "COUNT", 500
+                )
+                if keys:
+                    await conn.execute("DEL", *keys)
+                if cursor in (b"0", 0):
+                    break
+    
+    async def _scan(self, pattern: str) -> List[str]:
+        """Keys matching a glob pattern, listed with incremental SCAN."""
+        found: List[str] = []
+        async with self.pool.connection() as conn:
+            cursor = b"0"
+            while True:
+                cursor, keys = await conn.execute(
+                    "SCAN", cursor, "MATCH", pattern, "COUNT", 500
+                )
+                found.extend(key.decode() for key in keys or [])
+                if cursor in (b"0", 0):
+                    break
+        return found
+    
+    async def close(self) -> None:
+        """Close pooled connections."""
+        await self.pool.close()
+
+class LocalRedisServer:
+    """Minimal in-process server speaking the Redis protocol.
+    
+    Supports the commands used by ``RedisCacheBackend`` so tests and local
+    development can run without a Redis installation. Listens on loopback.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._data: Dict[bytes, bytes] = {}
+        self._sets: Dict[bytes, set] = {}
+        self._expiry: Dict[bytes, float] = {}
+        # Bumped on every change to a key so WATCH can detect writes
+        self._versions: Dict[bytes, int] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.commands_processed = 0
+        self.logger = get_logger(self.__class__.__name__)
+    
+    async def start(self) -> None:
+        """Start listening; ``port`` is updated if it was 0."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Local Redis server listening on {self.host}:{self.port}")
+    
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        session: Dict[str, Any] = {"watched": {}, "queue": None}
+        try:
+            while True:
+                try:
+                    request = await _read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(request, list) or not request:
+                    writer.write(b"-ERR invalid request\r\n")
+                    continue
+                writer.write(self._dispatch(request, session))
+                await writer.drain()
+        finally:
+            writer.close()
+    
+    def _touch(self, key: bytes) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+    
+    def _alive(self, key: bytes) -> bool:
+        """Check a key exists, expiring it lazily."""
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._sets.pop(key, None)
+            del self._expiry[key]
+            self._touch(key)
+        return key in self._data or key in self._sets
+    
+    def _remove(self, key: bytes) -> bool:
+        """Delete a key of any type, returning whether it existed."""
+        if not self._alive(key):
+            return False
+        self._data.pop(key, None)
+        self._sets.pop(key, None)
+        self._expiry.pop(key, None)
+        self._touch(key)
+        return True
+    
+    def _dispatch(self, request: List[bytes], session: Dict[str, Any]) -> bytes:
+        self.commands_processed += 1
+        command = request[0].upper()
+        args = request[1:]
+        
+        if session["queue"] is not None and command not in (
+            b"MULTI", b"EXEC", b"DISCARD", b"WATCH"
+        ):
+            session["queue"].append(request)
+            return b"+QUEUED\r\n"
+        
+        if command == b"MULTI":
+            if session["queue"] is not None:
+                return b"-ERR MULTI calls can not be nested\r\n"
+            session["queue"] = []
+            return b"+OK\r\n"
+        
+        if command in (b"EXEC", b"DISCARD"):
+            queue, watched = session["queue"], session["watched"]
+            if queue is None:
+                return b"-ERR %s without MULTI\r\n" % command
+            session["queue"], session["watched"] = None, {}
+            if command == b"DISCARD":
+                return b"+OK\r\n"
+            for key, version in watched.items():
+                self._alive(key)
+                if self._versions.get(key, 0) != version:
+                    return b"*-1\r\n"
+            return b"*%d\r\n" % len(queue) + b"".join(
+                self._execute(queued[0].upper(), queued[1:]) for queued in queue
+            )
+        
+        if command == b"WATCH":
+            if session["queue"] is not None:
+                return b"-ERR WATCH inside MULTI is not allowed\r\n"
+            for key in args:
+                self._alive(key)
+                session["watched"].setdefault(key, self._versions.get(key, 0))
+            return b"+OK\r\n"
+        
+        if command == b"UNWATCH":
+            session["watched"] = {}
+            return b"+OK\r\n"
+        
+        return self._execute(command, args)
+    
+    def _execute(self, command: bytes, args: List[bytes]) -> bytes:
+        if command in (b"PING", b"AUTH", b"SELECT"):
+            return b"+PONG\r\n" if command == b"PING" else b"+OK\r\n"
+        
+        if command == b"GET":
+            if not self._alive(args[0]) or args[0] not in self._data:
+                return b"$-1\r\n"
+            return self._bulk(self._data[args[0]])
+        
+        if command == b"SET":
+            key, value = args[0], args[1]
+            self._sets.pop(key, None)
+            self._data[key] = value
+            self._expiry.pop(key, None)
+            self._touch(key)
+            options = [arg.upper() for arg in args[2:]]
+            if b"PX" in options:
+                ms = int(args[2 + options.index(b"PX") + 1])
+                self._expiry[key] = time.monotonic() + ms / 1000
+            elif b"EX" in options:
+                seconds = int(args[2 + options.index(b"EX") + 1])
+                self._expiry[key] = time.monotonic() + seconds
+            return b"+OK\r\n"
+        
+        if command == b"MGET":
+            return b"*%d\r\n" % len(args) + b"".join(
+                self._bulk(self._data[key])
+                if self._alive(key) and key in self._data else b"$-1\r\n"
+                for key in args
+            )
+        
+        if command == b"DEL":
+            return b":%d\r\n" % sum(self._remove(key) for key in args)
+        
+        if command == b"EXISTS":
+            return b":%d\r\n" % sum(self._alive(key) for key in args)
+        
+        if command == b"SADD":
+            self._alive(args[0])
+            members = self._sets.setdefault(args[0], set())
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            if added:
+                self._touch(args[0])
+            return b":%d\r\n" % added
+        
+        if command == b"SREM":
+            if not self._alive(args[0]):
+                return b":0\r\n"
+            members = self._sets.get(args[0], set())
+            removed = len(members & set(args[1:]))
+            members.difference_update(args[1:])
+            if removed:
+                self._touch(args[0])
+            if not members:
+                self._remove(args[0])
+            return b":%d\r\n" % removed
+        
+        if command == b"SMEMBERS":
+            members = self._sets.get(args[0], set()) if self._alive(args[0]) else set()
+            return b"*%d\r\n" % len(members) + b"".join(
+                self._bulk(member) for member in members
+            )
+        
+        if command == b"PTTL":
+            if not self._alive(args[0]):
+                return b":-2\r\n"
+            deadline = self._expiry.get(args[0])
+            if deadline is None:
+                return b":-1\r\n"
+            return b":%d\r\n" % int((deadline - time.monotonic()) * 1000)
+        
+        if command in (b"PEXPIRE", b"PERSIST"):
+            if not self._alive(args[0]):
+                return b":0\r\n"
+            if command == b"PERSIST":
+                if self._expiry.pop(args[0], None) is None:
+                    return b":0\r\n"
+            else:
+                self._expiry[args[0]] = time.monotonic() + int(args[1]) / 1000
+            self._touch(args[0])
+            return b":1\r\n"
+        
+        if command == b"SCAN":
+            pattern = b"*"
+            options = [arg.upper() for arg in args[1:]]
+            if b"MATCH" in options:
+                pattern = args[1 + options.index(b"MATCH") + 1]
+            matcher = _glob_to_regex(pattern.decode())
+            keys = [
+                key for key in list(self._data) + list(self._sets)
+                if self._alive(key) and matcher.match(key.decode())
+            ]
+            return b"*2\r\n" + self._bulk(b"0") + b"*%d\r\n" % len(keys) + b"".join(
+                self._bulk(key) for key in keys
+            )
+        
+        if command == b"FLUSHDB":
+            for key in list(self._data) + list(self._sets):
+                self._touch(key)
+            self._data.clear()
+            self._sets.clear()
+            self._expiry.clear()
+            return b"+OK\r\n"
+        
+        return b"-ERR unknown command '%s'\r\n" % command
+    
+    @staticmethod
+    def _bulk(data: bytes) -> bytes:
+        return b"$%d\r\n%s\r\n" % (len(data), data)
@@ -1,15 +1,18 @@
 """Error handling and recovery system for Arcana Agent Framework."""
 
-from typing import Optional, Dict, Any, Type, Callable, List
+from typing import Optional, Dict, Any, Type, Callable, List, Tuple
 import asyncio
+import logging
 import traceback
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 
 from .logging_config import get_logger
+from .retry import RetryPolicy
 from core.interfaces import Agent
 from core.monitoring import MetricsCollector
+from core.protocol import Message
 
 logger = get_logger(__name__)
 
@@ -121,7 +124,7 @@ class CircuitBreaker:
 class ErrorHandler(Agent):
     """Central error handling system."""
     
-    def __init__(self, metrics_collector: MetricsCollector):
+    def __init__(self, metrics_collector: Optional[MetricsCollector] = None):
         self.metrics = metrics_collector
         self.error_handlers: Dict[Type[Exception], List[Callable]] = {}
         self.recovery_strategies: Dict[ErrorCategory, RecoveryStrategy] = {
@@ -134,6 +137,20 @@ class ErrorHandler(Agent):
             ErrorCategory.UNKNOWN: RecoveryStrategy.SHUTDOWN,
             ErrorCategory.TASK: RecoveryStrategy.IGNORE
         }
+        self.retry_policies: Dict[RecoveryStrategy, RetryPolicy] = {
+            RecoveryStrategy.RETRY: RetryPolicy(
+                max_attempts=3,
+                base_delay=1.0,
+                multiplier=1.0,
+                jitter=False
+            ),
+            RecoveryStrategy.BACKOFF: RetryPolicy(
+                max_attempts=5,
+                base_delay=0.5,
+                max_delay=30.0,
+                max_elapsed=120.0
+            )
+        }
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
         self.logger = get_logger(self.__class__.__name__)
     
@@ -145,6 +162,21 @@ class ErrorHandler(Agent):
         """Stop the error handler."""
         self.logger.info("Error handler stopped")
     
+    async def handle_message(self, message: Message) -> None:
+        """Handle an error reported by another agent.
+        
+        The payload carries the error under ``error`` (an exception or a
+        description) and optional context under ``context``.
+        """
+        error = message.payload.get("error")
+        if error is None:
+            self.logger.warning(f"Ignoring message {message.id} without an error")
+            return
+        if not isinstance(error, Exception):
+            error = Exception(str(error))
+        context = {"component": message.agent, **message.payload.get("context", {})}
+        await self.handle_error(error, context)
+    
     def register_handler(
         self,
         exception_type: Type[Exception],
@@ -165,6 +197,14 @@ class ErrorHandler(Agent):
         self.recovery_strategies[category] = strategy
         self.logger.info(f"Set {strategy.value} strategy for {category.value} errors")
     
+    def get_retry_policy(self, error: Exception) -> Optional[RetryPolicy]:
+        """Get the retry policy for an error's recovery strategy.
+        
+        Only ``RETRY`` and ``BACKOFF`` retry; other strategies return None.
+        """
+        strategy = self.recovery_strategies[self._get_category(error)]
+        return self.retry_policies.get(strategy)
+    
     def get_circuit_breaker(self, name: str) -> CircuitBreaker:
         """Get or create a circuit breaker."""
         if name not in self.circuit_breakers:
@@ -254,16 +294,18 @@ class ErrorHandler(Agent):
             return None
     
     async def _handle_retry(self, context: ErrorContext) -> Optional[Any]:
-        """Handle retry strategy."""
-        # Implementation depends on the task execution system
+        """Handle retry strategy by returning the fixed-delay retry policy."""
         self.logger.info(f"Retrying operation for {context.component}")
-        return None
+        return self.retry_policies[RecoveryStrategy.RETRY]
     
     async def _handle_backoff(self, context: ErrorContext) -> Optional[Any]:
-        """Handle exponential backoff strategy."""
-        # Implementation depends on the task execution system
+        """Handle backoff strategy by returning the jittered backoff policy.
+        
+        The caller owns the retry loop; ``TaskExecutor`` applies this
+        policy together with its retry budget and deadlines.
+        """
         self.logger.info(f"Applying backoff for {context.component}")
-        return None
+        return self.retry_policies[RecoveryStrategy.BACKOFF]
     
     async def _handle_fallback(self, context: ErrorContext) -> Optional[Any]:
         """Handle fallback strategy."""
@@ -0,0 +1,141 @@
+"""Execution lanes for running agent work off the event loop."""
+
+from typing import Any, Callable, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from enum import Enum
+import asyncio
+import multiprocessing
+import os
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class ExecutionLane(Enum):
+    """Where a task's work runs.
+    
+    ``ASYNC`` awaits ``agent.execute(task)`` on the event loop. ``THREAD``
+    and ``PROCESS`` call the agent's synchronous ``execute_sync`` in a
+    thread or worker process, for blocking and CPU-bound work respectively.
+    Process-lane handlers receive a ``TaskEnvelope`` rather than the task,
+    and must be picklable: a module-level function, a staticmethod, or a
+    method of a picklable agent.
+    """
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
+
+@dataclass(frozen=True)
+class TaskEnvelope:
+    """Picklable copy of a task sent to a worker process.
+    
+    Carries ``action`` and ``parameters`` like ``Task`` so handlers can
+    treat both alike, without workers having to import the framework.
+    """
+    handler: Callable[[Any], Dict[str, Any]]
+    action: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    priority: int = 0
+    
+    def run(self) -> Dict[str, Any]:
+        return self.handler(self)
+
+def _run_envelope(envelope: TaskEnvelope) -> Dict[str, Any]:
+    """Worker entry point."""
+    return envelope.run()
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+class LanePools:
+    """Thread and process pools backing the blocking lanes.
+    
+    Pools are created on first use. ``warm_up`` starts every worker process
+    ahead of time so the first CPU-bound task does not pay for process
+    start-up. A worker that dies breaks the whole process pool; the pool is
+    then replaced and the failing task reports the error.
+    """
+    
+    def __init__(
+        self,
+        process_workers: Optional[int] = None,
+        thread_workers: Optional[int] = None,
+        mp_context: Optional[str] = None
+    ):
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.thread_workers = thread_workers
+        self.mp_context = mp_context
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @staticmethod
+    def lane_for(task: Any, agent: Any) -> ExecutionLane:
+        """Lane from ``task.lane``, else the agent class's ``execution_lane``."""
+        lane = getattr(task, "lane", None) or getattr(
+            type(agent), "execution_lane", ExecutionLane.ASYNC
+        )
+        return ExecutionLane(lane)
+    
+    async def run(self, lane: ExecutionLane, agent: Any, task: Any) -> Dict[str, Any]:
+        """Run a task's work in the given lane."""
+        if lane is ExecutionLane.ASYNC:
+            return await agent.execute(task)
+        
+        loop = asyncio.get_running_loop()
+        if lane is ExecutionLane.THREAD:
+            return await loop.run_in_executor(self._threads(), agent.execute_sync, task)
+        
+        envelope = TaskEnvelope(
+            handler=agent.execute_sync,
+            action=task.action,
+            parameters=task.parameters,
+            priority=task.priority
+        )
+        pool = self._processes()
+        try:
+            return await loop.run_in_executor(pool, _run_envelope, envelope)
+        except BrokenProcessPool:
+            self.logger.error("Process pool broke; starting a new one")
+            if self._process_pool is pool:
+                self._process_pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    
+    async def warm_up(self) -> None:
+        """Start all worker processes now instead of on first use."""
+        loop = asyncio.get_running_loop()
+        pool = self._processes()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(pool, _worker_pid)
+            for _ in range(self.process_workers)
+        ])
+        self.logger.info(f"Process lane warm with {len(set(pids))} workers")
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pools; they are recreated if used again."""
+        process_pool, self._process_pool = self._process_pool, None
+        thread_pool, self._thread_pool = self._thread_pool, None
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait, cancel_futures=True)
+        if thread_pool is not None:
+            thread_pool.shutdown(wait=wait, cancel_futures=True)
+    
+    def _processes(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            context = multiprocessing.get_context(self.mp_context)
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=context
+            )
+        return self._process_pool
+    
+    def _threads(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers,
+                thread_name_prefix="arcana-thread-lane"
+            )
+        return self._thread_pool
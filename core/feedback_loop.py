@@ -1,6 +1,6 @@
 """Real-time feedback system for task execution and debugging."""
 
-from typing import Dict, Any, List, Optional, Callable
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Callable
 from datetime import datetime
 import asyncio
 import json
@@ -10,7 +10,10 @@ from enum import Enum
 
 from core.logging_config import get_logger
 from core.monitoring import MetricsCollector
-from core.error_handling import ErrorHandler
+
+if TYPE_CHECKING:
+    # error_handling imports interfaces, which imports this module
+    from core.error_handling import ErrorHandler
 
 logger = get_logger(__name__)
 
@@ -62,7 +65,7 @@ class FeedbackLoop:
     def __init__(
         self,
         metrics_collector: MetricsCollector,
-        error_handler: ErrorHandler
+        error_handler: 'ErrorHandler'
     ):
         self.metrics = metrics_collector
         self.error_handler = error_handler
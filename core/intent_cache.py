@@ -0,0 +1,215 @@
+"""Intent cache for NLU parsing in Arcana Agent Framework."""
+
+from typing import Dict, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+import copy
+import math
+import re
+import unicodedata
+
+from .caching import Cache, CacheBackend
+from .interfaces import Intent
+from .logging_config import get_logger
+from .monitoring import MetricsCollector, MetricType
+
+logger = get_logger(__name__)
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19
+}
+_TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90
+}
+_TENS_DIGITS = {str(value) for value in _TENS.values()}
+_TOKEN = re.compile(r"\d+(?:[.:/]\d+)*|[^\W\d_]+")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query for cache keys.
+    
+    Folds case and Unicode compatibility forms, drops punctuation,
+    collapses whitespace and writes numbers as digits, so "Book a table
+    for Two!" and "book a table for 2" share a key.
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _THOUSANDS.sub("", text)
+    tokens: List[str] = []
+    for token in _TOKEN.findall(text):
+        if token in _UNITS:
+            # "twenty one" and "twenty-one" become 21
+            if tokens and tokens[-1] in _TENS_DIGITS and 0 < _UNITS[token] < 10:
+                tokens[-1] = str(int(tokens[-1]) + _UNITS[token])
+                continue
+            token = str(_UNITS[token])
+        elif token in _TENS:
+            token = str(_TENS[token])
+        elif token.isdigit():
+            token = str(int(token))     # Drop leading zeros
+        tokens.append(token)
+    return " ".join(tokens)
+
+def _numbers(normalized: str) -> Tuple[str, ...]:
+    """Numeric tokens of a normalized query, in order."""
+    return tuple(token for token in normalized.split() if token[0].isdigit())
+
+def _changes_parameters(key: str, similar: str, intent: Intent) -> bool:
+    """Whether words that differ between two queries are intent parameters."""
+    differing = set(key.split()) ^ set(similar.split())
+    if not differing or not intent.parameters:
+        return False
+    values = normalize_query(" ".join(str(value) for value in intent.parameters.values()))
+    return not differing.isdisjoint(values.split())
+
+def char_ngrams(text: str, n: int = 3) -> Set[str]:
+    """Character n-grams of ``text``, padded so short words still count."""
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+class IntentCache:
+    """Caches parsed intents by normalized query.
+    
+    Exact hits use the normalized query as the key. Failing that, a
+    near-duplicate lookup compares character trigrams of recently cached
+    queries and reuses the intent of the most similar one whose Jaccard
+    similarity reaches ``similarity_threshold``. A near-duplicate must
+    contain exactly the same numbers, so "table for 2" never answers
+    "table for 4", and none of the words that differ between the two
+    queries may appear in the cached intent's parameters, so "meeting with
+    john smith" never reuses the entities parsed for "meeting with joan
+    smith". Only intents with at least ``min_confidence`` are
+    cached. Pass a ``backend`` such as ``SQLiteCacheBackend`` to keep
+    intents across restarts; persisted entries serve exact hits and rejoin
+    the near-duplicate index once hit.
+    """
+    
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: Optional[timedelta] = timedelta(hours=24),
+        similarity_threshold: Optional[float] = 0.85,
+        min_confidence: float = 0.5,
+        backend: Optional[CacheBackend] = None,
+        metrics: Optional[MetricsCollector] = None
+    ):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.min_confidence = min_confidence
+        self.metrics = metrics
+        self.cache = Cache[Intent](max_size=max_size, default_ttl=ttl, backend=backend)
+        # Near-duplicate index: normalized query -> trigrams, and trigram -> queries
+        self._grams: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self.stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0}
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        hits = self.stats["exact_hits"] + self.stats["similar_hits"]
+        lookups = hits + self.stats["misses"]
+        return hits / lookups if lookups else 0.0
+    
+    async def get(self, query: str) -> Optional[Intent]:
+        """Cached intent for a query or a near-duplicate of it."""
+        key = normalize_query(query)
+        intent = await self.cache.get(key)
+        if intent is not None:
+            self._index(key)
+            self._count("exact_hits")
+            return copy.deepcopy(intent)
+        
+        if self.similarity_threshold is not None:
+            for similar in self._similar(key):
+                intent = await self.cache.get(similar)
+                if intent is not None:
+                    if _changes_parameters(key, similar, intent):
+                        continue
+                    self._count("similar_hits")
+                    self.logger.debug(f"Intent cache matched {query!r} to {similar!r}")
+                    return copy.deepcopy(intent)
+                self._unindex(similar)     # Expired or evicted
+        
+        self._count("misses")
+        return None
+    
+    async def put(self, query: str, intent: Intent) -> None:
+        """Cache the intent parsed for a query."""
+        if intent.confidence < self.min_confidence:
+            return
+        key = normalize_query(query)
+        await self.cache.set(key, copy.deepcopy(intent))
+        self._index(key)
+    
+    async def clear(self) -> None:
+        """Drop every cached intent."""
+        await self.cache.clear()
+        self._grams.clear()
+        self._postings.clear()
+    
+    async def close(self) -> None:
+        """Release the cache and its backend."""
+        await self.cache.stop()
+    
+    def _similar(self, key: str) -> List[str]:
+        """Indexed queries similar enough to ``key``, most similar first."""
+        grams = char_ngrams(key)
+        # A match shares at least ceil(threshold * |grams|) trigrams, so it
+        # must share one of the rarest |grams| - that + 1; only their
+        # postings need scanning, not those of common trigrams like " a "
+        rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        prefix = rarest[:len(grams) - math.ceil(self.similarity_threshold * len(grams)) + 1]
+        candidates: Set[str] = set()
+        for gram in prefix:
+            candidates.update(self._postings.get(gram, ()))
+        
+        numbers = _numbers(key)
+        scored = []
+        for candidate in candidates:
+            candidate_grams = self._grams[candidate]
+            shared = len(grams & candidate_grams)
+            similarity = shared / (len(grams) + len(candidate_grams) - shared)
+            if similarity >= self.similarity_threshold and _numbers(candidate) == numbers:
+                scored.append((similarity, candidate))
+        scored.sort(reverse=True)
+        return [candidate for _, candidate in scored]
+    
+    def _index(self, key: str) -> None:
+        if key in self._grams:
+            self._grams.move_to_end(key)
+            return
+        grams = char_ngrams(key)
+        self._grams[key] = grams
+        for gram in grams:
+            self._postings[gram].add(key)
+        # Keep the index no larger than the cache itself
+        while len(self._grams) > self.max_size:
+            self._unindex(next(iter(self._grams)))
+    
+    def _unindex(self, key: str) -> None:
+        for gram in self._grams.pop(key, ()):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[gram]
+    
+    def _count(self, event: str) -> None:
+        self.stats[event] += 1
+        if self.metrics is not None:
+            self.metrics.record(
+                name=f"intent_cache_{event}_total",
+                value=1,
+                metric_type=MetricType.COUNTER,
+                component="nlu"
+            )
+            self.metrics.record(
+                name="intent_cache_hit_rate",
+                value=self.hit_rate,
+                metric_type=MetricType.GAUGE,
+                component="nlu"
+            )
@@ -0,0 +1,293 @@
+"""Local intent classifier for Arcana Agent Framework."""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+import math
+import random
+import re
+import time
+
+import numpy as np
+import yaml
+
+from .intent_cache import normalize_query
+from .interfaces import Intent, NLUInterface
+from .logging_config import get_logger
+from .monitoring import MetricsCollector, MetricType
+
+logger = get_logger(__name__)
+
+# Rasa entity annotations: [AgentX](agent_name) or [AgentX]{"entity": "agent_name"}
+_ENTITY = re.compile(r'\[([^\]]+)\](?:\(([^)]+)\)|\{[^}]*"entity"\s*:\s*"([^"]+)"[^}]*\})')
+
+@dataclass
+class TrainingExample:
+    """One annotated example from Rasa NLU training data."""
+    text: str
+    intent: str
+    entities: Dict[str, str] = field(default_factory=dict)
+
+def parse_example(annotated: str, intent: str) -> TrainingExample:
+    """Strip Rasa entity markup from an example, keeping the entity values."""
+    entities = {}
+    
+    def replace(match: "re.Match[str]") -> str:
+        entities[match.group(2) or match.group(3)] = match.group(1)
+        return match.group(1)
+    
+    return TrainingExample(_ENTITY.sub(replace, annotated).strip(), intent, entities)
+
+def load_nlu_examples(path: str = "data/nlu.yml") -> List[TrainingExample]:
+    """Read the intent examples of a Rasa ``nlu.yml`` file."""
+    with open(path) as f:
+        data = yaml.safe_load(f) or {}
+    
+    examples = []
+    for block in data.get("nlu", []):
+        intent = block.get("intent")
+        if not intent:
+            continue    # Synonyms, regexes and lookup tables
+        for line in (block.get("examples") or "").splitlines():
+            line = line.strip()
+            if line.startswith("- "):
+                examples.append(parse_example(line[2:], intent))
+    logger.info(f"Loaded {len(examples)} NLU examples from {path}")
+    return examples
+
+def split_examples(
+    examples: Sequence[TrainingExample],
+    test_fraction: float = 0.3,
+    seed: int = 0
+) -> Tuple[List[TrainingExample], List[TrainingExample]]:
+    """Stratified train/test split that keeps every intent in training."""
+    by_intent: Dict[str, List[TrainingExample]] = defaultdict(list)
+    for example in examples:
+        by_intent[example.intent].append(example)
+    
+    rng = random.Random(seed)
+    train, test = [], []
+    for intent in sorted(by_intent):
+        group = list(by_intent[intent])
+        rng.shuffle(group)
+        held_out = min(len(group) - 1, round(len(group) * test_fraction))
+        test.extend(group[:held_out])
+        train.extend(group[held_out:])
+    return train, test
+
+def _features(normalized: str) -> List[str]:
+    """Character 2-4 grams plus words of a normalized query."""
+    padded = f" {normalized} "
+    features = [
+        padded[i:i + n]
+        for n in (2, 3, 4)
+        for i in range(len(padded) - n + 1)
+    ]
+    features.extend(f"w:{word}" for word in normalized.split())
+    return features
+
+class IntentClassifier:
+    """TF-IDF features with a softmax linear model, trained with NumPy.
+    
+    Queries are normalized like intent cache keys, then described by
+    character 2-4 grams and words, weighted by sublinear TF-IDF and
+    L2-normalized. ``predict`` only answers when the top probability
+    reaches ``threshold`` and at least ``min_coverage`` of the query's
+    features were seen in training, so unfamiliar queries are left to a
+    fallback instead of being forced into the nearest known intent.
+    Entity values seen in training are picked up as intent parameters.
+    """
+    
+    def __init__(self, threshold: float = 0.7, min_coverage: float = 0.5):
+        self.threshold = threshold
+        self.min_coverage = min_coverage
+        self.intents: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0)
+        self._idf: List[float] = []
+        self.weights = np.zeros((0, 0))
+        self.bias = np.zeros(0)
+        self.entity_values: Dict[str, Tuple[str, str]] = {}  # Normalized value -> (entity, value)
+    
+    @classmethod
+    def from_nlu_file(cls, path: str = "data/nlu.yml", **kwargs) -> "IntentClassifier":
+        """Train a classifier on a Rasa ``nlu.yml`` file."""
+        classifier = cls(**kwargs)
+        classifier.fit(load_nlu_examples(path))
+        return classifier
+    
+    def fit(
+        self,
+        examples: Sequence[TrainingExample],
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-3
+    ) -> "IntentClassifier":
+        """Train on annotated examples with full-batch gradient descent."""
+        if not examples:
+            raise ValueError("Cannot train an intent classifier without examples")
+        
+        self.intents = sorted({example.intent for example in examples})
+        labels = np.array([self.intents.index(example.intent) for example in examples])
+        counts = [Counter(_features(normalize_query(example.text))) for example in examples]
+        
+        self.vocabulary = {}
+        for features in counts:
+            for feature in features:
+                self.vocabulary.setdefault(feature, len(self.vocabulary))
+        document_frequency = np.zeros(len(self.vocabulary))
+        for features in counts:
+            document_frequency[[self.vocabulary[f] for f in features]] += 1
+        self.idf = np.log((1 + len(examples)) / (1 + document_frequency)) + 1
+        self._idf = self.idf.tolist()
+        
+        x = np.zeros((len(examples), len(self.vocabulary)))
+        for row, features in enumerate(counts):
+            columns = [self.vocabulary[f] for f in features]
+            x[row, columns] = [1 + math.log(n) for n in features.values()]
+        x *= self.idf
+        x /= np.linalg.norm(x, axis=1, keepdims=True)
+        
+        targets = np.eye(len(self.intents))[labels]
+        self.weights = np.zeros((len(self.vocabulary), len(self.intents)))
+        self.bias = np.zeros(len(self.intents))
+        for _ in range(epochs):
+            error = (_softmax(x @ self.weights + self.bias) - targets) / len(examples)
+            self.weights -= learning_rate * (x.T @ error + l2 * self.weights)
+            self.bias -= learning_rate * error.sum(axis=0)
+        
+        self.entity_values = {
+            f" {normalize_query(value)} ": (entity, value)
+            for example in examples
+            for entity, value in example.entities.items()
+        }
+        logger.info(
+            f"Trained intent classifier on {len(examples)} examples, "
+            f"{len(self.intents)} intents, {len(self.vocabulary)} features"
+        )
+        return self
+    
+    def classify(self, query: str) -> Tuple[str, float, float]:
+        """Most likely intent, its probability and the query's feature coverage."""
+        features = _features(normalize_query(query))
+        # Per-query work stays in plain Python until the one matrix
+        # product; NumPy call overhead dominates for vectors this small
+        vocabulary, idf = self.vocabulary, self._idf
+        columns, values = [], []
+        known = 0
+        for feature, n in Counter(features).items():
+            column = vocabulary.get(feature)
+            if column is not None:
+                columns.append(column)
+                values.append((1 + math.log(n)) * idf[column])
+                known += n
+        if not columns:
+            return self.intents[0], 0.0, 0.0
+        
+        norm = math.sqrt(sum(value * value for value in values))
+        scores = np.dot(values, self.weights[columns]) / norm + self.bias
+        exp = np.exp(scores - scores.max())
+        best = int(exp.argmax())
+        return self.intents[best], float(exp[best] / exp.sum()), known / len(features)
+    
+    def predict(self, query: str) -> Optional[Intent]:
+        """Intent for a query, or None when the classifier is not confident."""
+        name, confidence, coverage = self.classify(query)
+        if confidence < self.threshold or coverage < self.min_coverage:
+            return None
+        return Intent(name=name, confidence=confidence, parameters=self._entities(query))
+    
+    def evaluate(self, examples: Sequence[TrainingExample]) -> Dict[str, Any]:
+        """Accuracy report on labelled examples.
+        
+        ``accuracy`` counts every example; ``coverage`` is the share the
+        classifier answers itself at its threshold and ``answered_accuracy``
+        its accuracy on those. Per-intent precision and recall are included.
+        """
+        predicted = [self.classify(example.text) for example in examples]
+        answered = [
+            (example.intent, name)
+            for example, (name, confidence, coverage) in zip(examples, predicted)
+            if confidence >= self.threshold and coverage >= self.min_coverage
+        ]
+        
+        per_intent = {}
+        for intent in self.intents:
+            true_positive = sum(
+                example.intent == intent and name == intent
+                for example, (name, _, _) in zip(examples, predicted)
+            )
+            predicted_count = sum(name == intent for name, _, _ in predicted)
+            actual_count = sum(example.intent == intent for example in examples)
+            per_intent[intent] = {
+                "precision": true_positive / predicted_count if predicted_count else 0.0,
+                "recall": true_positive / actual_count if actual_count else 0.0,
+                "support": actual_count
+            }
+        
+        correct = sum(
+            example.intent == name for example, (name, _, _) in zip(examples, predicted)
+        )
+        return {
+            "examples": len(examples),
+            "accuracy": correct / len(examples) if examples else 0.0,
+            "coverage": len(answered) / len(examples) if examples else 0.0,
+            "answered_accuracy": (
+                sum(actual == name for actual, name in answered) / len(answered)
+                if answered else 0.0
+            ),
+            "per_intent": per_intent
+        }
+    
+    def _entities(self, query: str) -> Dict[str, str]:
+        """Entity values from training that appear in the query."""
+        padded = f" {normalize_query(query)} "
+        return {
+            entity: value
+            for known, (entity, value) in self.entity_values.items()
+            if known in padded
+        }
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+class FastPathNLU(NLUInterface):
+    """Answers confident queries locally, deferring the rest to another NLU.
+    
+    Typically wraps ``AnthropicNLU``: queries the local classifier is sure
+    about skip the Claude round trip entirely.
+    """
+    
+    def __init__(
+        self,
+        classifier: IntentClassifier,
+        fallback: NLUInterface,
+        metrics: Optional[MetricsCollector] = None
+    ):
+        self.classifier = classifier
+        self.fallback = fallback
+        self.metrics = metrics
+        self.stats = {"local": 0, "fallback": 0}
+        self.logger = get_logger(self.__class__.__name__)
+    
+    async def parse(self, query: str) -> Intent:
+        """Parse locally when confident, otherwise with the fallback NLU."""
+        start = time.perf_counter()
+        intent = self.classifier.predict(query)
+        path = "local" if intent is not None else "fallback"
+        if intent is None:
+            intent = await self.fallback.parse(query)
+        else:
+            self.logger.debug(f"Classified {query!r} locally as {intent.name} ({intent.confidence:.2f})")
+        
+        self.stats[path] += 1
+        if self.metrics is not None:
+            self.metrics.record(
+                name="nlu_parse_duration_seconds",
+                value=time.perf_counter() - start,
+                metric_type=MetricType.TIMER,
+                component="nlu",
+                labels={"path": path}
+            )
+        return intent
@@ -1,11 +1,12 @@
 """Core interfaces for the Arcana Agent Framework."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 from dataclasses import dataclass
 import asyncio
 from datetime import datetime
 
+from core.execution_lanes import ExecutionLane
 from core.protocol import Message
 from core.monitoring import MetricsCollector
 from core.error_types import ErrorHandler
@@ -25,6 +26,7 @@ class Task:
     parameters: Dict[str, Any]
     dependencies: List[str] = None
     priority: int = 0
+    lane: Optional[str] = None  # Overrides the agent's execution lane
 
 class NLUInterface(ABC):
     """Natural Language Understanding interface for parsing user queries."""
@@ -48,7 +50,14 @@ class TaskPlannerInterface(ABC):
         pass
 
 class AgentInterface(ABC):
-    """Base interface for all task-specific agents."""
+    """Base interface for all task-specific agents.
+    
+    Agents doing blocking or CPU-bound work set ``execution_lane`` to
+    ``ExecutionLane.THREAD`` or ``ExecutionLane.PROCESS`` and implement a
+    synchronous ``execute_sync(task)``.
+    """
+    
+    execution_lane = ExecutionLane.ASYNC
     
     @abstractmethod
     async def execute(self, task: Task) -> Dict[str, Any]:
@@ -236,3 +245,23 @@ class ResponseBuilderInterface(ABC):
     async def build_error_response(self, error: Exception) -> str:
         """Build an error response when task execution fails."""
         pass
+
+    async def build_partial_response(self, result: Dict[str, Any]) -> str:
+        """Convert a single task result into a response fragment.
+        
+        By default the fragment is the full response for that one result;
+        builders can override this to render fragments more cheaply.
+        """
+        return await self.build_response([result])
+
+    async def build_response_stream(
+        self,
+        results: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[str]:
+        """Yield a response fragment for each result as it arrives."""
+        empty = True
+        async for result in results:
+            empty = False
+            yield await self.build_partial_response(result)
+        if empty:
+            yield await self.build_response([])
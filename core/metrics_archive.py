@@ -0,0 +1,624 @@
+"""Persistent, downsampled metric history for Arcana Agent Framework."""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import asyncio
+import math
+import os
+import sqlite3
+import struct
+import time
+
+import numpy as np
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class BitWriter:
+    """Appends bit fields, most significant bit first."""
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._current = 0
+        self._bits = 0
+    
+    def write(self, value: int, nbits: int) -> None:
+        """Write the low ``nbits`` of ``value``."""
+        while nbits:
+            take = min(8 - self._bits, nbits)
+            nbits -= take
+            self._current = (self._current << take) | ((value >> nbits) & ((1 << take) - 1))
+            self._bits += take
+            if self._bits == 8:
+                self._buffer.append(self._current)
+                self._current = 0
+                self._bits = 0
+    
+    def getvalue(self) -> bytes:
+        """Return the written bits, zero-padded to a whole byte."""
+        if self._bits:
+            return bytes(self._buffer) + bytes([self._current << (8 - self._bits)])
+        return bytes(self._buffer)
+
+class BitReader:
+    """Reads bit fields written by ``BitWriter``."""
+    
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0
+    
+    def read(self, nbits: int) -> int:
+        """Read ``nbits`` as an unsigned integer."""
+        value = 0
+        while nbits:
+            offset = self._position & 7
+            take = min(8 - offset, nbits)
+            byte = self._data[self._position >> 3]
+            value = (value << take) | ((byte >> (8 - offset - take)) & ((1 << take) - 1))
+            self._position += take
+            nbits -= take
+        return value
+
+# Delta-of-delta timestamp classes: (prefix, prefix bits, value bits)
+_DOD_CLASSES = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+def _signed(value: int, nbits: int) -> int:
+    return value - (1 << nbits) if value >= 1 << (nbits - 1) else value
+
+def encode_timestamps(timestamps: Sequence[int]) -> bytes:
+    """Encode integer timestamps as delta-of-deltas (Gorilla style)."""
+    writer = BitWriter()
+    previous = 0
+    previous_delta = 0
+    for i, timestamp in enumerate(timestamps):
+        if i == 0:
+            writer.write(timestamp, 64)
+        else:
+            delta = timestamp - previous
+            dod = delta - previous_delta
+            if dod == 0:
+                writer.write(0, 1)
+            else:
+                for prefix, prefix_bits, value_bits in _DOD_CLASSES:
+                    if -(1 << (value_bits - 1)) <= dod < 1 << (value_bits - 1):
+                        writer.write(prefix, prefix_bits)
+                        writer.write(dod & ((1 << value_bits) - 1), value_bits)
+                        break
+                else:
+                    writer.write(0b1111, 4)
+                    writer.write(dod & ((1 << 64) - 1), 64)
+            previous_delta = delta
+        previous = timestamp
+    return writer.getvalue()
+
+def decode_timestamps(data: bytes, count: int) -> List[int]:
+    """Decode ``count`` timestamps written by ``encode_timestamps``."""
+    reader = BitReader(data)
+    timestamps = []
+    previous = 0
+    delta = 0
+    for i in range(count):
+        if i == 0:
+            previous = reader.read(64)
+        else:
+            # Prefix codes 0, 10, 110, 1110, 1111 select the value width
+            for _, prefix_bits, value_bits in ((None, 0, 0),) + _DOD_CLASSES:
+                if not reader.read(1):
+                    break
+            else:
+                value_bits = 64
+            if value_bits:
+                delta += _signed(reader.read(value_bits), value_bits)
+            previous += delta
+        timestamps.append(previous)
+    return timestamps
+
+def _float_bits(value: float) -> int:
+    return struct.unpack("<Q", struct.pack("<d", value))[0]
+
+def _bits_float(bits: int) -> float:
+    return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+def encode_floats(values: Sequence[float]) -> bytes:
+    """Encode floats by XOR against the previous value (Gorilla style)."""
+    writer = BitWriter()
+    previous = 0
+    previous_leading = -1
+    previous_trailing = 0
+    for i, value in enumerate(values):
+        bits = _float_bits(value)
+        if i == 0:
+            writer.write(bits, 64)
+        else:
+            xor = bits ^ previous
+            if xor == 0:
+                writer.write(0, 1)
+            else:
+                leading = min(64 - xor.bit_length(), 31)
+                trailing = (xor & -xor).bit_length() - 1
+                if (
+                    previous_leading >= 0
+                    and leading >= previous_leading
+                    and trailing >= previous_trailing
+                ):
+                    # Fits in the previous meaningful-bit window
+                    writer.write(0b10, 2)
+                    writer.write(xor >> previous_trailing, 64 - previous_leading - previous_trailing)
+                else:
+                    meaningful = 64 - leading - trailing
+                    writer.write(0b11, 2)
+                    writer.write(leading, 5)
+                    writer.write(meaningful - 1, 6)
+                    writer.write(xor >> trailing, meaningful)
+                    previous_leading = leading
+                    previous_trailing = trailing
+        previous = bits
+    return writer.getvalue()
+
+def decode_floats(data: bytes, count: int) -> List[float]:
+    """Decode ``count`` floats written by ``encode_floats``."""
+    reader = BitReader(data)
+    values = []
+    previous = 0
+    leading = 0
+    trailing = 0
+    for i in range(count):
+        if i == 0:
+            previous = reader.read(64)
+        elif reader.read(1):
+            if reader.read(1):
+                leading = reader.read(5)
+                meaningful = reader.read(6) + 1
+                trailing = 64 - leading - meaningful
+            previous ^= reader.read(64 - leading - trailing) << trailing
+        values.append(_bits_float(previous))
+    return values
+
+@dataclass
+class RollupPoint:
+    """Aggregate of the samples in one time bucket."""
+    timestamp: float  # Bucket start, epoch seconds
+    count: float
+    sum: float
+    sum_squares: float
+    min: float
+    max: float
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    def merge(self, other: 'RollupPoint') -> None:
+        """Fold another point's samples into this one."""
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "sum": self.sum
+        }
+
+_CHUNK_COLUMNS = ("count", "sum", "sum_squares", "min", "max")
+
+def encode_chunk(points: Sequence[RollupPoint]) -> bytes:
+    """Encode points as one timestamp stream plus one stream per column."""
+    streams = [encode_timestamps([int(p.timestamp) for p in points])]
+    for column in _CHUNK_COLUMNS:
+        streams.append(encode_floats([getattr(p, column) for p in points]))
+    parts = [struct.pack("<I", len(points))]
+    for stream in streams:
+        parts.append(struct.pack("<I", len(stream)))
+        parts.append(stream)
+    return b"".join(parts)
+
+def decode_chunk(blob: bytes) -> List[RollupPoint]:
+    """Decode a chunk written by ``encode_chunk``."""
+    (count,) = struct.unpack_from("<I", blob, 0)
+    offset = 4
+    streams = []
+    for _ in range(len(_CHUNK_COLUMNS) + 1):
+        (length,) = struct.unpack_from("<I", blob, offset)
+        offset += 4
+        streams.append(blob[offset:offset + length])
+        offset += length
+    
+    timestamps = decode_timestamps(streams[0], count)
+    columns = [decode_floats(stream, count) for stream in streams[1:]]
+    return [
+        RollupPoint(float(timestamp), *row)
+        for timestamp, row in zip(timestamps, zip(*columns))
+    ]
+
+@dataclass
+class _ChunkBuffer:
+    """Points of the chunk currently being filled for one series/resolution."""
+    id: Optional[int] = None
+    points: List[RollupPoint] = field(default_factory=list)
+
+class MetricsArchive:
+    """On-disk metric history with automatic rollups.
+    
+    Samples are binned into 10 second points, which roll up into 1 minute
+    and 1 hour points as buckets close. Each resolution is stored as
+    compressed columnar chunks (delta-of-delta timestamps, XOR-encoded
+    floats) in an SQLite database and expires after its own retention.
+    
+    Range queries stream chunk by chunk at a resolution chosen to keep the
+    result small, so raw history is never loaded into memory. All database
+    work runs on a single dedicated thread.
+    """
+    
+    RESOLUTIONS = (10, 60, 3600)
+    DEFAULT_RETENTION = {
+        10: timedelta(days=1),
+        60: timedelta(days=30),
+        3600: timedelta(days=365)
+    }
+    
+    def __init__(
+        self,
+        path: str,
+        retention: Optional[Dict[int, timedelta]] = None,
+        chunk_points: int = 360
+    ):
+        self.path = path
+        self.retention = {
+            resolution: (retention or self.DEFAULT_RETENTION)[resolution].total_seconds()
+            for resolution in self.RESOLUTIONS
+        }
+        self.chunk_points = chunk_points
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._open: Dict[Tuple[str, int], RollupPoint] = {}
+        self._chunks: Dict[Tuple[str, int], _ChunkBuffer] = {}
+        self._dirty: Set[Tuple[str, int]] = set()
+        self.logger = get_logger(self.__class__.__name__)
+    
+    async def write(
+        self,
+        batches: List[Tuple[str, np.ndarray, np.ndarray]],
+        now: Optional[float] = None
+    ) -> None:
+        """Archive ``(series_key, timestamps, values)`` batches.
+        
+        ``now`` marks how far the batches are complete; buckets ending at or
+        before it are closed and rolled up.
+        """
+        points = [
+            (series_key, rollup_samples(timestamps, values, self.RESOLUTIONS[0]))
+            for series_key, timestamps, values in batches
+        ]
+        await self.write_points(points, now)
+    
+    async def write_points(
+        self,
+        batches: List[Tuple[str, List[RollupPoint]]],
+        now: Optional[float] = None
+    ) -> None:
+        """Archive ``(series_key, points)`` batches of pre-binned points.
+        
+        Points are at the finest resolution, as kept by
+        ``MetricSeries.rollups``.
+        """
+        await self._run(self._write_sync, batches, now or time.time())
+    
+    async def query(
+        self,
+        series_key: str,
+        start: datetime,
+        end: Optional[datetime] = None,
+        resolution: Optional[int] = None,
+        max_points: int = 1000
+    ) -> List[RollupPoint]:
+        """Get rollup points for a series between ``start`` and ``end``.
+        
+        Without ``resolution``, the finest resolution that covers the range
+        in at most ``max_points`` points is used.
+        """
+        end_ts = (end or datetime.now()).timestamp()
+        return await self._run(
+            self._query_sync,
+            series_key,
+            start.timestamp(),
+            end_ts,
+            resolution,
+            max_points
+        )
+    
+    async def summarize(
+        self,
+        series_key: str,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> Dict[str, float]:
+        """Aggregate a series over a range without materializing points."""
+        end_ts = (end or datetime.now()).timestamp()
+        return await self._run(self._summarize_sync, series_key, start.timestamp(), end_ts)
+    
+    async def series_keys(self) -> List[str]:
+        """Get the keys of every archived series."""
+        return await self._run(self._series_keys_sync)
+    
+    async def close(self) -> None:
+        """Close open buckets and the database; it is reopened on next use."""
+        if self._executor is None:
+            return
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+    
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        """Run a database operation on the archive thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="metrics-archive"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS metric_chunks ("
+                "id INTEGER PRIMARY KEY, series_key TEXT NOT NULL, "
+                "resolution INTEGER NOT NULL, start_ts REAL NOT NULL, "
+                "end_ts REAL NOT NULL, points INTEGER NOT NULL, data BLOB NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_metric_chunks_series "
+                "ON metric_chunks(series_key, resolution, start_ts)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_metric_chunks_expiry "
+                "ON metric_chunks(resolution, end_ts)"
+            )
+            self._conn = conn
+            self.logger.info(f"Opened metrics archive {self.path}")
+        return self._conn
+    
+    def _write_sync(
+        self,
+        batches: List[Tuple[str, List[RollupPoint]]],
+        now: float
+    ) -> None:
+        for series_key, points in batches:
+            for point in points:
+                self._fold(series_key, 0, point)
+        self._close_due(now)
+        self._persist(now)
+    
+    def _fold(self, series_key: str, level: int, point: RollupPoint) -> None:
+        """Add a point to the open bucket of a resolution."""
+        resolution = self.RESOLUTIONS[level]
+        start = point.timestamp - point.timestamp % resolution
+        key = (series_key, resolution)
+        bucket = self._open.get(key)
+        if bucket is not None and start == bucket.timestamp:
+            bucket.merge(point)
+            return
+        
+        aligned = RollupPoint(
+            start, point.count, point.sum, point.sum_squares, point.min, point.max
+        )
+        if bucket is not None and start < bucket.timestamp:
+            # Its bucket already closed: store it as a point of its own,
+            # which queries merge with the stored point sharing its timestamp
+            self._close(series_key, level, aligned)
+            return
+        
+        if bucket is not None:
+            self._close(series_key, level, bucket)
+        self._open[key] = aligned
+    
+    def _close(self, series_key: str, level: int, bucket: RollupPoint) -> None:
+        """Store a finished bucket and roll it up into the next resolution."""
+        key = (series_key, self.RESOLUTIONS[level])
+        self._chunks.setdefault(key, _ChunkBuffer()).points.append(bucket)
+        self._dirty.add(key)
+        if level + 1 < len(self.RESOLUTIONS):
+            self._fold(series_key, level + 1, bucket)
+    
+    def _close_due(self, now: float, force: bool = False) -> None:
+        """Close buckets whose time span has fully passed."""
+        for level, resolution in enumerate(self.RESOLUTIONS):
+            for key, bucket in list(self._open.items()):
+                if key[1] == resolution and (force or bucket.timestamp + resolution <= now):
+                    del self._open[key]
+                    self._close(key[0], level, bucket)
+    
+    def _persist(self, now: float) -> None:
+        """Write changed chunks and drop chunks past their retention."""
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            for key in self._dirty:
+                buffer = self._chunks[key]
+                # Late points can leave a chunk out of timestamp order
+                timestamps = [point.timestamp for point in buffer.points]
+                row = (
+                    min(timestamps),
+                    max(timestamps) + key[1],
+                    len(buffer.points),
+                    encode_chunk(buffer.points)
+                )
+                if buffer.id is None:
+                    cursor = conn.execute(
+                        "INSERT INTO metric_chunks "
+                        "(series_key, resolution, start_ts, end_ts, points, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        key + row
+                    )
+                    buffer.id = cursor.lastrowid
+                else:
+                    conn.execute(
+                        "UPDATE metric_chunks SET start_ts = ?, end_ts = ?, "
+                        "points = ?, data = ? WHERE id = ?",
+                        row + (buffer.id,)
+                    )
+                if len(buffer.points) >= self.chunk_points:
+                    # Sealed; the next point starts a new chunk
+                    del self._chunks[key]
+            
+            for resolution, retention in self.retention.items():
+                conn.execute(
+                    "DELETE FROM metric_chunks WHERE resolution = ? AND end_ts < ?",
+                    (resolution, now - retention)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._dirty.clear()
+    
+    def _choose_resolution(self, start: float, end: float, max_points: int) -> int:
+        now = time.time()
+        for resolution in self.RESOLUTIONS:
+            if start >= now - self.retention[resolution] and (end - start) / resolution <= max_points:
+                return resolution
+        return self.RESOLUTIONS[-1]
+    
+    def _iter_points(
+        self,
+        series_key: str,
+        resolution: int,
+        start: float,
+        end: float
+    ) -> Iterator[RollupPoint]:
+        """Yield stored and open points overlapping ``[start, end]``."""
+        rows = self._connection().execute(
+            "SELECT data FROM metric_chunks WHERE series_key = ? AND resolution = ? "
+            "AND end_ts > ? AND start_ts <= ? ORDER BY start_ts",
+            (series_key, resolution, start, end)
+        )
+        for (blob,) in rows:
+            for point in decode_chunk(blob):
+                if start - resolution < point.timestamp <= end:
+                    yield point
+        
+        bucket = self._open.get((series_key, resolution))
+        if bucket is not None and start - resolution < bucket.timestamp <= end:
+            yield bucket
+    
+    def _query_sync(
+        self,
+        series_key: str,
+        start: float,
+        end: float,
+        resolution: Optional[int],
+        max_points: int
+    ) -> List[RollupPoint]:
+        resolution = resolution or self._choose_resolution(start, end, max_points)
+        merged: Dict[float, RollupPoint] = {}
+        for point in self._iter_points(series_key, resolution, start, end):
+            existing = merged.get(point.timestamp)
+            if existing is None:
+                # Copy so callers never alias open buckets
+                merged[point.timestamp] = RollupPoint(
+                    point.timestamp, point.count, point.sum,
+                    point.sum_squares, point.min, point.max
+                )
+            else:
+                # Buckets split across restarts share a timestamp
+                existing.merge(point)
+        return [merged[timestamp] for timestamp in sorted(merged)]
+    
+    def _summarize_sync(self, series_key: str, start: float, end: float) -> Dict[str, float]:
+        resolution = self._choose_resolution(start, end, 10_000)
+        total = None
+        for point in self._iter_points(series_key, resolution, start, end):
+            if total is None:
+                total = RollupPoint(
+                    start, point.count, point.sum,
+                    point.sum_squares, point.min, point.max
+                )
+            else:
+                total.merge(point)
+        if total is None or not total.count:
+            return {}
+        
+        variance = 0.0
+        if total.count > 1:
+            variance = max(
+                0.0,
+                (total.sum_squares - total.sum ** 2 / total.count) / (total.count - 1)
+            )
+        return {
+            "count": total.count,
+            "sum": total.sum,
+            "mean": total.mean,
+            "min": total.min,
+            "max": total.max,
+            "stddev": math.sqrt(variance),
+            "resolution": resolution
+        }
+    
+    def _series_keys_sync(self) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT DISTINCT series_key FROM metric_chunks ORDER BY series_key"
+        )
+        keys = {row[0] for row in rows}
+        keys.update(key for key, _ in self._open)
+        return sorted(keys)
+    
+    def _close_sync(self) -> None:
+        if self._open:
+            self._close_due(time.time(), force=True)
+            self._persist(time.time())
+        self._chunks.clear()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def rollup_samples(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    resolution: float,
+    weights: Optional[np.ndarray] = None
+) -> List[RollupPoint]:
+    """Aggregate in-order samples into points of ``resolution`` seconds.
+    
+    ``weights`` counts each sample as that many observations.
+    """
+    if not len(values):
+        return []
+    if weights is None:
+        weights = np.ones(len(values))
+    starts = timestamps - timestamps % resolution
+    boundaries = np.flatnonzero(np.diff(starts)) + 1
+    offsets = np.concatenate(([0], boundaries))
+    counts = np.add.reduceat(weights, offsets)
+    sums = np.add.reduceat(values * weights, offsets)
+    squares = np.add.reduceat(values * values * weights, offsets)
+    minimums = np.minimum.reduceat(values, offsets)
+    maximums = np.maximum.reduceat(values, offsets)
+    return [
+        RollupPoint(float(starts[offset]), count, s, sq, lo, hi)
+        for offset, count, s, sq, lo, hi in zip(
+            offsets.tolist(),
+            counts.tolist(),
+            sums.tolist(),
+            squares.tolist(),
+            minimums.tolist(),
+            maximums.tolist()
+        )
+    ]
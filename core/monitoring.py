@@ -1,19 +1,28 @@
 """Monitoring and metrics collection system for Arcana Agent Framework."""
 
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
+import bisect
+import functools
+import itertools
 import json
-import statistics
+import math
+import re
+from collections import deque
 from dataclasses import dataclass, asdict
 from enum import Enum
-import psutil
+import numpy as np
 import time
 
 from .logging_config import get_logger
+from .metrics_archive import MetricsArchive, RollupPoint, rollup_samples
+from .system_sampler import SystemSampler, system_sampler
 
 logger = get_logger(__name__)
 
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
 class MetricType(Enum):
     """Types of metrics that can be collected."""
     COUNTER = "counter"      # Monotonically increasing value
@@ -41,53 +50,722 @@ class SystemMetrics:
     thread_count: int
     timestamp: datetime
 
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error.
+    
+    Values are counted in logarithmically sized buckets (DDSketch style), so
+    any reported quantile is within ``relative_accuracy`` of the true value.
+    Sketches with the same accuracy merge exactly by adding bucket counts,
+    which makes them safe to combine across time slots or worker processes.
+    Quantile queries bisect a cumulative index that is rebuilt lazily after
+    the sketch changes.
+    """
+    
+    MIN_INDEXABLE = 1e-9
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._cumulative: Optional[List[int]] = None
+        self._bucket_values: List[float] = []
+    
+    def add(self, value: float) -> None:
+        """Add a value to the sketch."""
+        if value > self.MIN_INDEXABLE:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._positive[key] = self._positive.get(key, 0) + 1
+        elif value < -self.MIN_INDEXABLE:
+            key = math.ceil(math.log(-value) / self._log_gamma)
+            self._negative[key] = self._negative.get(key, 0) + 1
+        else:
+            self._zero += 1
+        
+        self.count += 1
+        self.sum += value
+        self._cumulative = None
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def add_many(self, values: np.ndarray) -> None:
+        """Add an array of values to the sketch."""
+        if not len(values):
+            return
+        positive = values[values > self.MIN_INDEXABLE]
+        negative = -values[values < -self.MIN_INDEXABLE]
+        for store, magnitudes in ((self._positive, positive), (self._negative, negative)):
+            if len(magnitudes):
+                keys, counts = np.unique(
+                    np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                    return_counts=True
+                )
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+        self._zero += len(values) - len(positive) - len(negative)
+        
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self._cumulative = None
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+    
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Merge another sketch into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other._positive.items():
+            self._positive[key] = self._positive.get(key, 0) + count
+        for key, count in other._negative.items():
+            self._negative[key] = self._negative.get(key, 0) + count
+        self._zero += other._zero
+        self._cumulative = None
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the estimated value at quantile ``q`` (0 <= q <= 1)."""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        if not self.count:
+            return None
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        
+        if self._cumulative is None:
+            self._build_index()
+        
+        rank = q * (self.count - 1)
+        index = bisect.bisect_right(self._cumulative, rank)
+        return self._clamp(self._bucket_values[index])
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch for shipping between processes."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(k): v for k, v in self._positive.items()},
+            "negative": {str(k): v for k, v in self._negative.items()},
+            "zero": self._zero,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Rebuild a sketch serialized with ``to_dict``."""
+        sketch = cls(data["relative_accuracy"])
+        sketch._positive = {int(k): v for k, v in data["positive"].items()}
+        sketch._negative = {int(k): v for k, v in data["negative"].items()}
+        sketch._zero = data["zero"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+    
+    def _build_index(self) -> None:
+        """Order buckets by value with cumulative counts for bisection."""
+        buckets = [
+            (-self._bucket_value(key), count)
+            for key, count in sorted(self._negative.items(), reverse=True)
+        ]
+        if self._zero:
+            buckets.append((0.0, self._zero))
+        buckets.extend(
+            (self._bucket_value(key), count)
+            for key, count in sorted(self._positive.items())
+        )
+        self._bucket_values = [value for value, _ in buckets]
+        self._cumulative = list(itertools.accumulate(count for _, count in buckets))
+    
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+    
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.min), self.max)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class MetricSeries:
+    """Samples and running values for one metric name and label set.
+    
+    Timestamps and values live in float64 ring buffers that grow
+    geometrically up to ``capacity``; once full, new samples overwrite the
+    oldest ones. Samples are stamped at record time, so they arrive in
+    timestamp order and the window can be trimmed by advancing the head index.
+    
+    Alongside the raw samples, each series keeps a quantile sketch per time
+    slot of ``slot_width`` seconds. Whole slots expire together, so
+    quantiles cover the window rounded out to one slot.
+    
+    Running values are never trimmed: ``total`` and ``observations`` back
+    counter and summary output, ``last`` backs gauges, and histogram series
+    count observations into ``buckets``. When archiving, ``rollups`` holds
+    per-bucket aggregates of every sample since the last archive pass, so
+    history does not depend on what the ring buffer still holds.
+    
+    ``version`` changes whenever the series does, so derived summaries can be
+    cached until it moves.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        metric_type: MetricType,
+        labels: LabelSet = (),
+        capacity: int = 4096,
+        initial_capacity: int = 64,
+        slot_width: float = 10.0,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.type = metric_type
+        self.labels = labels
+        self.label_text = ",".join(
+            f'{_sanitize_name(k)}="{_escape_label_value(v)}"'
+            for k, v in labels
+        )
+        self.capacity = capacity
+        size = min(initial_capacity, capacity)
+        self._timestamps = np.zeros(size, dtype=np.float64)
+        self._values = np.zeros(size, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self.slot_width = slot_width
+        self._slots: Deque[Tuple[int, QuantileSketch]] = deque()
+        self._sketch: Optional[QuantileSketch] = None
+        
+        # Running values
+        self.total = 0.0
+        self.observations = 0
+        self.last = 0.0
+        self.bucket_bounds = buckets if metric_type == MetricType.HISTOGRAM else ()
+        self.bucket_counts = [0] * (len(self.bucket_bounds) + 1)
+        
+        self.components: List[str] = []
+        self.version = 0
+        self.rollups: Dict[float, RollupPoint] = {}
+        self._summary: Optional[Dict[str, Any]] = None
+        self._summary_version = -1
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def observe(self, value: float, weight: int = 1) -> None:
+        """Update the running values with an observation.
+        
+        ``weight`` counts a sampled observation as that many observations.
+        """
+        self.total += value * weight
+        self.observations += weight
+        self.last = value
+        self.version += 1
+        if self.bucket_bounds:
+            self.bucket_counts[bisect.bisect_left(self.bucket_bounds, value)] += weight
+    
+    def roll_up(self, timestamp: float, value: float, weight: int, resolution: float) -> None:
+        """Add a sample to the pending rollup of its archive bucket."""
+        start = timestamp - timestamp % resolution
+        point = self.rollups.get(start)
+        if point is None:
+            self.rollups[start] = RollupPoint(
+                start, weight, value * weight, value * value * weight, value, value
+            )
+        else:
+            point.count += weight
+            point.sum += value * weight
+            point.sum_squares += value * value * weight
+            point.min = min(point.min, value)
+            point.max = max(point.max, value)
+    
+    def roll_up_many(
+        self,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        weight: int,
+        resolution: float
+    ) -> None:
+        """Add a batch of in-order samples to the pending rollups."""
+        weights = np.full(len(values), float(weight))
+        for point in rollup_samples(timestamps, values, resolution, weights):
+            existing = self.rollups.get(point.timestamp)
+            if existing is None:
+                self.rollups[point.timestamp] = point
+            else:
+                existing.merge(point)
+    
+    def take_rollups(self) -> List[RollupPoint]:
+        """Remove and return the pending rollups, oldest first."""
+        rollups, self.rollups = self.rollups, {}
+        return [rollups[start] for start in sorted(rollups)]
+    
+    def append(self, timestamp: float, value: float) -> None:
+        """Append a sample, overwriting the oldest one when full."""
+        size = len(self._values)
+        if self._count == size and size < self.capacity:
+            self._grow(min(size * 2, self.capacity))
+            size = len(self._values)
+        
+        if self._count == size:
+            # Full: overwrite the oldest sample
+            index = self._head
+            self._head = (self._head + 1) % size
+        else:
+            index = (self._head + self._count) % size
+            self._count += 1
+        
+        self._timestamps[index] = timestamp
+        self._values[index] = value
+        
+        slot = int(timestamp // self.slot_width)
+        if not self._slots or slot > self._slots[-1][0]:
+            self._slots.append((slot, QuantileSketch()))
+        self._slots[-1][1].add(value)
+        self._sketch = None
+    
+    def extend(
+        self,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        weight: int = 1
+    ) -> None:
+        """Add a batch of in-order samples in one vectorized step."""
+        count = len(values)
+        if not count:
+            return
+        
+        # Running values
+        self.total += float(values.sum()) * weight
+        self.observations += count * weight
+        self.last = float(values[-1])
+        self.version += 1
+        if self.bucket_bounds:
+            indexes = np.searchsorted(self.bucket_bounds, values, side="left")
+            counts = np.bincount(indexes, minlength=len(self.bucket_counts))
+            for i, bucket_count in enumerate(counts.tolist()):
+                self.bucket_counts[i] += bucket_count * weight
+        
+        # Ring buffer: only the newest ``capacity`` samples can be kept
+        if count > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            values = values[-self.capacity:]
+        size = len(self._values)
+        while self._count + len(values) > size and size < self.capacity:
+            self._grow(min(size * 2, self.capacity))
+            size = len(self._values)
+        indexes = (self._head + self._count + np.arange(len(values))) % size
+        self._timestamps[indexes] = timestamps
+        self._values[indexes] = values
+        overflow = self._count + len(values) - size
+        if overflow > 0:
+            self._head = (self._head + overflow) % size
+            self._count = size
+        else:
+            self._count += len(values)
+        
+        # Quantile sketches, per time slot
+        slots = (timestamps // self.slot_width).astype(np.int64)
+        for slot in np.unique(slots).tolist():
+            if not self._slots or slot > self._slots[-1][0]:
+                self._slots.append((slot, QuantileSketch()))
+            self._slots[-1][1].add_many(values[slots == slot])
+        self._sketch = None
+    
+    def trim(self, cutoff: float) -> None:
+        """Drop samples at or before ``cutoff`` from the head of the buffer."""
+        size = len(self._values)
+        timestamps = self._timestamps
+        while self._count and timestamps[self._head] <= cutoff:
+            self._head = (self._head + 1) % size
+            self._count -= 1
+        
+        while self._slots and (self._slots[0][0] + 1) * self.slot_width <= cutoff:
+            self._slots.popleft()
+            self._sketch = None
+            self.version += 1
+    
+    def summary(self) -> Dict[str, Any]:
+        """Snapshot of running values and window statistics.
+        
+        Cached until the series next changes.
+        """
+        if self._summary_version == self.version:
+            return self._summary
+        
+        sketch = self.sketch()
+        summary = {
+            "name": self.name,
+            "type": self.type.value,
+            "labels": dict(self.labels),
+            "components": list(self.components),
+            "observations": self.observations
+        }
+        if self.type == MetricType.COUNTER:
+            summary["value"] = self.total
+        elif self.type == MetricType.GAUGE:
+            summary["value"] = self.last
+        else:
+            summary["sum"] = self.total
+        
+        window = {"count": sketch.count}
+        if sketch.count:
+            window.update(
+                min=sketch.min,
+                max=sketch.max,
+                mean=sketch.sum / sketch.count
+            )
+            if self.type in (MetricType.HISTOGRAM, MetricType.TIMER):
+                for q in MetricsAggregator.QUANTILES:
+                    window[quantile_key(q)] = sketch.quantile(q)
+        summary["window"] = window
+        
+        self._summary = summary
+        self._summary_version = self.version
+        return summary
+    
+    @property
+    def key(self) -> str:
+        """Display key, e.g. ``messages_sent{agent="alpha"}``."""
+        return f"{self.name}{_braces(self.label_text)}"
+    
+    def sketch(self) -> QuantileSketch:
+        """Return a quantile sketch covering the current window."""
+        if self._sketch is None:
+            merged = QuantileSketch()
+            for _, slot_sketch in self._slots:
+                merged.merge(slot_sketch)
+            self._sketch = merged
+        return self._sketch
+    
+    def values(self) -> np.ndarray:
+        """Return the buffered values, oldest first."""
+        return self._ordered(self._values)
+    
+    def timestamps(self) -> np.ndarray:
+        """Return the buffered timestamps, oldest first."""
+        return self._ordered(self._timestamps)
+    
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        end = self._head + self._count
+        if end <= len(array):
+            return array[self._head:end]
+        return np.concatenate((array[self._head:], array[:end - len(array)]))
+    
+    def _grow(self, new_size: int) -> None:
+        timestamps = self.timestamps()
+        values = self.values()
+        self._timestamps = np.zeros(new_size, dtype=np.float64)
+        self._values = np.zeros(new_size, dtype=np.float64)
+        self._timestamps[:self._count] = timestamps
+        self._values[:self._count] = values
+        self._head = 0
+
+class MetricFamily:
+    """All series sharing a metric name, keyed by interned label set."""
+    
+    def __init__(self, name: str, metric_type: MetricType):
+        self.name = name
+        self.type = metric_type
+        self.series: Dict[LabelSet, MetricSeries] = {}
+        self._summary: Optional[Dict[str, Any]] = None
+        self._summary_version: Optional[Tuple[int, int]] = None
+    
+    def summary(self) -> Dict[str, Any]:
+        """Roll-up across label sets, cached until any series changes."""
+        version = (len(self.series), sum(s.version for s in self.series.values()))
+        if self._summary_version == version:
+            return self._summary
+        
+        series = list(self.series.values())
+        summary = {
+            "type": self.type.value,
+            "series": len(series),
+            "observations": sum(s.observations for s in series)
+        }
+        if self.type == MetricType.GAUGE:
+            summary["value"] = series[-1].last if series else 0.0
+        else:
+            summary["total"] = sum(s.total for s in series)
+        
+        self._summary = summary
+        self._summary_version = version
+        return summary
+
 class MetricsAggregator:
     """Aggregates metrics over time windows."""
     
-    def __init__(self, window_size: timedelta = timedelta(minutes=1)):
+    QUANTILES = (0.5, 0.95, 0.99)
+    SKETCH_SLOTS = 6
+    
+    def __init__(
+        self,
+        window_size: timedelta = timedelta(minutes=1),
+        series_capacity: int = 4096,
+        histogram_buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
         self.window_size = window_size
-        self.metrics: Dict[str, List[Metric]] = {}
+        self.series_capacity = series_capacity
+        self.histogram_buckets = tuple(sorted(histogram_buckets))
+        self.rollup_resolution: Optional[float] = None     # Set when archiving
+        self._window_seconds = window_size.total_seconds()
+        self.slot_width = self._window_seconds / self.SKETCH_SLOTS
+        self.metrics: Dict[str, MetricFamily] = {}
+        self._label_sets: Dict[LabelSet, LabelSet] = {(): ()}
+        self._flush_hooks: List[Callable[[], None]] = []
+        
+        # Secondary indexes: series by component and by (label, value)
+        self._by_component: Dict[str, Dict[Tuple[str, LabelSet], MetricSeries]] = {}
+        self._by_label: Dict[Tuple[str, str], Dict[Tuple[str, LabelSet], MetricSeries]] = {}
         self.logger = get_logger(self.__class__.__name__)
     
+    def intern_labels(self, labels: Optional[Dict[str, str]]) -> LabelSet:
+        """Return the canonical label tuple for a label dict."""
+        if not labels:
+            return ()
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        return self._label_sets.setdefault(key, key)
+    
     def add_metric(self, metric: Metric) -> None:
         """Add a metric to the aggregator."""
-        if metric.name not in self.metrics:
-            self.metrics[metric.name] = []
+        self.add_sample(
+            metric.name,
+            metric.type,
+            metric.value,
+            metric.timestamp.timestamp(),
+            metric.labels,
+            metric.component
+        )
+    
+    def add_sample(
+        self,
+        name: str,
+        metric_type: MetricType,
+        value: float,
+        timestamp: float,
+        labels: Optional[Dict[str, str]] = None,
+        component: Optional[str] = None
+    ) -> None:
+        """Add a raw sample (epoch-seconds timestamp) to its series."""
+        series = self.get_series(name, labels, metric_type, component)
+        self.observe(series, value, timestamp)
+    
+    def observe(
+        self,
+        series: MetricSeries,
+        value: float,
+        timestamp: float,
+        weight: int = 1
+    ) -> None:
+        """Add a sample to an already resolved series."""
+        series.observe(value, weight)
+        if self.rollup_resolution is not None:
+            series.roll_up(timestamp, value, weight, self.rollup_resolution)
         
-        # Add new metric
-        self.metrics[metric.name].append(metric)
+        # Remove old metrics; a sample already outside the window is dropped
+        cutoff = time.time() - self._window_seconds
+        if timestamp > cutoff:
+            series.append(timestamp, value)
+        series.trim(cutoff)
+    
+    def observe_many(
+        self,
+        series: MetricSeries,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        weight: int = 1
+    ) -> None:
+        """Add a batch of in-order samples to an already resolved series."""
+        cutoff = time.time() - self._window_seconds
+        series.extend(timestamps, values, weight)
+        if self.rollup_resolution is not None:
+            series.roll_up_many(timestamps, values, weight, self.rollup_resolution)
+        series.trim(cutoff)
+    
+    def add_flush_hook(self, hook: Callable[[], None]) -> None:
+        """Register a callback that pushes buffered samples into series."""
+        self._flush_hooks.append(hook)
+    
+    def flush(self) -> None:
+        """Push samples buffered by timer handles into their series."""
+        for hook in self._flush_hooks:
+            hook()
+    
+    def get_series(
+        self,
+        name: str,
+        labels: Optional[Dict[str, str]] = None,
+        metric_type: Optional[MetricType] = None,
+        component: Optional[str] = None
+    ) -> Optional[MetricSeries]:
+        """Look up a series, creating it when ``metric_type`` is given.
         
-        # Remove old metrics
-        cutoff = datetime.now() - self.window_size
-        self.metrics[metric.name] = [
-            m for m in self.metrics[metric.name]
-            if m.timestamp > cutoff
-        ]
+        A ``component`` is attached to the series and indexed the first time
+        it records into it.
+        """
+        family = self.metrics.get(name)
+        if family is None:
+            if metric_type is None:
+                return None
+            family = MetricFamily(name, metric_type)
+            self.metrics[name] = family
+        
+        label_set = self.intern_labels(labels)
+        series = family.series.get(label_set)
+        if series is None and metric_type is not None:
+            series = MetricSeries(
+                name,
+                family.type,
+                label_set,
+                self.series_capacity,
+                slot_width=self.slot_width,
+                buckets=self.histogram_buckets
+            )
+            family.series[label_set] = series
+            for label in label_set:
+                self._by_label.setdefault(label, {})[(name, label_set)] = series
+        
+        if component and series is not None and component not in series.components:
+            series.components.append(component)
+            self._by_component.setdefault(component, {})[(name, label_set)] = series
+        return series
     
-    def get_statistics(self, metric_name: str) -> Dict[str, float]:
-        """Get statistical summary of a metric."""
-        if metric_name not in self.metrics:
-            return {}
+    def get_series_by_component(self, component: str) -> List[MetricSeries]:
+        """Series recorded by ``component``, in creation order."""
+        return list(self._by_component.get(component, {}).values())
+    
+    def get_series_by_label(self, label: str, value: str) -> List[MetricSeries]:
+        """Series carrying ``label=value``, in creation order."""
+        return list(self._by_label.get((label, str(value)), {}).values())
+    
+    def get_summaries(self, series: List[MetricSeries]) -> Dict[str, Dict[str, Any]]:
+        """Cached summaries of ``series``, keyed by display key."""
+        self.flush()
+        return {s.key: s.summary() for s in series}
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Overview of every metric family and component.
         
-        values = [m.value for m in self.metrics[metric_name]]
-        if not values:
+        Family roll-ups are cached and only recomputed for families whose
+        series changed since the previous call.
+        """
+        self.flush()
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "series": sum(len(family.series) for family in self.metrics.values()),
+            "components": {
+                component: len(index)
+                for component, index in self._by_component.items()
+            },
+            "metrics": {
+                name: family.summary()
+                for name, family in self.metrics.items()
+            }
+        }
+    
+    def get_statistics(
+        self,
+        metric_name: str,
+        labels: Optional[Dict[str, str]] = None
+    ) -> Dict[str, float]:
+        """Get statistical summary of a metric.
+        
+        Without ``labels`` the summary spans every label set of the metric.
+        """
+        self.flush()
+        selected = self._select(metric_name, labels)
+        if not selected:
+            return {}
+        if len(selected) == 1:
+            values = selected[0].values()
+        else:
+            values = np.concatenate([series.values() for series in selected])
+        count = len(values)
+        if not count:
             return {}
         
         stats = {
-            "count": len(values),
-            "min": min(values),
-            "max": max(values),
-            "mean": statistics.mean(values),
-            "median": statistics.median(values),
-            "sum": sum(values)
+            "count": count,
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "sum": float(values.sum())
         }
+        stats["stddev"] = float(values.std(ddof=1)) if count > 1 else 0.0
         
-        try:
-            stats["stddev"] = statistics.stdev(values)
-        except statistics.StatisticsError:
-            stats["stddev"] = 0.0
+        sketch = self.get_sketch(metric_name, labels)
+        for q in self.QUANTILES:
+            stats[quantile_key(q)] = sketch.quantile(q)
         
         return stats
+    
+    def get_sketch(
+        self,
+        metric_name: str,
+        labels: Optional[Dict[str, str]] = None
+    ) -> Optional[QuantileSketch]:
+        """Get the windowed quantile sketch of a metric, for merging."""
+        self.flush()
+        selected = self._select(metric_name, labels)
+        if not selected:
+            return None
+        if len(selected) == 1:
+            return selected[0].sketch()
+        
+        merged = QuantileSketch()
+        for series in selected:
+            merged.merge(series.sketch())
+        return merged
+    
+    def _select(
+        self,
+        metric_name: str,
+        labels: Optional[Dict[str, str]]
+    ) -> List[MetricSeries]:
+        if labels is not None:
+            series = self.get_series(metric_name, labels)
+            return [series] if series is not None else []
+        family = self.metrics.get(metric_name)
+        return list(family.series.values()) if family else []
+
+def quantile_key(q: float) -> str:
+    """Statistics key for a quantile, e.g. 0.95 -> 'p95'."""
+    return f"p{q * 100:g}"
+
+def _sanitize_name(name: str) -> str:
+    """Make a metric or label name valid for Prometheus."""
+    name = _INVALID_NAME_CHARS.sub("_", name)
+    return name if not name[:1].isdigit() else f"_{name}"
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    """Format a sample value for Prometheus exposition."""
+    if value is None or math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
 
 class MetricsCollector:
     """Collects and manages metrics."""
@@ -95,12 +773,22 @@ class MetricsCollector:
     def __init__(
         self,
         aggregation_window: timedelta = timedelta(minutes=1),
-        system_metrics_interval: float = 60.0
+        system_metrics_interval: float = 60.0,
+        sampler: Optional[SystemSampler] = None,
+        archive: Optional[MetricsArchive] = None,
+        archive_interval: float = 10.0
     ):
         self.aggregator = MetricsAggregator(aggregation_window)
         self.system_metrics_interval = system_metrics_interval
+        self.sampler = sampler or system_sampler
+        self.archive = archive
+        self.archive_interval = archive_interval
+        if archive is not None:
+            self.aggregator.rollup_resolution = MetricsArchive.RESOLUTIONS[0]
+        self._timers: Dict[Tuple[str, str, LabelSet, float], TimerHandle] = {}
         self._running = False
         self._system_metrics_task: Optional[asyncio.Task] = None
+        self._archive_task: Optional[asyncio.Task] = None
         self.logger = get_logger(self.__class__.__name__)
     
     async def start(self) -> None:
@@ -109,20 +797,32 @@ class MetricsCollector:
             return
         
         self._running = True
+        self.sampler.acquire()
         self._system_metrics_task = asyncio.create_task(
             self._collect_system_metrics()
         )
+        if self.archive is not None:
+            self._archive_task = asyncio.create_task(self._archive_periodically())
         self.logger.info("Metrics collector started")
     
     async def stop(self) -> None:
         """Stop metrics collection."""
+        if not self._running:
+            return
+        
         self._running = False
-        if self._system_metrics_task:
-            self._system_metrics_task.cancel()
-            try:
-                await self._system_metrics_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._system_metrics_task, self._archive_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.sampler.release()
+        
+        if self.archive is not None:
+            await self.archive_metrics()
+            await self.archive.close()
         self.logger.info("Metrics collector stopped")
     
     def record(
@@ -134,15 +834,99 @@ class MetricsCollector:
         labels: Optional[Dict[str, str]] = None
     ) -> None:
         """Record a metric."""
-        metric = Metric(
-            name=name,
-            type=metric_type,
-            value=value,
-            timestamp=datetime.now(),
-            labels=labels or {},
-            component=component
+        self.aggregator.add_sample(
+            name,
+            metric_type,
+            value,
+            time.time(),
+            labels or {},
+            component
         )
-        self.aggregator.add_metric(metric)
+    
+    def timer(
+        self,
+        name: str,
+        component: str,
+        labels: Optional[Dict[str, str]] = None,
+        sample_rate: float = 1.0
+    ) -> 'TimerHandle':
+        """Get a pre-registered timer handle, creating it on first use."""
+        key = (name, component, self.aggregator.intern_labels(labels), sample_rate)
+        handle = self._timers.get(key)
+        if handle is None:
+            handle = TimerHandle(self, name, component, labels, sample_rate)
+            self._timers[key] = handle
+        return handle
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Overview of all metrics, for dashboards."""
+        return self.aggregator.get_summary()
+    
+    def get_metrics_by_component(self, component: str) -> Dict[str, Dict[str, Any]]:
+        """Summaries of every series recorded by ``component``."""
+        return self.aggregator.get_summaries(
+            self.aggregator.get_series_by_component(component)
+        )
+    
+    def get_metrics_by_label(self, label: str, value: str) -> Dict[str, Dict[str, Any]]:
+        """Summaries of every series carrying ``label=value``."""
+        return self.aggregator.get_summaries(
+            self.aggregator.get_series_by_label(label, value)
+        )
+    
+    async def archive_metrics(self) -> None:
+        """Push samples recorded since the last call into the archive."""
+        if self.archive is None:
+            return
+        
+        now = time.time()
+        self.aggregator.flush()
+        batches = [
+            (series.key, series.take_rollups())
+            for family in self.aggregator.metrics.values()
+            for series in family.series.values()
+            if series.rollups
+        ]
+        await self.archive.write_points(batches, now)
+    
+    async def compare_with_history(
+        self,
+        series_key: str,
+        value: float,
+        lookback: timedelta = timedelta(days=7),
+        min_samples: int = 10
+    ) -> Optional[Dict[str, float]]:
+        """Z-score of a value against the archived baseline of a series.
+        
+        The baseline is aggregated from archive rollups over ``lookback``,
+        so raw samples are never loaded. Returns None without an archive,
+        with fewer than ``min_samples`` archived samples or with a flat
+        baseline.
+        """
+        if self.archive is None:
+            return None
+        
+        baseline = await self.archive.summarize(series_key, datetime.now() - lookback)
+        if baseline.get("count", 0) < min_samples or not baseline["stddev"]:
+            return None
+        return {
+            "value": value,
+            "baseline_mean": baseline["mean"],
+            "baseline_stddev": baseline["stddev"],
+            "baseline_count": baseline["count"],
+            "zscore": abs(value - baseline["mean"]) / baseline["stddev"]
+        }
+    
+    async def _archive_periodically(self) -> None:
+        """Archive new samples every ``archive_interval`` seconds."""
+        while self._running:
+            try:
+                await asyncio.sleep(self.archive_interval)
+                await self.archive_metrics()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error archiving metrics: {str(e)}")
     
     async def _collect_system_metrics(self) -> None:
         """Collect system metrics periodically."""
@@ -157,14 +941,15 @@ class MetricsCollector:
                 await asyncio.sleep(1)  # Brief pause before retry
     
     def _get_system_metrics(self) -> SystemMetrics:
-        """Get current system metrics."""
+        """Get current system metrics from the sampler's latest snapshot."""
+        snapshot = self.sampler.snapshot
         return SystemMetrics(
-            cpu_percent=psutil.cpu_percent(),
-            memory_percent=psutil.virtual_memory().percent,
-            disk_usage_percent=psutil.disk_usage('/').percent,
-            open_files=len(psutil.Process().open_files()),
-            thread_count=psutil.Process().num_threads(),
-            timestamp=datetime.now()
+            cpu_percent=snapshot.cpu_percent,
+            memory_percent=snapshot.memory_percent,
+            disk_usage_percent=snapshot.disk_usage_percent,
+            open_files=snapshot.open_files,
+            thread_count=snapshot.thread_count,
+            timestamp=snapshot.timestamp
         )
     
     def _record_system_metrics(self, metrics: SystemMetrics) -> None:
@@ -197,31 +982,262 @@ class MetricsExporter:
         return json.dumps(metrics_dict, indent=2)
     
     def export_prometheus(self) -> str:
-        """Export metrics in Prometheus format."""
+        """Export metrics in Prometheus text exposition format.
+        
+        Output is one line per series (plus buckets or quantiles), built from
+        running values rather than the raw samples in the window.
+        """
         lines = []
-        for name, metrics in self.collector.aggregator.metrics.items():
-            if not metrics:
+        self.collector.aggregator.flush()
+        for family in self.collector.aggregator.metrics.values():
+            if not family.series:
                 continue
             
+            name = _sanitize_name(family.name)
+            kind = _PROMETHEUS_TYPES[family.type]
+            
             # Add metric help and type
-            lines.append(f"# HELP {name} {name}")
-            lines.append(f"# TYPE {name} {metrics[0].type.value}")
+            lines.append(f"# HELP {name} {family.name}")
+            lines.append(f"# TYPE {name} {kind}")
             
-            # Add metric values
-            for metric in metrics:
-                labels = ",".join(
-                    f'{k}="{v}"'
-                    for k, v in metric.labels.items()
-                )
-                if labels:
-                    lines.append(f'{name}{{{labels}}} {metric.value}')
+            for series in family.series.values():
+                if kind == "histogram":
+                    lines.extend(self._histogram_lines(name, series))
+                elif kind == "summary":
+                    lines.extend(self._summary_lines(name, series))
                 else:
-                    lines.append(f'{name} {metric.value}')
+                    value = series.total if kind == "counter" else series.last
+                    lines.append(
+                        f"{name}{_braces(series.label_text)} {_format_value(value)}"
+                    )
         
         return "\n".join(lines)
+    
+    def _histogram_lines(self, name: str, series: MetricSeries) -> List[str]:
+        """Render cumulative bucket counts for a histogram series."""
+        lines = []
+        cumulative = 0
+        bounds = series.bucket_bounds + (math.inf,)
+        for bound, count in zip(bounds, series.bucket_counts):
+            cumulative += count
+            labels = _join_labels(series.label_text, f'le="{_format_value(bound)}"')
+            lines.append(f"{name}_bucket{{{labels}}} {cumulative}")
+        braces = _braces(series.label_text)
+        lines.append(f"{name}_sum{braces} {_format_value(series.total)}")
+        lines.append(f"{name}_count{braces} {series.observations}")
+        return lines
+    
+    def _summary_lines(self, name: str, series: MetricSeries) -> List[str]:
+        """Render windowed quantiles and running totals for a summary."""
+        lines = []
+        sketch = series.sketch()
+        for q in MetricsAggregator.QUANTILES:
+            labels = _join_labels(series.label_text, f'quantile="{q}"')
+            lines.append(f"{name}{{{labels}}} {_format_value(sketch.quantile(q))}")
+        braces = _braces(series.label_text)
+        lines.append(f"{name}_sum{braces} {_format_value(series.total)}")
+        lines.append(f"{name}_count{braces} {series.observations}")
+        return lines
+
+_PROMETHEUS_TYPES = {
+    MetricType.COUNTER: "counter",
+    MetricType.GAUGE: "gauge",
+    MetricType.HISTOGRAM: "histogram",
+    MetricType.TIMER: "summary"
+}
+
+def _braces(label_text: str) -> str:
+    return f"{{{label_text}}}" if label_text else ""
+
+def _join_labels(label_text: str, extra: str) -> str:
+    return f"{label_text},{extra}" if label_text else extra
+
+class TimerHandle:
+    """Pre-registered timer for hot-path instrumentation.
+    
+    The duration series is resolved once and timing uses ``perf_counter_ns``.
+    A measurement is two list appends; measurements are pushed into the
+    series in vectorized batches when the buffer fills or whenever the
+    aggregator is read. With ``sample_rate`` below 1, only every Nth call is
+    timed and it is counted N times in running totals. Errors are always
+    counted. Use ``time()`` as a (sync or async) context manager, or the
+    handle itself as a decorator.
+    """
+    
+    BUFFER_SIZE = 256
+    
+    def __init__(
+        self,
+        collector: MetricsCollector,
+        name: str,
+        component: str,
+        labels: Optional[Dict[str, str]] = None,
+        sample_rate: float = 1.0
+    ):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.name = name
+        self.component = component
+        self.labels = labels or {}
+        self.sample_rate = sample_rate
+        self._aggregator = collector.aggregator
+        self._series = collector.aggregator.get_series(
+            f"{name}_duration_seconds",
+            labels,
+            MetricType.TIMER,
+            component
+        )
+        self._error_series: Optional[MetricSeries] = None
+        self._every = max(1, round(1 / sample_rate))
+        self._countdown = 1
+        self._ends: List[int] = []
+        self._durations: List[int] = []
+        collector.aggregator.add_flush_hook(self.flush)
+    
+    def should_sample(self) -> bool:
+        """Whether the next call should be timed."""
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self._every
+        return True
+    
+    def record_ns(self, elapsed_ns: int, end_ns: Optional[int] = None) -> None:
+        """Record a duration measured in nanoseconds."""
+        self._ends.append(time.perf_counter_ns() if end_ns is None else end_ns)
+        self._durations.append(elapsed_ns)
+        if len(self._durations) >= self.BUFFER_SIZE:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Push buffered measurements into the duration series."""
+        if not self._durations:
+            return
+        # The buffers are bound by decorator closures, so clear in place
+        ends = np.array(self._ends, dtype=np.float64)
+        durations = np.array(self._durations, dtype=np.float64)
+        self._ends.clear()
+        self._durations.clear()
+        
+        # Map perf_counter readings onto wall-clock timestamps
+        offset = time.time() - time.perf_counter_ns() / 1e9
+        self._aggregator.observe_many(
+            self._series,
+            ends / 1e9 + offset,
+            durations / 1e9,
+            self._every
+        )
+    
+    def record_error(self) -> None:
+        """Count a failed call."""
+        if self._error_series is None:
+            self._error_series = self._aggregator.get_series(
+                f"{self.name}_errors_total",
+                self.labels,
+                MetricType.COUNTER,
+                self.component
+            )
+        self._aggregator.observe(self._error_series, 1, time.time())
+    
+    def time(self) -> '_TimerContext':
+        """Context manager timing one block."""
+        return _TimerContext(self)
+    
+    def __call__(self, func: Callable) -> Callable:
+        """Decorate a sync or async function so each call is timed."""
+        # Bind hot-path state to locals; the wrapper inlines should_sample
+        # and record_ns to keep per-call overhead to a few attribute reads
+        handle = self
+        ends = self._ends
+        durations = self._durations
+        every = self._every
+        buffer_size = self.BUFFER_SIZE
+        clock = time.perf_counter_ns
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                handle._countdown -= 1
+                if handle._countdown:
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception:
+                        handle.record_error()
+                        raise
+                
+                handle._countdown = every
+                start = clock()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    handle.record_error()
+                    raise
+                finally:
+                    end = clock()
+                    ends.append(end)
+                    durations.append(end - start)
+                    if len(durations) >= buffer_size:
+                        handle.flush()
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            handle._countdown -= 1
+            if handle._countdown:
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    handle.record_error()
+                    raise
+            
+            handle._countdown = every
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                handle.record_error()
+                raise
+            finally:
+                end = clock()
+                ends.append(end)
+                durations.append(end - start)
+                if len(durations) >= buffer_size:
+                    handle.flush()
+        return wrapper
+
+class _TimerContext:
+    """Single use of a TimerHandle as a context manager."""
+    
+    __slots__ = ("_handle", "_start")
+    
+    def __init__(self, handle: TimerHandle):
+        self._handle = handle
+        self._start: Optional[int] = None
+    
+    def __enter__(self) -> '_TimerContext':
+        if self._handle.should_sample():
+            self._start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._start is not None:
+            end = time.perf_counter_ns()
+            self._handle.record_ns(end - self._start, end)
+        if exc_type is not None:
+            self._handle.record_error()
+    
+    async def __aenter__(self) -> '_TimerContext':
+        return self.__enter__()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.__exit__(exc_type, exc_val, exc_tb)
 
 class Timer:
-    """Context manager for timing operations."""
+    """Context manager for timing operations.
+    
+    Backed by the collector's cached TimerHandle for ``name`` and ``labels``;
+    prefer holding the handle directly on hot paths.
+    """
     
     def __init__(
         self,
@@ -234,12 +1250,12 @@ class Timer:
         self.component = component
         self.collector = collector
         self.labels = labels or {}
-        self.start_time: Optional[float] = None
-        self.logger = get_logger(self.__class__.__name__)
+        self.handle = collector.timer(name, component, labels)
+        self.start_time: Optional[int] = None
     
     async def __aenter__(self) -> 'Timer':
         """Enter async context manager."""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter_ns()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -247,20 +1263,7 @@ class Timer:
         if self.start_time is None:
             return
         
-        duration = time.time() - self.start_time
-        self.collector.record(
-            name=f"{self.name}_duration_seconds",
-            value=duration,
-            metric_type=MetricType.TIMER,
-            component=self.component,
-            labels=self.labels
-        )
-        
+        end = time.perf_counter_ns()
+        self.handle.record_ns(end - self.start_time, end)
         if exc_type is not None:
-            self.collector.record(
-                name=f"{self.name}_errors_total",
-                value=1,
-                metric_type=MetricType.COUNTER,
-                component=self.component,
-                labels=self.labels
-            )
+            self.handle.record_error()
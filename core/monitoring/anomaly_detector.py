@@ -313,6 +313,39 @@ class AnomalyDetector:
             
         return anomalies[0] if anomalies else None
     
+    async def check_historical_anomaly(
+        self,
+        workflow_id: str,
+        step_id: Optional[str],
+        series_key: str,
+        value: float,
+        lookback: timedelta = timedelta(days=7)
+    ) -> Optional[Anomaly]:
+        """Compare a value with archived history using a Z-score.
+        
+        The baseline comes from ``MetricsCollector.compare_with_history``.
+        """
+        deviation = await self.metrics.compare_with_history(
+            series_key,
+            value,
+            lookback,
+            self.config.min_value_samples
+        )
+        if deviation is None or deviation["zscore"] <= self.config.value_zscore_threshold:
+            return None
+        zscore = deviation["zscore"]
+        
+        return Anomaly(
+            type=AnomalyType.VALUE,
+            workflow_id=workflow_id,
+            step_id=step_id,
+            timestamp=datetime.now(),
+            description=f"{series_key} value {value:.2f} deviates from "
+                      f"{lookback.days}-day baseline (z-score: {zscore:.2f})",
+            severity=min(zscore / self.config.value_zscore_threshold, 1.0),
+            data={"series": series_key, **deviation}
+        )
+    
     async def _notify_anomalies(
         self,
         workflow_id: str,
@@ -1,5 +1,10 @@
 import asyncio
-from typing import Dict, List, Type
+import copy
+import time
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple, Type
+from collections import deque
 from .interfaces import (
     AgentInterface,
     Intent,
@@ -8,96 +13,583 @@ from .interfaces import (
     Task,
     TaskPlannerInterface,
 )
+from .logging_config import get_logger
+from .monitoring import MetricsCollector, MetricType
+from .retry import deadline_scope
+from .task_executor import TaskExecutor, TaskStatus, build_dependency_graph
+
+# Parameter under which a task receives the results of its dependencies
+DEPENDENCY_RESULTS = "dependency_results"
+
+async def _call_hook(agent: AgentInterface, name: str, default=None):
+    """Await an optional lifecycle hook (``initialize``, ``health_check``, ``close``)."""
+    hook = getattr(agent, name, None)
+    if hook is None:
+        return default
+    result = hook()
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
+
+class AgentPool:
+    """Warm instances of one agent class, checked out one task at a time.
+    
+    Agents that own a browser, HTTP session or loaded model pay their set-up
+    once per instance instead of once per task. An agent may define
+    optional ``initialize()``, ``health_check()`` and ``close()`` hooks,
+    sync or async. Idle instances are health-checked on checkout, and an
+    instance whose task raised is checked before it goes back in the pool;
+    unhealthy ones are closed and replaced on demand. Up to ``max_size``
+    instances exist at once; further checkouts wait for one to be returned.
+    Instances idle for longer than ``idle_timeout`` are closed by
+    ``reap_idle``, down to ``min_size``.
+    """
+    
+    def __init__(
+        self,
+        agent_cls: Type[AgentInterface],
+        min_size: int = 0,
+        max_size: int = 8,
+        idle_timeout: float = 300.0
+    ):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"Invalid pool size: min {min_size}, max {max_size}")
+        self.agent_cls = agent_cls
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle: Deque[Tuple[AgentInterface, float]] = deque()  # (agent, returned at)
+        self._slots = asyncio.Semaphore(max_size)
+        self._size = 0
+        self._closed = False
+        self.created = 0
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @property
+    def size(self) -> int:
+        """Live instances, idle or checked out."""
+        return self._size
+    
+    @property
+    def idle(self) -> int:
+        """Instances waiting in the pool."""
+        return len(self._idle)
+    
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[AgentInterface]:
+        """Borrow an instance for the duration of the block."""
+        agent = await self.acquire()
+        failed = False
+        try:
+            yield agent
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self.release(agent, failed)
+    
+    async def acquire(self) -> AgentInterface:
+        """Take a healthy idle instance, or create one. Pair with ``release``."""
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                agent, _ = self._idle.pop()     # Most recently used is warmest
+                if await self._healthy(agent):
+                    return agent
+                await self._discard(agent)
+            return await self._create()
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    async def release(self, agent: AgentInterface, failed: bool = False) -> None:
+        """Return an instance; after a failure it must pass a health check."""
+        try:
+            if self._closed or (failed and not await self._healthy(agent)):
+                await self._discard(agent)
+            else:
+                self._idle.append((agent, time.monotonic()))
+        finally:
+            self._slots.release()
+    
+    async def warm_up(self) -> None:
+        """Create instances until ``min_size`` exist."""
+        missing = self.min_size - self._size
+        if missing > 0:
+            agents = await asyncio.gather(*[self._create() for _ in range(missing)])
+            now = time.monotonic()
+            self._idle.extend((agent, now) for agent in agents)
+    
+    async def reap_idle(self, now: Optional[float] = None) -> int:
+        """Close instances idle past ``idle_timeout``, keeping ``min_size``."""
+        now = time.monotonic() if now is None else now
+        reaped = 0
+        # Oldest returns sit at the left of the deque
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][1] >= self.idle_timeout
+        ):
+            agent, _ = self._idle.popleft()
+            await self._discard(agent)
+            reaped += 1
+        return reaped
+    
+    async def close(self) -> None:
+        """Close all idle instances; checked-out ones are closed on return."""
+        self._closed = True
+        while self._idle:
+            agent, _ = self._idle.popleft()
+            await self._discard(agent)
+    
+    async def _create(self) -> AgentInterface:
+        self._size += 1
+        try:
+            agent = self.agent_cls()
+            await _call_hook(agent, "initialize")
+        except BaseException:
+            self._size -= 1
+            raise
+        self.created += 1
+        return agent
+    
+    async def _healthy(self, agent: AgentInterface) -> bool:
+        try:
+            return bool(await _call_hook(agent, "health_check", default=True))
+        except Exception as e:
+            self.logger.warning(f"Health check failed for {self.agent_cls.__name__}: {str(e)}")
+            return False
+    
+    async def _discard(self, agent: AgentInterface) -> None:
+        self._size -= 1
+        try:
+            await _call_hook(agent, "close")
+        except Exception as e:
+            self.logger.warning(f"Error closing {self.agent_cls.__name__}: {str(e)}")
 
 class AgentRegistry:
-    """Registry for managing available agents."""
+    """Registry for managing available agents.
+    
+    Each action gets an ``AgentPool`` of its agent class. ``start`` pre-warms
+    the pools and reaps idle instances every ``reap_interval`` seconds until
+    ``close``.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        min_instances: int = 0,
+        max_instances: int = 8,
+        idle_timeout: float = 300.0,
+        reap_interval: float = 30.0
+    ):
         self._agents: Dict[str, Type[AgentInterface]] = {}
+        self._pools: Dict[str, AgentPool] = {}
+        self.min_instances = min_instances
+        self.max_instances = max_instances
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._reaper: Optional[asyncio.Task] = None
+        self.logger = get_logger(self.__class__.__name__)
     
-    def register(self, action: str, agent_cls: Type[AgentInterface]):
+    def register(
+        self,
+        action: str,
+        agent_cls: Type[AgentInterface],
+        min_instances: Optional[int] = None,
+        max_instances: Optional[int] = None
+    ):
         """Register an agent class for a specific action."""
         self._agents[action] = agent_cls
+        self._pools[action] = AgentPool(
+            agent_cls,
+            min_size=self.min_instances if min_instances is None else min_instances,
+            max_size=self.max_instances if max_instances is None else max_instances,
+            idle_timeout=self.idle_timeout
+        )
     
     def get_agent(self, action: str) -> Type[AgentInterface]:
         """Get the appropriate agent for an action."""
         if action not in self._agents:
             raise KeyError(f"No agent registered for action: {action}")
         return self._agents[action]
+    
+    def get_pool(self, action: str) -> AgentPool:
+        """Get the instance pool for an action."""
+        if action not in self._pools:
+            raise KeyError(f"No agent registered for action: {action}")
+        return self._pools[action]
+    
+    def checkout(self, action: str):
+        """Borrow a pooled agent instance for an action."""
+        return self.get_pool(action).checkout()
+    
+    async def start(self) -> None:
+        """Pre-warm every pool and start reaping idle instances."""
+        await asyncio.gather(*[pool.warm_up() for pool in self._pools.values()])
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_periodically())
+        self.logger.info(f"Agent pools warm for {len(self._pools)} actions")
+    
+    async def close(self) -> None:
+        """Stop reaping and close idle instances."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        for pool in self._pools.values():
+            await pool.close()
+    
+    async def _reap_periodically(self) -> None:
+        """Close idle instances every ``reap_interval`` seconds."""
+        while True:
+            try:
+                await asyncio.sleep(self.reap_interval)
+                for action, pool in self._pools.items():
+                    reaped = await pool.reap_idle()
+                    if reaped:
+                        self.logger.debug(f"Reaped {reaped} idle agents for {action}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error reaping idle agents: {str(e)}")
+
+class QueryRejected(Exception):
+    """Raised when a query is shed because the pipeline is saturated."""
 
 class Orchestrator:
-    """Main orchestrator for the Arcana Agent Framework."""
+    """Main orchestrator for the Arcana Agent Framework.
+    
+    Queries run as a pipeline with admission control. At most
+    ``max_concurrent_queries`` are in progress; up to ``max_queued_queries``
+    more wait their turn, for no longer than ``queue_timeout`` seconds.
+    Anything beyond that is shed at once with an error response, so a
+    burst cannot pile up unbounded Claude calls and browser sessions, and
+    queries that are admitted still finish in reasonable time. Within the
+    pipeline each stage (``nlu``, ``plan``, ``execute``, ``respond``) has
+    its own concurrency limit from ``stage_limits``; stages without one are
+    unlimited.
+    
+    Each query runs under a deadline of ``query_timeout`` seconds, and its
+    tasks run through ``task_executor``: failed attempts are retried with
+    jittered backoff under the executor's retry policies and shared retry
+    budget, and no attempt starts that could not finish before the query's
+    deadline.
+    """
+    
+    DEFAULT_STAGE_LIMITS = {"nlu": 8, "plan": 16, "execute": 8}
     
     def __init__(
         self,
         nlu: NLUInterface,
         task_planner: TaskPlannerInterface,
         response_builder: ResponseBuilderInterface,
-        agent_registry: AgentRegistry
+        agent_registry: AgentRegistry,
+        metrics: Optional[MetricsCollector] = None,
+        max_concurrent_queries: int = 32,
+        max_queued_queries: int = 64,
+        queue_timeout: Optional[float] = 10.0,
+        stage_limits: Optional[Dict[str, int]] = None,
+        query_timeout: Optional[float] = 60.0,
+        task_executor: Optional[TaskExecutor] = None
     ):
         self.nlu = nlu
         self.task_planner = task_planner
         self.response_builder = response_builder
         self.agent_registry = agent_registry
+        self.metrics = metrics
+        self.max_concurrent_queries = max_concurrent_queries
+        self.max_queued_queries = max_queued_queries
+        self.queue_timeout = queue_timeout
+        self.query_timeout = query_timeout
+        self.task_executor = task_executor or TaskExecutor(
+            max_concurrent_tasks=max_concurrent_queries,
+            metrics=metrics
+        )
+        self._admission = asyncio.Semaphore(max_concurrent_queries)
+        self._stage_limits = {
+            stage: asyncio.Semaphore(limit)
+            for stage, limit in (stage_limits or self.DEFAULT_STAGE_LIMITS).items()
+        }
+        self._queued = 0
+        self._in_flight = 0
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @property
+    def queued(self) -> int:
+        """Queries waiting to be admitted."""
+        return self._queued
+    
+    @property
+    def in_flight(self) -> int:
+        """Queries admitted and not yet answered."""
+        return self._in_flight
     
     async def process_query(self, query: str) -> str:
         """Process a user query and return a response."""
         try:
-            # Parse the query into an intent
-            intent = await self.nlu.parse(query)
-            
-            # Convert intent into tasks
-            tasks = await self.task_planner.plan(intent)
-            
-            # Validate task dependencies
-            if not await self.task_planner.validate_dependencies(tasks):
-                return await self.response_builder.build_error_response(
-                    Exception("Invalid task dependencies")
-                )
-            
-            # Execute tasks
-            results = await self._execute_tasks(tasks)
-            
-            # Build response
-            return await self.response_builder.build_response(results)
+            async with self._admit(), self._deadline():
+                # Parse the query into an intent
+                async with self._stage("nlu"):
+                    intent = await self.nlu.parse(query)
+                
+                # Convert intent into tasks and validate their dependencies
+                async with self._stage("plan"):
+                    tasks = await self.task_planner.plan(intent)
+                    valid = await self.task_planner.validate_dependencies(tasks)
+                if not valid:
+                    return await self.response_builder.build_error_response(
+                        Exception("Invalid task dependencies")
+                    )
+                
+                # Execute tasks
+                async with self._stage("execute"):
+                    results = await self._execute_tasks(tasks)
+                
+                # Build response
+                async with self._stage("respond"):
+                    return await self.response_builder.build_response(results)
             
         except Exception as e:
             return await self.response_builder.build_error_response(e)
     
-    async def _execute_tasks(self, tasks: List[Task]) -> List[Dict]:
-        """Execute a list of tasks with proper dependency handling."""
-        results = []
+    async def process_query_stream(self, query: str) -> AsyncIterator[str]:
+        """Process a user query, yielding response fragments as tasks finish.
         
-        # Group tasks by dependency level
-        dependency_groups = self._group_tasks_by_dependencies(tasks)
+        The first fragment is available as soon as the first task completes
+        instead of after the slowest one.
+        """
+        try:
+            async with self._admit():
+                deadline = None
+                if self.query_timeout is not None:
+                    deadline = time.monotonic() + self.query_timeout
+                async with self._stage("nlu"):
+                    intent = await self.nlu.parse(query)
+                async with self._stage("plan"):
+                    tasks = await self.task_planner.plan(intent)
+                    valid = await self.task_planner.validate_dependencies(tasks)
+                
+                if not valid:
+                    yield await self.response_builder.build_error_response(
+                        Exception("Invalid task dependencies")
+                    )
+                    return
+                
+                # Responses are built as results arrive, so both stages
+                # are held for the whole stream. The deadline is passed
+                # explicitly: a context variable set here would leak into
+                # the consumer between fragments.
+                async with self._stage("execute"), self._stage("respond"):
+                    async for fragment in self.response_builder.build_response_stream(
+                        self._execute_tasks_stream(tasks, deadline)
+                    ):
+                        yield fragment
+            
+        except Exception as e:
+            yield await self.response_builder.build_error_response(e)
+    
+    @asynccontextmanager
+    async def _admit(self) -> AsyncIterator[None]:
+        """Hold one of the pipeline's query slots, or shed the query."""
+        capacity = self.max_concurrent_queries + self.max_queued_queries
+        if self._in_flight + self._queued >= capacity:
+            self._record_shed("queue_full")
+            raise QueryRejected("Too many queries in progress, please try again shortly")
+        
+        self._queued += 1
+        self._record_load()
+        queued_at = time.perf_counter()
+        admitted = False
+        try:
+            admitted = await asyncio.wait_for(self._admission.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._queued -= 1
+        
+        if not admitted:
+            self._record_load()
+            self._record_shed("queue_timeout")
+            raise QueryRejected(
+                f"Query waited over {self.queue_timeout:g} seconds to start, please try again shortly"
+            )
         
-        # Execute tasks level by level
-        for task_group in dependency_groups:
-            # Tasks in the same group can be executed in parallel
-            group_results = await asyncio.gather(
-                *[self._execute_single_task(task) for task in task_group]
+        self._in_flight += 1
+        self._record_load()
+        if self.metrics is not None:
+            self.metrics.timer("query_stage", "orchestrator", {"stage": "queue"}).record_ns(
+                int((time.perf_counter() - queued_at) * 1e9)
+            )
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._admission.release()
+            self._record_load()
+    
+    @asynccontextmanager
+    async def _deadline(self) -> AsyncIterator[None]:
+        """Run a block under the query deadline, if there is one."""
+        if self.query_timeout is None:
+            yield
+            return
+        with deadline_scope(self.query_timeout):
+            yield
+    
+    @asynccontextmanager
+    async def _stage(self, stage: str) -> AsyncIterator[None]:
+        """Run a block within a stage's concurrency limit, timing it."""
+        limit = self._stage_limits.get(stage)
+        if limit is not None:
+            await limit.acquire()
+        try:
+            if self.metrics is None:
+                yield
+            else:
+                async with self.metrics.timer(
+                    "query_stage", "orchestrator", {"stage": stage}
+                ).time():
+                    yield
+        finally:
+            if limit is not None:
+                limit.release()
+    
+    def _record_load(self) -> None:
+        """Publish queued and in-flight query counts."""
+        if self.metrics is None:
+            return
+        for name, value in (("query_queue_depth", self._queued), ("queries_in_flight", self._in_flight)):
+            self.metrics.record(
+                name=name,
+                value=value,
+                metric_type=MetricType.GAUGE,
+                component="orchestrator"
+            )
+    
+    def _record_shed(self, reason: str) -> None:
+        self.logger.debug(f"Shedding query ({reason}): {self._in_flight} in flight, {self._queued} queued")
+        if self.metrics is not None:
+            self.metrics.record(
+                name="queries_shed",
+                value=1,
+                metric_type=MetricType.COUNTER,
+                component="orchestrator",
+                labels={"reason": reason}
             )
-            results.extend(group_results)
+    
+    async def _execute_tasks_stream(
+        self,
+        tasks: List[Task],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Dict]:
+        """Execute tasks like ``_execute_tasks``, yielding results as they complete."""
+        async for _, result in self._run_task_graph(tasks, deadline):
+            yield result
+    
+    async def _execute_tasks(self, tasks: List[Task]) -> List[Dict]:
+        """Execute a list of tasks with proper dependency handling.
         
+        Results are returned in the order the planner listed the tasks.
+        """
+        results: List[Optional[Dict]] = [None] * len(tasks)
+        async for index, result in self._run_task_graph(tasks):
+            results[index] = result
         return results
     
-    async def _execute_single_task(self, task: Task) -> Dict:
-        """Execute a single task using the appropriate agent."""
-        agent_cls = self.agent_registry.get_agent(task.action)
-        agent = agent_cls()
+    async def _run_task_graph(
+        self,
+        tasks: List[Task],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        """Run tasks as a dependency graph, yielding ``(index, result)`` pairs.
+        
+        Each task starts as soon as the tasks it depends on have finished,
+        however deep the chain, and receives their results under
+        ``parameters["dependency_results"]``. If a task fails, the tasks
+        still running are cancelled and the error propagates. ``deadline``
+        (a ``time.monotonic()`` value) applies on top of the caller's.
+        """
+        dependents, in_degree = build_dependency_graph(tasks)
+        upstream: List[List[int]] = [[] for _ in tasks]
+        for index, downstream in enumerate(dependents):
+            for dependent in downstream:
+                upstream[dependent].append(index)
+        
+        results: Dict[int, Any] = {}
+        running: Dict[asyncio.Task, int] = {}
         
-        if not await agent.validate(task):
-            raise ValueError(f"Task validation failed for action: {task.action}")
+        def launch(index: int) -> None:
+            task = self._with_dependency_results(tasks[index], upstream[index], tasks, results)
+            running[asyncio.create_task(self._execute_single_task(task, deadline))] = index
         
-        return await agent.execute(task)
+        try:
+            for index, degree in enumerate(in_degree):
+                if not degree:
+                    launch(index)
+            
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    index = running.pop(future)
+                    results[index] = future.result()
+                    finished.append(index)
+                    for dependent in dependents[index]:
+                        in_degree[dependent] -= 1
+                        if not in_degree[dependent]:
+                            launch(dependent)
+                
+                for index in finished:
+                    yield index, results[index]
+        finally:
+            for future in running:
+                future.cancel()
     
-    def _group_tasks_by_dependencies(self, tasks: List[Task]) -> List[List[Task]]:
-        """Group tasks by their dependency levels."""
-        # Simple implementation - can be enhanced for more complex dependency graphs
-        no_deps = [task for task in tasks if not task.dependencies]
-        with_deps = [task for task in tasks if task.dependencies]
+    @staticmethod
+    def _with_dependency_results(
+        task: Task,
+        upstream: List[int],
+        tasks: List[Task],
+        results: Dict[int, Any]
+    ) -> Task:
+        """Copy of ``task`` whose parameters carry its dependencies' results.
         
-        if not with_deps:
-            return [no_deps]
+        Results are deep copies in plain containers, so downstream agents
+        cannot modify what other tasks see and the task stays picklable for
+        process-lane execution. The planner's task is left untouched.
+        """
+        if not upstream:
+            return task
         
-        return [no_deps, with_deps]  # This is a simplified version
+        # Keyed by action; when several tasks share an action the one
+        # listed last wins
+        dependency_results: Dict[str, Any] = {
+            tasks[index].action: copy.deepcopy(results[index])
+            for index in upstream
+        }
+        
+        parameters = dict(task.parameters or {})
+        parameters[DEPENDENCY_RESULTS] = dependency_results
+        return replace(task, parameters=parameters)
+    
+    async def _execute_single_task(
+        self,
+        task: Task,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Execute a single task using the appropriate agent.
+        
+        Retries, backoff and the deadline are handled by ``task_executor``;
+        the last error is raised once it gives up.
+        """
+        async with self.agent_registry.checkout(task.action) as agent:
+            if not await agent.validate(task):
+                raise ValueError(f"Task validation failed for action: {task.action}")
+            
+            task_result = await self.task_executor.execute_task(task, agent, deadline)
+            if task_result.status != TaskStatus.COMPLETED:
+                raise task_result.error
+            return task_result.result
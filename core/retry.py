@@ -0,0 +1,160 @@
+"""Retry policies, retry budgets and deadlines for Arcana Agent Framework."""
+
+from typing import Deque, Dict, Iterator, List, Optional, Type
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import math
+import random
+import time
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how patiently to retry one class of error.
+    
+    With ``jitter`` the delay follows "decorrelated jitter": each delay is
+    drawn uniformly between ``base_delay`` and ``multiplier`` times the
+    previous one, capped at ``max_delay``. Clients that failed together
+    spread out instead of retrying in lockstep. Without jitter the delay
+    grows geometrically by ``multiplier``; a multiplier of 1 gives a fixed
+    delay.
+    """
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    multiplier: float = 3.0
+    jitter: bool = True
+    max_elapsed: Optional[float] = None     # Seconds since the first attempt
+    
+    def next_delay(
+        self,
+        previous: Optional[float] = None,
+        rng: Optional[random.Random] = None
+    ) -> float:
+        """Delay before the next attempt, given the previous delay."""
+        if not self.jitter:
+            delay = self.base_delay if previous is None else previous * self.multiplier
+            return min(self.max_delay, delay)
+        upper = max(self.base_delay, (previous or self.base_delay) * self.multiplier)
+        return min(self.max_delay, (rng or random).uniform(self.base_delay, upper))
+    
+    def allows(self, attempts: int, elapsed: float, delay: float) -> bool:
+        """Whether another attempt fits in the attempt and time limits."""
+        if attempts >= self.max_attempts:
+            return False
+        return self.max_elapsed is None or elapsed + delay <= self.max_elapsed
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+def policy_for(
+    error: BaseException,
+    policies: Dict[Type[BaseException], RetryPolicy]
+) -> Optional[RetryPolicy]:
+    """Most specific policy registered for an error's class or a base class."""
+    for cls in type(error).__mro__:
+        policy = policies.get(cls)
+        if policy is not None:
+            return policy
+    return None
+
+class RetryBudget:
+    """Caps retries at a fraction of recent requests, process-wide.
+    
+    Within a sliding ``window``, retries may not exceed ``ratio`` times the
+    requests started plus ``min_retries_per_second`` per second. When a
+    dependency fails everywhere at once this turns a retry storm into a
+    modest amount of extra load, while isolated failures still retry.
+    """
+    
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 10.0,
+        window: float = 10.0
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        # One [second, requests, retries] bucket per second of the window
+        self._buckets: Deque[List[int]] = deque()
+        self._requests = 0
+        self._retries = 0
+    
+    def record_request(self) -> None:
+        """Count a first attempt."""
+        self._bucket()[1] += 1
+        self._requests += 1
+    
+    def try_acquire(self) -> bool:
+        """Spend budget on a retry if there is any left."""
+        bucket = self._bucket()
+        allowed = self.min_retries_per_second * self.window + self.ratio * self._requests
+        if self._retries + 1 > allowed:
+            return False
+        bucket[2] += 1
+        self._retries += 1
+        return True
+    
+    @property
+    def requests(self) -> int:
+        """First attempts within the window."""
+        self._bucket()
+        return self._requests
+    
+    @property
+    def retries(self) -> int:
+        """Retries within the window."""
+        self._bucket()
+        return self._retries
+    
+    def _bucket(self) -> List[int]:
+        """Current bucket, after dropping ones that left the window."""
+        second = math.floor(time.monotonic())
+        horizon = second - self.window
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= horizon:
+            _, requests, retries = buckets.popleft()
+            self._requests -= requests
+            self._retries -= retries
+        if not buckets or buckets[-1][0] != second:
+            buckets.append([second, 0, 0])
+        return buckets[-1]
+
+# Shared budget used by TaskExecutor unless one is passed in
+retry_budget = RetryBudget()
+
+_deadline: ContextVar[Optional[float]] = ContextVar("arcana_deadline", default=None)
+
+def current_deadline() -> Optional[float]:
+    """The caller's deadline as a ``time.monotonic()`` value, if any."""
+    return _deadline.get()
+
+def time_remaining(deadline: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the tighter of ``deadline`` and the caller's."""
+    deadline = earliest_deadline(deadline, current_deadline())
+    return None if deadline is None else deadline - time.monotonic()
+
+def earliest_deadline(*deadlines: Optional[float]) -> Optional[float]:
+    """The earliest of several optional deadlines."""
+    known = [deadline for deadline in deadlines if deadline is not None]
+    return min(known) if known else None
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[float]:
+    """Run a block under a deadline ``timeout`` seconds from now.
+    
+    Nested scopes can only tighten the deadline. Tasks created inside the
+    block inherit it, so work started on the caller's behalf stops
+    retrying once the caller would no longer wait for the answer.
+    """
+    deadline = earliest_deadline(time.monotonic() + timeout, _deadline.get())
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
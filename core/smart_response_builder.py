@@ -20,15 +20,7 @@ class SmartResponseBuilder(ResponseBuilderInterface):
             # Build a context-aware response
             response_parts = []
             for result in results:
-                status = result.get("status", "unknown")
-                action = result.get("action", "unknown action")
-                
-                if status == "completed":
-                    response_parts.append(f"Successfully {action.replace('_', ' ')}")
-                    if "result" in result:
-                        response_parts.append(str(result["result"]))
-                else:
-                    response_parts.append(f"Could not complete {action}")
+                response_parts.extend(self._describe_result(result))
             
             response = ". ".join(response_parts)
             self.logger.debug(f"Built response: {response}")
@@ -38,6 +30,22 @@ class SmartResponseBuilder(ResponseBuilderInterface):
             self.logger.error(f"Error building response: {str(e)}")
             raise
     
+    async def build_partial_response(self, result: Dict[str, Any]) -> str:
+        """Build the response fragment for one result as soon as it arrives."""
+        return ". ".join(self._describe_result(result))
+    
+    def _describe_result(self, result: Dict[str, Any]) -> List[str]:
+        """Describe one task result as response sentences."""
+        status = result.get("status", "unknown")
+        action = result.get("action", "unknown action")
+        
+        if status != "completed":
+            return [f"Could not complete {action}"]
+        parts = [f"Successfully {action.replace('_', ' ')}"]
+        if "result" in result:
+            parts.append(str(result["result"]))
+        return parts
+    
     async def build_error_response(self, error: Exception) -> str:
         """Build an error response."""
         try:
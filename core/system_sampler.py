@@ -0,0 +1,280 @@
+"""Background sampling of process and container resource usage."""
+
+from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import os
+import threading
+import time
+
+import psutil
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    """Point-in-time resource usage, scoped to the container when limited."""
+    cpu_percent: float          # Share of the CPU allowance in use
+    cpu_count: float            # Effective CPUs (cgroup quota or host count)
+    memory_percent: float
+    memory_used: int
+    memory_total: int
+    memory_available: int
+    disk_usage_percent: float
+    disk_free: int
+    disk_total: int
+    open_files: int
+    thread_count: int
+    process_memory_percent: float
+    containerized: bool         # True when read from cgroup v2 accounting
+    timestamp: datetime
+
+class SystemSampler:
+    """Samples resource usage on a daemon thread and publishes snapshots.
+    
+    Readers get the latest ``snapshot`` without blocking. On Linux the
+    sampler reads ``/proc`` and, when the process runs under cgroup v2 with
+    CPU or memory limits, reports usage against those limits rather than
+    host totals. Elsewhere it falls back to psutil, still off the event loop.
+    
+    The sampler is reference counted so several components can share it:
+    each ``acquire`` must be paired with a ``release``. Neither blocks on
+    the sampling thread, so both are safe to call from the event loop.
+    """
+    
+    def __init__(
+        self,
+        interval: float = 1.0,
+        proc_root: str = "/proc",
+        cgroup_root: str = "/sys/fs/cgroup",
+        disk_path: str = "/"
+    ):
+        self.interval = interval
+        self.proc_root = proc_root
+        self.cgroup_root = cgroup_root
+        self.disk_path = disk_path
+        self._use_proc = os.path.exists(os.path.join(proc_root, "stat"))
+        self._cgroup_dir = self._find_cgroup_dir() if self._use_proc else None
+        self._snapshot: Optional[ResourceSnapshot] = None
+        self._previous_cpu: Optional[Tuple[float, float]] = None
+        self._cpu_lock = threading.Lock()
+        self._users = 0
+        self._lock = threading.Lock()
+        self._stop_event: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self.logger = get_logger(self.__class__.__name__)
+    
+    @property
+    def snapshot(self) -> ResourceSnapshot:
+        """Latest published snapshot, sampling once if none exists yet."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._publish()
+        return snapshot
+    
+    @property
+    def running(self) -> bool:
+        """Whether the sampling thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def acquire(self) -> None:
+        """Register a user, starting the sampling thread if needed."""
+        with self._lock:
+            self._users += 1
+            if self.running:
+                return
+            
+            # Prime the CPU baseline so the first interval has a delta
+            self._publish()
+            # Each thread gets its own event: a thread still winding down
+            # from an earlier release must not be revived by this one
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._stop_event,),
+                name="arcana-system-sampler",
+                daemon=True
+            )
+            self._thread.start()
+            self.logger.debug("System sampler started")
+    
+    def release(self) -> None:
+        """Unregister a user, stopping the thread after the last one."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users or self._thread is None:
+                return
+            self._thread = None
+            self._stop_event.set()
+        
+        # No join: the thread exits at its next wakeup, and waiting for an
+        # in-flight sample here would block the event loop
+        self.logger.debug("System sampler stopped")
+    
+    def sample(self) -> ResourceSnapshot:
+        """Take a reading now. Called from the sampling thread."""
+        if not self._use_proc:
+            return self._sample_psutil()
+        
+        cpu_count = self._cpu_limit() or float(os.cpu_count() or 1)
+        memory_used, memory_total, memory_available = self._read_memory()
+        disk = os.statvfs(self.disk_path)
+        disk_total = disk.f_blocks * disk.f_frsize
+        disk_free = disk.f_bavail * disk.f_frsize
+        disk_used = (disk.f_blocks - disk.f_bfree) * disk.f_frsize
+        status = self._read_key_values(os.path.join(self.proc_root, "self", "status"))
+        rss = _parse_kb(status.get("VmRSS", "0 kB"))
+        
+        return ResourceSnapshot(
+            cpu_percent=self._cpu_percent(cpu_count),
+            cpu_count=cpu_count,
+            memory_percent=_percent(memory_used, memory_total),
+            memory_used=memory_used,
+            memory_total=memory_total,
+            memory_available=memory_available,
+            disk_usage_percent=_percent(disk_used, disk_used + disk_free),
+            disk_free=disk_free,
+            disk_total=disk_total,
+            open_files=len(os.listdir(os.path.join(self.proc_root, "self", "fd"))),
+            thread_count=int(status.get("Threads", "0")),
+            process_memory_percent=_percent(rss, memory_total),
+            containerized=self._cgroup_dir is not None,
+            timestamp=datetime.now()
+        )
+    
+    def _run(self, stop_event: threading.Event) -> None:
+        """Sampling loop."""
+        while not stop_event.wait(self.interval):
+            try:
+                self._publish()
+            except Exception as e:
+                self.logger.error(f"Error sampling system resources: {str(e)}")
+    
+    def _publish(self) -> ResourceSnapshot:
+        snapshot = self.sample()
+        self._snapshot = snapshot
+        return snapshot
+    
+    def _cpu_percent(self, cpu_count: float) -> float:
+        """CPU use since the previous sample, as a share of the allowance."""
+        # Reading the counters and swapping the baseline must not interleave
+        # with a sample taken by acquire() on another thread
+        with self._cpu_lock:
+            if self._cgroup_dir is not None:
+                # cgroup usage is in CPU-microseconds; capacity is wall time * CPUs
+                stat = self._read_key_values(os.path.join(self._cgroup_dir, "cpu.stat"))
+                busy = int(stat.get("usage_usec", "0")) / 1e6
+                capacity = time.monotonic() * cpu_count
+            else:
+                # Aggregate "cpu" line of /proc/stat, in clock ticks
+                with open(os.path.join(self.proc_root, "stat")) as f:
+                    fields = [int(v) for v in f.readline().split()[1:]]
+                idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+                capacity = float(sum(fields))
+                busy = capacity - idle
+            
+            previous, self._previous_cpu = self._previous_cpu, (capacity, busy)
+            if previous is None or capacity <= previous[0]:
+                return 0.0
+            share = (busy - previous[1]) / (capacity - previous[0])
+            return min(100.0, max(0.0, share * 100))
+    
+    def _read_memory(self) -> Tuple[int, int, int]:
+        """Return ``(used, total, available)`` bytes."""
+        meminfo = self._read_key_values(os.path.join(self.proc_root, "meminfo"))
+        host_total = _parse_kb(meminfo.get("MemTotal", "0 kB"))
+        host_available = _parse_kb(meminfo.get("MemAvailable", "0 kB"))
+        
+        if self._cgroup_dir is not None:
+            limit = self._read_cgroup_value("memory.max")
+            current = self._read_cgroup_value("memory.current")
+            if limit is not None and current is not None:
+                # Reclaimable page cache does not count against the limit
+                stat = self._read_key_values(os.path.join(self._cgroup_dir, "memory.stat"))
+                used = max(0, current - int(stat.get("inactive_file", "0")))
+                total = min(limit, host_total) if host_total else limit
+                return used, total, max(0, total - used)
+        
+        return host_total - host_available, host_total, host_available
+    
+    def _cpu_limit(self) -> Optional[float]:
+        """Effective CPUs from cgroup v2 ``cpu.max``, if a quota is set."""
+        if self._cgroup_dir is None:
+            return None
+        try:
+            with open(os.path.join(self._cgroup_dir, "cpu.max")) as f:
+                quota, period = f.read().split()
+        except (OSError, ValueError):
+            return None
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    
+    def _read_cgroup_value(self, name: str) -> Optional[int]:
+        try:
+            with open(os.path.join(self._cgroup_dir, name)) as f:
+                value = f.read().strip()
+        except OSError:
+            return None
+        return None if value == "max" else int(value)
+    
+    def _find_cgroup_dir(self) -> Optional[str]:
+        """Locate this process's cgroup v2 directory, if limits are readable."""
+        try:
+            with open(os.path.join(self.proc_root, "self", "cgroup")) as f:
+                for line in f:
+                    hierarchy, _, path = line.strip().split(":", 2)
+                    if hierarchy == "0":
+                        directory = os.path.join(self.cgroup_root, path.lstrip("/"))
+                        if os.path.exists(os.path.join(directory, "cpu.stat")):
+                            return directory
+        except (OSError, ValueError):
+            pass
+        return None
+    
+    def _sample_psutil(self) -> ResourceSnapshot:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        process = psutil.Process()
+        return ResourceSnapshot(
+            cpu_percent=psutil.cpu_percent(),
+            cpu_count=float(psutil.cpu_count() or 1),
+            memory_percent=memory.percent,
+            memory_used=memory.total - memory.available,
+            memory_total=memory.total,
+            memory_available=memory.available,
+            disk_usage_percent=disk.percent,
+            disk_free=disk.free,
+            disk_total=disk.total,
+            open_files=len(process.open_files()),
+            thread_count=process.num_threads(),
+            process_memory_percent=process.memory_percent(),
+            containerized=False,
+            timestamp=datetime.now()
+        )
+    
+    @staticmethod
+    def _read_key_values(path: str) -> Dict[str, str]:
+        """Parse ``key value`` or ``Key: value`` lines."""
+        values = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(":" if ":" in line else " ")
+                    values[key.strip()] = value.strip()
+        except OSError:
+            pass
+        return values
+
+def _parse_kb(value: str) -> int:
+    """Parse a ``/proc`` size such as ``'2048 kB'`` into bytes."""
+    parts = value.split()
+    return int(parts[0]) * 1024 if parts else 0
+
+def _percent(part: float, whole: float) -> float:
+    return round(part / whole * 100, 1) if whole else 0.0
+
+# Shared sampler used by MetricsCollector and ResourceAgent
+system_sampler = SystemSampler()
@@ -1,15 +1,76 @@
 """Task Execution Layer for Arcana Agent Framework."""
 
 import asyncio
-from typing import Dict, List, Optional, Any
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Any, Tuple, Type
 from datetime import datetime
+import heapq
+import time
 import traceback
 
+from .concurrency import AdaptiveConcurrencyLimiter, LimitOutcome
+from .execution_lanes import LanePools
 from .interfaces import Task
 from .logging_config import get_logger
+from .monitoring import MetricsCollector, MetricType
+from .retry import (
+    NO_RETRY,
+    RetryBudget,
+    RetryPolicy,
+    current_deadline,
+    earliest_deadline,
+    policy_for,
+    retry_budget as shared_retry_budget
+)
+
+if TYPE_CHECKING:
+    from .error_handling import ErrorHandler
 
 logger = get_logger(__name__)
 
+def build_dependency_graph(tasks: List[Task]) -> Tuple[List[List[int]], List[int]]:
+    """Index tasks into dependents lists and in-degree counts.
+    
+    Dependencies name actions, so a task waits for every task with that
+    action. Missing dependencies and cycles are rejected up front in
+    O(V + E) so no task runs from an unschedulable plan.
+    """
+    by_action: Dict[str, List[int]] = defaultdict(list)
+    for index, task in enumerate(tasks):
+        by_action[task.action].append(index)
+    
+    dependents: List[List[int]] = [[] for _ in tasks]
+    in_degree = [0] * len(tasks)
+    for index, task in enumerate(tasks):
+        for dependency in task.dependencies or ():
+            if dependency not in by_action:
+                logger.error(f"Task {task.action} depends on missing task {dependency}")
+                raise ValueError(
+                    f"Missing dependency detected in tasks: {task.action} -> {dependency}"
+                )
+            for upstream in by_action[dependency]:
+                dependents[upstream].append(index)
+                in_degree[index] += 1
+    
+    # Kahn's algorithm: anything never released sits on or behind a cycle
+    remaining = in_degree.copy()
+    queue = deque(index for index, degree in enumerate(remaining) if not degree)
+    visited = 0
+    while queue:
+        index = queue.popleft()
+        visited += 1
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if not remaining[dependent]:
+                queue.append(dependent)
+    
+    if visited < len(tasks):
+        blocked = sorted({tasks[i].action for i, degree in enumerate(remaining) if degree})
+        logger.error(f"Circular dependency detected among tasks: {blocked}")
+        raise ValueError(f"Circular dependency detected in tasks: {', '.join(blocked)}")
+    
+    return dependents, in_degree
+
 class TaskStatus:
     """Represents the current status of a task."""
     PENDING = "pending"
@@ -60,40 +121,123 @@ class TaskResult:
         }
 
 class TaskExecutor:
-    """Manages the execution of tasks with retry and error handling."""
+    """Manages the execution of tasks with retry and error handling.
+    
+    ``max_concurrent_tasks`` caps tasks running across all agents. Each
+    agent type also gets an adaptive limit, up to the same cap, that backs
+    off when its tasks time out, fail or slow down and grows back while
+    latency stays flat, so one saturated agent cannot hold every slot.
+    
+    Failed attempts are retried under a ``RetryPolicy`` chosen by error
+    class: ``retry_policies`` entries first, then the error handler's
+    recovery strategy (``RETRY`` or ``BACKOFF``), then a jittered
+    exponential policy built from ``max_retries`` and ``retry_delay``.
+    Validation errors are not retried by default. Every retry must also
+    fit the caller's deadline and draw from the shared ``RetryBudget``.
+    
+    Tasks run in the lane declared by ``Task.lane`` or the agent class's
+    ``execution_lane``: on the event loop, in a thread, or in a worker
+    process, so CPU-bound agents do not stall other tasks.
+    """
     
     def __init__(
         self,
         max_retries: int = 3,
         retry_delay: float = 1.0,
         timeout: float = 30.0,
-        max_concurrent_tasks: int = 5
+        max_concurrent_tasks: int = 5,
+        metrics: Optional[MetricsCollector] = None,
+        error_handler: Optional["ErrorHandler"] = None,
+        retry_policies: Optional[Dict[Type[BaseException], RetryPolicy]] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        lanes: Optional[LanePools] = None
     ):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.timeout = timeout
         self.max_concurrent_tasks = max_concurrent_tasks
         self.semaphore = asyncio.Semaphore(max_concurrent_tasks)
+        self.metrics = metrics
+        self.error_handler = error_handler
+        self.retry_policies: Dict[Type[BaseException], RetryPolicy] = {
+            ValueError: NO_RETRY,
+            **(retry_policies or {})
+        }
+        self.default_retry_policy = RetryPolicy(
+            max_attempts=max_retries + 1,
+            base_delay=retry_delay,
+            max_delay=retry_delay * 30
+        )
+        self.retry_budget = retry_budget or shared_retry_budget
+        self.lanes = lanes or LanePools()
+        self.limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
         self.logger = get_logger(self.__class__.__name__)
     
-    async def execute_task(self, task: Task, agent: Any) -> TaskResult:
-        """Execute a single task with retries and error handling."""
+    async def warm_up(self) -> None:
+        """Start process-lane workers ahead of the first CPU-bound task."""
+        await self.lanes.warm_up()
+    
+    def shutdown(self) -> None:
+        """Stop thread and process lane workers."""
+        self.lanes.shutdown()
+    
+    def get_limiter(self, agent: Any) -> AdaptiveConcurrencyLimiter:
+        """Get the adaptive limiter shared by all agents of this type."""
+        name = agent.__class__.__name__
+        limiter = self.limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                name=name,
+                initial_limit=self.max_concurrent_tasks,
+                max_limit=self.max_concurrent_tasks
+            )
+            self.limiters[name] = limiter
+        return limiter
+    
+    async def execute_task(
+        self,
+        task: Task,
+        agent: Any,
+        deadline: Optional[float] = None
+    ) -> TaskResult:
+        """Execute a single task with retries and error handling.
+        
+        ``deadline`` is a ``time.monotonic()`` value; the caller's deadline
+        from ``deadline_scope`` also applies. Attempts are cut short at the
+        deadline and no retry starts that could not begin before it.
+        """
         task_result = TaskResult(task, TaskStatus.PENDING)
+        limiter = self.get_limiter(agent)
+        deadline = earliest_deadline(deadline, current_deadline())
+        first_attempt = time.monotonic()
+        delay: Optional[float] = None
+        self.retry_budget.record_request()
         
-        for attempt in range(self.max_retries + 1):
-            task_result.attempts = attempt + 1
+        while True:
+            task_result.attempts += 1
             
+            await limiter.acquire()
+            outcome = LimitOutcome.IGNORED
+            started = None
             try:
                 async with self.semaphore:
-                    self.logger.info(f"Executing task {task.action} (attempt {attempt + 1}/{self.max_retries + 1})")
+                    timeout = self.timeout
+                    if deadline is not None:
+                        timeout = min(timeout, deadline - time.monotonic())
+                        if timeout <= 0:
+                            raise asyncio.TimeoutError()
+                    
+                    self.logger.info(f"Executing task {task.action} (attempt {task_result.attempts})")
                     task_result.status = TaskStatus.RUNNING
+                    started = time.monotonic()
                     
                     # Execute task with timeout
                     result = await asyncio.wait_for(
-                        agent.execute(task),
-                        timeout=self.timeout
+                        self.lanes.run(self.lanes.lane_for(task, agent), agent, task),
+                        timeout=timeout
                     )
                     
+                    outcome = LimitOutcome.SUCCESS
                     task_result.status = TaskStatus.COMPLETED
                     task_result.result = result
                     task_result.end_time = datetime.now()
@@ -102,75 +246,207 @@ class TaskExecutor:
                     return task_result
                     
             except asyncio.TimeoutError:
-                error_msg = f"Task {task.action} timed out after {self.timeout} seconds"
+                if started is None:
+                    error_msg = f"Task {task.action} missed its deadline"
+                else:
+                    outcome = LimitOutcome.TIMEOUT
+                    error_msg = f"Task {task.action} timed out after {timeout:.3g} seconds"
                 self.logger.error(error_msg)
                 task_result.error = TimeoutError(error_msg)
                 
             except Exception as e:
+                outcome = LimitOutcome.ERROR
                 error_msg = f"Task {task.action} failed: {str(e)}\n{traceback.format_exc()}"
                 self.logger.error(error_msg)
                 task_result.error = e
             
+            finally:
+                latency = time.monotonic() - started if started is not None else 0.0
+                limiter.release(outcome, latency)
+                self._record_concurrency(limiter)
+            
             # Handle retry logic
-            if attempt < self.max_retries:
-                task_result.status = TaskStatus.RETRYING
-                self.logger.info(f"Retrying task {task.action} after {self.retry_delay} seconds")
-                await asyncio.sleep(self.retry_delay)
-            else:
+            policy = self._retry_policy(task_result.error)
+            delay = policy.next_delay(delay)
+            refusal = self._refuse_retry(policy, task_result.attempts, first_attempt, delay, deadline)
+            if refusal:
                 task_result.status = TaskStatus.FAILED
-                self.logger.error(f"Task {task.action} failed after {attempt + 1} attempts")
+                self.logger.error(
+                    f"Task {task.action} failed after {task_result.attempts} attempts ({refusal})"
+                )
+                break
+            
+            task_result.status = TaskStatus.RETRYING
+            self.logger.info(f"Retrying task {task.action} after {delay:.2f} seconds")
+            await asyncio.sleep(delay)
         
         task_result.end_time = datetime.now()
         return task_result
     
-    async def execute_tasks(self, tasks: List[Task], agents: Dict[str, Any]) -> List[TaskResult]:
-        """Execute multiple tasks with proper dependency handling."""
-        self.logger.info(f"Executing {len(tasks)} tasks")
-        results = []
+    def _retry_policy(self, error: BaseException) -> RetryPolicy:
+        """Pick the retry policy for an error."""
+        policy = policy_for(error, self.retry_policies)
+        if policy is None and self.error_handler is not None:
+            policy = self.error_handler.get_retry_policy(error)
+        return policy or self.default_retry_policy
+    
+    def _refuse_retry(
+        self,
+        policy: RetryPolicy,
+        attempts: int,
+        first_attempt: float,
+        delay: float,
+        deadline: Optional[float]
+    ) -> Optional[str]:
+        """Why another attempt must not be made, or None to retry."""
+        now = time.monotonic()
+        if not policy.allows(attempts, now - first_attempt, delay):
+            return "retry policy exhausted"
+        if deadline is not None and now + delay >= deadline:
+            return "deadline would be missed"
+        if not self.retry_budget.try_acquire():
+            if self.metrics is not None:
+                self.metrics.record(
+                    name="task_retries_rejected",
+                    value=1,
+                    metric_type=MetricType.COUNTER,
+                    component="task_executor",
+                    labels={"reason": "budget"}
+                )
+            return "retry budget exhausted"
+        return None
+    
+    async def execute_tasks(
+        self,
+        tasks: List[Task],
+        agents: Dict[str, Any],
+        deadline: Optional[float] = None
+    ) -> List[TaskResult]:
+        """Execute multiple tasks as a dependency graph.
         
-        # Group tasks by dependency level
-        task_groups = self._group_tasks_by_dependencies(tasks)
+        Scheduling is as in ``execute_tasks_stream``. Results are returned
+        in the order the tasks were given.
+        """
+        results: List[Optional[TaskResult]] = [None] * len(tasks)
+        async for index, result in self._schedule(tasks, agents, deadline):
+            results[index] = result
+        return results
+    
+    async def execute_tasks_stream(
+        self,
+        tasks: List[Task],
+        agents: Dict[str, Any],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[TaskResult]:
+        """Execute multiple tasks, yielding each result as it completes.
         
-        # Execute tasks level by level
-        for task_group in task_groups:
-            group_results = await asyncio.gather(
-                *[
-                    self.execute_task(task, agents[task.action])
-                    for task in task_group
-                ],
-                return_exceptions=True
-            )
-            results.extend(group_results)
+        Each task starts as soon as every task it depends on has finished,
+        rather than waiting for a whole dependency level. Among ready tasks,
+        higher ``Task.priority`` runs first, with at most
+        ``max_concurrent_tasks`` in flight. A ready task whose agent is at
+        its adaptive limit is held back so lower-priority work for other
+        agents can use the slot. ``deadline`` applies to every task, as in
+        ``execute_task``.
         
-        return results
+        Closing the iterator early cancels tasks still running.
+        """
+        async for _, result in self._schedule(tasks, agents, deadline):
+            yield result
     
-    def _group_tasks_by_dependencies(self, tasks: List[Task]) -> List[List[Task]]:
-        """Group tasks by their dependency levels."""
-        # Initialize groups
-        groups: List[List[Task]] = []
-        remaining_tasks = tasks.copy()
-        processed_actions = set()
+    async def _schedule(
+        self,
+        tasks: List[Task],
+        agents: Dict[str, Any],
+        deadline: Optional[float]
+    ) -> AsyncIterator[Tuple[int, TaskResult]]:
+        """Run the ready-queue scheduler, yielding ``(index, result)`` pairs."""
+        self.logger.info(f"Executing {len(tasks)} tasks")
+        dependents, in_degree = build_dependency_graph(tasks)
         
-        while remaining_tasks:
-            # Find tasks with satisfied dependencies
-            current_group = [
-                task for task in remaining_tasks
-                if not task.dependencies or all(dep in processed_actions for dep in task.dependencies)
-            ]
-            
-            if not current_group:
-                # Circular dependency or missing dependency
-                self.logger.error("Circular or missing dependency detected")
-                raise ValueError("Circular or missing dependency detected in tasks")
-            
-            # Add current group to groups
-            groups.append(current_group)
-            
-            # Update processed actions and remaining tasks
-            processed_actions.update(task.action for task in current_group)
-            remaining_tasks = [
-                task for task in remaining_tasks
-                if task not in current_group
-            ]
+        ready: List[Tuple[int, int]] = []
+        for index, task in enumerate(tasks):
+            if not in_degree[index]:
+                heapq.heappush(ready, (-task.priority, index))
+        
+        running: Dict[asyncio.Task, int] = {}
+        agent_running: Dict[str, int] = defaultdict(int)
+        
+        def launch_ready() -> None:
+            deferred: List[Tuple[int, int]] = []
+            while ready and len(running) < self.max_concurrent_tasks:
+                entry = heapq.heappop(ready)
+                task = tasks[entry[1]]
+                limiter = self.get_limiter(agents[task.action])
+                if agent_running[limiter.name] >= limiter.limit:
+                    deferred.append(entry)
+                    continue
+                agent_running[limiter.name] += 1
+                running[asyncio.create_task(
+                    self.execute_task(task, agents[task.action], deadline)
+                )] = entry[1]
+            for entry in deferred:
+                heapq.heappush(ready, entry)
+            self._record_queue_depths(tasks, agents, ready)
         
-        return groups
+        try:
+            launch_ready()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                finished: List[Tuple[int, TaskResult]] = []
+                for future in done:
+                    index = running.pop(future)
+                    agent_running[self.get_limiter(agents[tasks[index].action]).name] -= 1
+                    finished.append((index, future.result()))
+                    for dependent in dependents[index]:
+                        in_degree[dependent] -= 1
+                        if not in_degree[dependent]:
+                            heapq.heappush(ready, (-tasks[dependent].priority, dependent))
+                
+                # Start newly ready work before handing results to the consumer
+                launch_ready()
+                for item in finished:
+                    yield item
+        finally:
+            for future in running:
+                future.cancel()
+    
+    def _record_concurrency(self, limiter: AdaptiveConcurrencyLimiter) -> None:
+        """Publish an agent's current limit and permit queue."""
+        if self.metrics is None:
+            return
+        labels = {"agent": limiter.name}
+        self.metrics.record(
+            name="task_concurrency_limit",
+            value=limiter.limit,
+            metric_type=MetricType.GAUGE,
+            component="task_executor",
+            labels=labels
+        )
+        self.metrics.record(
+            name="task_queue_depth",
+            value=limiter.queued,
+            metric_type=MetricType.GAUGE,
+            component="task_executor",
+            labels=labels
+        )
+    
+    def _record_queue_depths(
+        self,
+        tasks: List[Task],
+        agents: Dict[str, Any],
+        ready: List[Tuple[int, int]]
+    ) -> None:
+        """Publish ready tasks still waiting per agent, plus permit queues."""
+        if self.metrics is None:
+            return
+        waiting: Dict[str, int] = defaultdict(int)
+        for _, index in ready:
+            waiting[self.get_limiter(agents[tasks[index].action]).name] += 1
+        for name, limiter in self.limiters.items():
+            self.metrics.record(
+                name="task_queue_depth",
+                value=waiting[name] + limiter.queued,
+                metric_type=MetricType.GAUGE,
+                component="task_executor",
+                labels={"agent": name}
+            )
@@ -1,8 +1,8 @@
 """Real-time monitoring dashboard for Arcana agents."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import uvicorn
@@ -67,6 +67,24 @@ class Dashboard:
         """Get recent error log."""
         return self.error_handler.get_recent_errors()
 
+    async def get_metric_history(
+        self,
+        series_key: str,
+        start: datetime,
+        end: Optional[datetime] = None,
+        max_points: int = 500
+    ) -> List[Dict[str, Any]]:
+        """Get archived rollups for a series, e.g. ``memory_hits{memory_type="working"}``."""
+        if self.metrics.archive is None:
+            return []
+        points = await self.metrics.archive.query(
+            series_key,
+            start,
+            end,
+            max_points=max_points
+        )
+        return [point.to_dict() for point in points]
+
 # Initialize dashboard
 dashboard = None
 
@@ -198,6 +216,12 @@ async def get_dashboard():
     """
     return HTMLResponse(content=html_content)
 
+@app.get("/api/metrics/history")
+async def get_metric_history(series: str, hours: float = 1.0, max_points: int = 500):
+    """Serve archived history for one metric series."""
+    start = datetime.now() - timedelta(hours=hours)
+    return await dashboard.get_metric_history(series, start, max_points=max_points)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Handle WebSocket connections for real-time updates."""
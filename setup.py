@@ -19,7 +19,9 @@ setup(
         "webdriver-manager>=4.0.1",
         "python-dateutil>=2.8.2",
         "playwright>=1.49.0",
-        "typing-extensions>=4.9.0"
+        "typing-extensions>=4.9.0",
+        "numpy>=1.24.0",
+        "pyyaml>=6.0"
     ],
     extras_require={
         "dev": [
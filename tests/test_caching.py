@@ -2,14 +2,23 @@
 
 import pytest
 import asyncio
+import json
+import time
 from datetime import datetime, timedelta
 
 from core.caching import (
     Cache,
     CacheEntry,
+    CachePolicy,
     CacheStrategy,
-    cached
+    SQLiteCacheBackend,
+    TimerWheel,
+    cached,
+    estimate_size,
+    make_key
 )
+from core.distributed_cache import LocalRedisServer, RedisCacheBackend
+from core.monitoring import MetricsCollector
 
 @pytest.fixture
 async def cache():
@@ -102,6 +111,72 @@ async def test_cache_decorator():
     assert result3 == "result_other"
     assert call_count == 2
 
+async def test_cache_decorator_coalesces_concurrent_misses():
+    """Test that concurrent misses for one key share a single call."""
+    call_count = 0
+    collector = MetricsCollector()
+    
+    @cached(ttl=timedelta(seconds=1), metrics=collector, name="slow_lookup")
+    async def slow_lookup(arg):
+        nonlocal call_count
+        call_count += 1
+        await asyncio.sleep(0.05)
+        return f"result_{arg}"
+    
+    results = await asyncio.gather(*(slow_lookup("same") for _ in range(50)))
+    assert results == ["result_same"] * 50
+    assert call_count == 1
+    assert await slow_lookup("same") == "result_same"
+    
+    assert slow_lookup.cache_stats == {
+        "hits": 1, "misses": 1, "coalesced": 49, "stale": 0
+    }
+    coalesced = collector.aggregator.get_statistics("cache_coalesced_total")
+    assert coalesced["sum"] == 49
+
+async def test_cache_decorator_shares_errors():
+    """Test that a failed call is reported to every waiter and not cached."""
+    call_count = 0
+    
+    @cached()
+    async def failing():
+        nonlocal call_count
+        call_count += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+    
+    results = await asyncio.gather(failing(), failing(), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert call_count == 1
+    
+    with pytest.raises(ValueError):
+        await failing()
+    assert call_count == 2
+
+async def test_cache_decorator_stale_while_revalidate():
+    """Test that stale entries are served while one refresh runs."""
+    version = 0
+    
+    @cached(
+        ttl=timedelta(milliseconds=50),
+        stale_while_revalidate=timedelta(seconds=5)
+    )
+    async def fetch():
+        nonlocal version
+        version += 1
+        await asyncio.sleep(0.02)
+        return version
+    
+    assert await fetch() == 1
+    await asyncio.sleep(0.1)
+    
+    # Both callers get the stale value; only one refresh starts
+    assert await asyncio.gather(fetch(), fetch()) == [1, 1]
+    await asyncio.sleep(0.05)
+    assert await fetch() == 2
+    assert version == 2
+    assert fetch.cache_stats["stale"] == 2
+
 async def test_cache_hit_tracking(cache):
     """Test cache hit counting."""
     await cache.set("test_key", "test_value")
@@ -174,3 +249,538 @@ async def test_cache_cleanup(cache):
     # Check results
     assert await cache.get("key1") is None  # Should be cleaned up
     assert await cache.get("key2") == "value2"  # Should still exist
+
+def test_timer_wheel_only_returns_due_keys():
+    """Test that the timer wheel yields keys by elapsed slot."""
+    wheel = TimerWheel(resolution=1.0)
+    wheel.add("early", 10.2)
+    wheel.add("later", 11.5)
+    wheel.add("removed", 10.4)
+    wheel.add("future", 50.0)
+    wheel.remove("removed", 10.4)
+    
+    assert wheel.due(9.0) == []
+    # The current slot's keys are returned as candidates to check
+    assert wheel.due(10.5) == ["early"]
+    assert sorted(wheel.due(12.0)) == ["early", "later"]
+    assert wheel.due(12.0) == []
+
+async def test_caches_share_one_maintenance_task():
+    """Test that started caches share a maintenance task that expires entries."""
+    from core import caching
+    
+    interval = caching._maintenance.interval
+    caching._maintenance.interval = 0.05
+    first = Cache[str](default_ttl=timedelta(milliseconds=50))
+    second = Cache[str](default_ttl=timedelta(milliseconds=50))
+    try:
+        await first.start()
+        await second.start()
+        task = caching._maintenance._task
+        assert task is not None and not task.done()
+        
+        await first.set("key", "value")
+        await second.set("key", "value")
+        await asyncio.sleep(0.3)
+        assert "key" not in first._cache
+        assert "key" not in second._cache
+        assert caching._maintenance._task is task
+    finally:
+        caching._maintenance.interval = interval
+        await first.stop()
+        await second.stop()
+    assert caching._maintenance._task is None
+
+async def test_lfu_eviction():
+    """Test LFU eviction removes the least frequently used entry."""
+    cache = Cache[str](max_size=3, strategy=CacheStrategy.LFU)
+    for i in range(3):
+        await cache.set(f"key_{i}", f"value_{i}")
+    
+    # key_1 is never read, the others are read at least once
+    await cache.get("key_0")
+    await cache.get("key_0")
+    await cache.get("key_2")
+    
+    await cache.set("new_key", "new_value")
+    assert await cache.get("key_1") is None
+    assert await cache.get("key_0") == "value_0"
+    assert await cache.get("key_2") == "value_2"
+    
+    # new_key has never been read, so it is the next victim
+    await cache.set("another_key", "another_value")
+    assert "new_key" not in cache._cache
+
+async def test_ttl_eviction():
+    """Test TTL eviction removes the entry closest to expiration."""
+    cache = Cache[str](max_size=3, strategy=CacheStrategy.TTL)
+    await cache.set("long", "value", ttl=timedelta(hours=2))
+    await cache.set("short", "value", ttl=timedelta(minutes=1))
+    await cache.set("medium", "value", ttl=timedelta(hours=1))
+    
+    await cache.set("new_key", "new_value", ttl=timedelta(hours=3))
+    assert await cache.get("short") is None
+    
+    # Invalidated entries are never picked as victims
+    await cache.invalidate("medium")
+    await cache.set("other", "value", ttl=timedelta(hours=3))
+    await cache.set("last", "value", ttl=timedelta(hours=3))
+    assert "long" not in cache._cache
+    assert set(cache._cache) == {"new_key", "other", "last"}
+
+async def test_overwrite_does_not_evict():
+    """Test that overwriting an existing key at capacity keeps other entries."""
+    cache = Cache[str](max_size=2, strategy=CacheStrategy.FIFO)
+    await cache.set("key_0", "value_0")
+    await cache.set("key_1", "value_1")
+    await cache.set("key_1", "updated")
+    
+    assert await cache.get("key_0") == "value_0"
+    assert await cache.get("key_1") == "updated"
+
+async def test_byte_budget_eviction():
+    """Test eviction driven by the byte budget rather than entry count."""
+    cache = Cache[str](max_size=100, strategy=CacheStrategy.LRU, max_bytes=100)
+    await cache.set("small_1", "x" * 10)
+    await cache.set("small_2", "x" * 10)
+    await cache.set("large", "x" * 70)
+    assert cache.get_stats()["bytes"] == 90
+    
+    # Adding 30 bytes must push out the least recently used entry
+    await cache.get("small_1")
+    await cache.set("medium", "x" * 30)
+    assert "small_2" not in cache._cache
+    assert "large" not in cache._cache
+    assert cache.get_stats()["bytes"] == 40
+    
+    # Values larger than the whole budget are not cached
+    await cache.set("huge", "x" * 101)
+    assert await cache.get("huge") is None
+    
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["bytes_utilization"] == 0.4
+
+async def test_oversized_overwrite_drops_stale_entry():
+    """Test an over-budget value still replaces the key's old entry."""
+    cache = Cache[str](max_size=100, max_bytes=100)
+    await cache.set("key", "small", tags={"group"})
+    await cache.set("key", "x" * 500)
+    
+    assert await cache.get("key") is None
+    assert "group" not in cache._tags
+    assert cache.get_stats()["bytes"] == 0
+
+async def test_byte_accounting_on_remove(cache):
+    """Test byte totals follow overwrites, invalidation and clear."""
+    await cache.set("key", "x" * 10)
+    await cache.set("key", "x" * 20)
+    assert cache.get_stats()["bytes"] == 20
+    
+    await cache.invalidate("key")
+    assert cache.get_stats()["bytes"] == 0
+    
+    await cache.set("key", "x" * 5)
+    await cache.clear()
+    assert cache.get_stats()["bytes"] == 0
+
+def test_estimate_size_handles_nested_values():
+    """Test size estimation of nested and self-referencing values."""
+    assert estimate_size("abcd") == 4
+    value = {"items": [{"name": f"item_{i}", "price": i} for i in range(50)]}
+    serialized = len(json.dumps(value, separators=(",", ":")))
+    assert abs(estimate_size(value) - serialized) / serialized < 0.25
+    assert estimate_size([1, 2.5, None]) > 0
+    
+    loop = []
+    loop.append(loop)
+    assert estimate_size(loop) > 0
+
+async def test_persistent_cache_survives_restart(tmp_path):
+    """Test that a persistent cache reloads entries after a restart."""
+    path = str(tmp_path / "cache.db")
+    cache = Cache[dict](backend=SQLiteCacheBackend(path))
+    assert cache.policy == CachePolicy.PERSISTENT
+    await cache.set("key", {"value": 1})
+    await cache.set("short", {"value": 2}, ttl=timedelta(milliseconds=50))
+    await cache.stop()
+    
+    await asyncio.sleep(0.1)
+    restarted = Cache[dict](backend=SQLiteCacheBackend(path))
+    assert "key" not in restarted._cache
+    assert await restarted.get("key") == {"value": 1}
+    assert "key" in restarted._cache  # promoted into the memory tier
+    assert await restarted.get("short") is None
+    
+    await restarted.invalidate("key")
+    assert await restarted.backend.get("key") is None
+    await restarted.stop()
+
+async def test_persistent_cache_eviction(tmp_path):
+    """Test that the persistent tier honors max_entries and small L1 sizes."""
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=3)
+    cache = Cache[str](max_size=1, backend=backend)
+    for i in range(5):
+        await cache.set(f"key_{i}", f"value_{i}")
+    
+    assert len(cache._cache) == 1
+    assert await backend.count() == 3
+    assert await cache.get("key_0") is None
+    assert await cache.get("key_2") == "value_2"
+    
+    await cache.clear()
+    assert await backend.count() == 0
+    await cache.stop()
+
+@pytest.fixture
+async def redis_server():
+    """Create an in-process Redis protocol server."""
+    server = LocalRedisServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+async def test_distributed_cache_shared_between_workers(redis_server):
+    """Test that two caches see each other's writes through the backend."""
+    def make_cache():
+        return Cache[dict](backend=RedisCacheBackend(
+            port=redis_server.port,
+            near_cache_ttl=timedelta(milliseconds=50)
+        ))
+    
+    worker_a, worker_b = make_cache(), make_cache()
+    assert worker_a.policy == CachePolicy.DISTRIBUTED
+    
+    await worker_a.set("prompt", {"answer": 42})
+    assert await worker_b.get("prompt") == {"answer": 42}
+    
+    # Hot keys are served from the near cache without a round trip
+    processed = redis_server.commands_processed
+    assert await worker_b.get("prompt") == {"answer": 42}
+    assert redis_server.commands_processed == processed
+    
+    # Invalidation reaches other workers once their near copy expires
+    await worker_a.invalidate("prompt")
+    await asyncio.sleep(0.1)
+    assert await worker_b.get("prompt") is None
+    
+    await worker_a.stop()
+    await worker_b.stop()
+
+async def test_distributed_backend_batches_and_ttl(redis_server):
+    """Test pipelined batch operations, expiry and namespaced clear."""
+    backend = RedisCacheBackend(port=redis_server.port, namespace="test")
+    other = RedisCacheBackend(port=redis_server.port, namespace="other")
+    
+    await backend.set_many({"a": 1, "b": 2}, None)
+    await backend.set("short", 3, datetime.now() + timedelta(milliseconds=50))
+    await other.set("a", "kept", None)
+    
+    stored = await backend.get_many(["a", "b", "missing", "short"])
+    assert {key: value for key, (value, _) in stored.items()} == {
+        "a": 1, "b": 2, "short": 3
+    }
+    assert stored["a"][1] is None
+    assert stored["short"][1] is not None
+    
+    await asyncio.sleep(0.1)
+    assert await backend.get("short") is None
+    
+    await backend.clear()
+    assert await backend.get_many(["a", "b"]) == {}
+    assert (await other.get("a"))[0] == "kept"
+    
+    await backend.close()
+    await other.close()
+
+async def test_batch_operations(cache):
+    """Test get_many, set_many and invalidate_many on the memory tier."""
+    await cache.set_many({"a": "1", "b": "2", "c": "3"})
+    assert await cache.get_many(["a", "c", "missing"]) == {"a": "1", "c": "3"}
+    
+    await cache.invalidate_many(["a", "b"])
+    assert await cache.get_many(["a", "b", "c"]) == {"c": "3"}
+
+async def test_batch_operations_with_backends(tmp_path, redis_server):
+    """Test that batch operations write through and read back from backends."""
+    for backend in (
+        SQLiteCacheBackend(str(tmp_path / "cache.db")),
+        RedisCacheBackend(port=redis_server.port)
+    ):
+        writer = Cache[int](backend=backend)
+        await writer.set_many({f"key_{i}": i for i in range(10)})
+        
+        reader = Cache[int](backend=backend)
+        await reader.set("key_0", 100)
+        found = await reader.get_many([f"key_{i}" for i in range(12)])
+        assert found == {"key_0": 100, **{f"key_{i}": i for i in range(1, 10)}}
+        assert len(reader._cache) == 10
+        
+        await reader.invalidate_many(["key_1", "key_2"])
+        stored = await backend.get_many(["key_1", "key_2", "key_3"])
+        assert list(stored) == ["key_3"]
+        assert stored["key_3"][0] == 3
+        await writer.stop()
+        await reader.stop()
+
+async def test_tag_invalidation():
+    """Test that tag invalidation drops exactly the tagged entries."""
+    cache = Cache[str](max_size=10)
+    await cache.set("profile", "p", tags=["user:1"])
+    await cache.set("history", "h", tags=["user:1", "domain:opentable.com"])
+    await cache.set("other", "o", tags=["user:2"])
+    
+    assert await cache.invalidate_tag("user:1") == 2
+    assert set(cache._cache) == {"other"}
+    assert "user:1" not in cache._tags
+    assert "domain:opentable.com" not in cache._tags
+    assert await cache.invalidate_tag("user:1") == 0
+    
+    # Evicted and overwritten entries leave the index too
+    await cache.set("other", "o2")
+    assert "user:2" not in cache._tags
+
+async def test_prefix_invalidation():
+    """Test prefix invalidation with and without the prefix index."""
+    indexed = Cache[str](prefix_separator=":")
+    plain = Cache[str]()
+    for cache in (indexed, plain):
+        await cache.set("workflow:1:step:a", "a")
+        await cache.set("workflow:1:step:b", "b")
+        await cache.set("workflow:10:step:a", "c")
+        
+        assert await cache.invalidate_prefix("workflow:1:") == 2
+        assert set(cache._cache) == {"workflow:10:step:a"}
+    
+    assert set(indexed._prefixes) == {"workflow:", "workflow:10:", "workflow:10:step:"}
+    assert await indexed.invalidate_prefix("workflow:1") == 1
+
+async def test_tag_and_prefix_invalidation_with_backends(tmp_path, redis_server):
+    """Test that backends drop tagged and prefixed entries other workers wrote."""
+    for backend in (
+        SQLiteCacheBackend(str(tmp_path / "cache.db")),
+        RedisCacheBackend(port=redis_server.port, namespace="tags")
+    ):
+        writer = Cache[str](backend=backend)
+        await writer.set("user:1:profile", "p", tags=["user:1"])
+        await writer.set("user:1:prefs", "q", tags=["user:1"])
+        await writer.set("user:2:profile", "r", tags=["user:2"])
+        await writer.set("page:[a]*", "s")
+        
+        reader = Cache[str](backend=backend)
+        assert await reader.get("user:1:profile") == "p"
+        
+        assert await reader.invalidate_tag("user:1") == 1
+        assert await writer.get_many(["user:1:profile", "user:1:prefs"]) == {
+            "user:1:profile": "p", "user:1:prefs": "q"
+        }  # the writer's near copies are untouched
+        assert await reader.get("user:1:prefs") is None
+        assert (await backend.get("user:2:profile"))[0] == "r"
+        
+        deleted = await backend.delete_prefix("page:[a]")
+        assert deleted == ["page:[a]*"]
+        await writer.stop()
+        await reader.stop()
+
+async def test_redis_tag_sets_follow_their_members(redis_server):
+    """Test that overwrites, deletes and expiry keep Redis tag sets in step."""
+    backend = RedisCacheBackend(port=redis_server.port, namespace="sets")
+    tag_set = backend._tag_key("user:1").encode()
+    
+    def live_sets():
+        return [key for key in list(redis_server._sets) if redis_server._alive(key)]
+    
+    await backend.set("profile", "p", None, tags=("user:1",))
+    await backend.set("prefs", "q", None, tags=("user:1",))
+    
+    # Rewriting a key without the tag takes it out of the tag's set
+    await backend.set("prefs", "q2", None)
+    assert redis_server._sets[tag_set] == {b"profile"}
+    assert await backend.delete_tag("user:1") == ["profile"]
+    assert (await backend.get("prefs"))[0] == "q2"
+    assert tag_set not in redis_server._sets
+    
+    # Deletes drop memberships, and the last one drops the set
+    await backend.set("profile", "p", None, tags=("user:1", "user:2"))
+    await backend.delete("profile")
+    assert live_sets() == []
+    
+    # Tag sets live at least as long as their longest-lived member
+    expires_at = datetime.now() + timedelta(milliseconds=200)
+    await backend.set("a", 1, datetime.now() + timedelta(milliseconds=50), tags=("t",))
+    await backend.set("b", 2, expires_at, tags=("t",))
+    await backend.set("c", 3, datetime.now() + timedelta(milliseconds=50), tags=("t",))
+    async with backend.pool.connection() as conn:
+        assert await conn.execute("PTTL", backend._tag_key("t")) > 100
+    await asyncio.sleep(0.3)
+    assert live_sets() == []
+    
+    # Tag sets outlive the TTL once a member has none
+    await backend.set("d", 4, datetime.now() + timedelta(milliseconds=50), tags=("t",))
+    await backend.set("e", 5, None, tags=("t",))
+    async with backend.pool.connection() as conn:
+        assert await conn.execute("PTTL", backend._tag_key("t")) == -1
+    
+    # Prefix deletes never match the tag sets themselves
+    assert await backend.delete_prefix("__") == []
+    assert sorted(await backend.delete_prefix("")) == ["d", "e", "prefs"]
+    assert live_sets() == []
+    await backend.close()
+
+async def test_redis_delete_tag_retries_after_concurrent_write(redis_server):
+    """Test that a write racing delete_tag aborts and retries its transaction."""
+    other = RedisCacheBackend(port=redis_server.port, namespace="race")
+    
+    class RacingBackend(RedisCacheBackend):
+        raced = False
+        
+        async def _watch_key_tags(self, conn, keys, tags=()):
+            result = await super()._watch_key_tags(conn, keys, tags)
+            if not self.raced:
+                self.raced = True
+                await other.set("late", "l", None, tags=("user:1",))
+            return result
+    
+    backend = RacingBackend(port=redis_server.port, namespace="race")
+    await backend.set("profile", "p", None, tags=("user:1",))
+    backend.raced = False
+    
+    assert await backend.delete_tag("user:1") == ["late", "profile"]
+    assert await backend.get_many(["late", "profile"]) == {}
+    await backend.close()
+    await other.close()
+
+def test_nowait_accessors():
+    """Test synchronous accessors on a memory-only cache."""
+    cache = Cache[str](max_size=2)
+    cache.set_nowait("a", "1")
+    cache.set_nowait("b", "2", ttl=timedelta(milliseconds=1))
+    assert cache.get_nowait("a") == "1"
+    assert cache.get_nowait("missing") is None
+    time.sleep(0.01)
+    assert cache.get_nowait("b") is None
+    
+    persistent = Cache[str](backend=SQLiteCacheBackend(":memory:"))
+    with pytest.raises(RuntimeError):
+        persistent.set_nowait("a", "1")
+
+def test_make_key():
+    """Test structural key building."""
+    assert make_key("a", 1) == make_key("a", 1)
+    assert make_key("1") != make_key(1)
+    assert make_key(x=1, y=2) == make_key(y=2, x=1)
+    assert make_key("a|b") != make_key("a", "b")
+    
+    # Positional arguments shaped like keyword pairs stay distinct
+    assert make_key((1,), [("a", 2)]) != make_key(1, a=2)
+    assert make_key((1,), (("a", 2),)) != make_key(1, a=2)
+    assert make_key("args", (1,), "kwargs", (("a", 2),)) != make_key(1, a=2)
+    
+    long_key = make_key("x" * 500)
+    assert len(long_key) == 32
+    assert long_key == make_key("x" * 500)
+
+@pytest.mark.slow
+async def test_key_and_lookup_benchmark():
+    """Benchmark key building and lookups against the previous approach."""
+    import hashlib
+    
+    def sha256_key(*args, **kwargs):
+        key_parts = [str(arg) for arg in args]
+        key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
+        return hashlib.sha256("|".join(key_parts).encode()).hexdigest()
+    
+    def ops_per_sec(func, n=50_000):
+        start = time.perf_counter()
+        for i in range(n):
+            func(i)
+        return n / (time.perf_counter() - start)
+    
+    old_keys = ops_per_sec(lambda i: sha256_key("query", i, user="alice"))
+    new_keys = ops_per_sec(lambda i: make_key("query", i, user="alice"))
+    
+    cache = Cache[int](max_size=1000)
+    for i in range(1000):
+        cache.set_nowait(f"key_{i}", i)
+    keys = [f"key_{i % 1000}" for i in range(50_000)]
+    
+    start = time.perf_counter()
+    for key in keys:
+        await cache.get(key)
+    async_gets = len(keys) / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for key in keys:
+        cache.get_nowait(key)
+    sync_gets = len(keys) / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for i in range(0, len(keys), 100):
+        await cache.get_many(keys[i:i + 100])
+    batch_gets = len(keys) / (time.perf_counter() - start)
+    
+    print(
+        f"\nkeys/s sha256 {old_keys:,.0f} -> make_key {new_keys:,.0f}; "
+        f"gets/s async {async_gets:,.0f}, nowait {sync_gets:,.0f}, "
+        f"get_many {batch_gets:,.0f}"
+    )
+    assert min(old_keys, new_keys, async_gets, sync_gets, batch_gets) > 0
+
+@pytest.mark.slow
+async def test_persistent_cache_benchmark(tmp_path):
+    """Benchmark warm-restart time and get latency for the persistent tier."""
+    entries = 20_000
+    path = str(tmp_path / "cache.db")
+    backend = SQLiteCacheBackend(path)
+    for i in range(entries):
+        await backend.set(f"key_{i}", {"id": i, "payload": "x" * 64}, None)
+    await backend.close()
+    
+    start = time.perf_counter()
+    backend = SQLiteCacheBackend(path)
+    assert await backend.count() == entries
+    restart = time.perf_counter() - start
+    
+    cache = Cache[dict](max_size=1000, backend=backend)
+    latencies = []
+    for i in range(2_000):
+        key = f"key_{(i * 7919) % entries}"
+        start = time.perf_counter()
+        assert await cache.get(key) is not None
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    
+    print(
+        f"\npersistent cache ({entries} entries): restart {restart * 1e3:.1f}ms, "
+        f"get p99 {p99 * 1e6:.0f}us"
+    )
+    await cache.stop()
+    assert p99 < 0.05
+
+@pytest.mark.slow
+@pytest.mark.parametrize("strategy", list(CacheStrategy))
+async def test_eviction_cost_is_constant(strategy):
+    """Benchmark set() at capacity for growing cache sizes."""
+    sizes = [1_000, 10_000, 100_000]
+    ops = 2_000
+    per_op = {}
+    
+    for size in sizes:
+        cache = Cache[str](max_size=size, strategy=strategy)
+        for i in range(size):
+            await cache.set(f"key_{i}", "value")
+        
+        start = time.perf_counter()
+        for i in range(ops):
+            await cache.set(f"extra_{i}", "value")
+        per_op[size] = (time.perf_counter() - start) / ops
+        assert len(cache._cache) == size
+    
+    print(
+        f"\n{strategy.value} set() at capacity: " + ", ".join(
+            f"{size}: {cost * 1e6:.1f}us" for size, cost in per_op.items()
+        )
+    )
+    # The old full scan grew 100x between the smallest and largest size
+    assert per_op[sizes[-1]] < per_op[sizes[0]] * 5
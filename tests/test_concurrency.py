@@ -0,0 +1,106 @@
+"""Tests for adaptive concurrency limits."""
+
+import pytest
+import asyncio
+
+from core.concurrency import AdaptiveConcurrencyLimiter, LimitOutcome
+
+@pytest.fixture
+def limiter():
+    """Create limiter fixture."""
+    return AdaptiveConcurrencyLimiter(
+        name="test_agent",
+        initial_limit=4,
+        min_limit=1,
+        max_limit=8
+    )
+
+async def test_limit_bounds_in_flight_work(limiter):
+    """Test waiters are admitted only as permits are released."""
+    for _ in range(4):
+        await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 4
+    assert limiter.queued == 1
+    
+    limiter.release(LimitOutcome.SUCCESS, 0.01)
+    await waiter
+    assert limiter.in_flight == 4
+    assert limiter.queued == 0
+
+async def test_limit_grows_while_latency_is_flat(limiter):
+    """Test additive increase while saturated with steady latency."""
+    for _ in range(40):
+        for _ in range(limiter.limit):
+            await limiter.acquire()
+        for _ in range(limiter.limit):
+            limiter.release(LimitOutcome.SUCCESS, 0.01)
+    
+    assert limiter.limit == 8
+
+async def test_limit_does_not_grow_when_underused(limiter):
+    """Test successes below the limit do not raise it."""
+    for _ in range(50):
+        await limiter.acquire()
+        limiter.release(LimitOutcome.SUCCESS, 0.01)
+    
+    assert limiter.limit == 4
+
+async def test_timeouts_back_off_once_per_round(limiter):
+    """Test a burst of timeouts halves the limit once, then again later."""
+    for _ in range(4):
+        await limiter.acquire()
+    limiter.release(LimitOutcome.SUCCESS, 0.05)
+    for _ in range(3):
+        limiter.release(LimitOutcome.TIMEOUT, 1.0)
+    assert limiter.limit == 2
+    
+    await asyncio.sleep(0.06)
+    await limiter.acquire()
+    limiter.release(LimitOutcome.TIMEOUT, 1.0)
+    assert limiter.limit == 1
+    
+    # Never below the floor
+    await asyncio.sleep(0.06)
+    await limiter.acquire()
+    limiter.release(LimitOutcome.TIMEOUT, 1.0)
+    assert limiter.limit == 1
+
+async def test_latency_growth_backs_off(limiter):
+    """Test rising latency lowers the limit before anything times out."""
+    for _ in range(5):
+        await limiter.acquire()
+        limiter.release(LimitOutcome.SUCCESS, 0.01)
+    for _ in range(10):
+        await limiter.acquire()
+        limiter.release(LimitOutcome.SUCCESS, 0.2)
+    
+    assert limiter.limit < 4
+
+async def test_error_rate_threshold(limiter):
+    """Test isolated errors are tolerated but a high error rate backs off."""
+    await limiter.acquire()
+    limiter.release(LimitOutcome.SUCCESS, 0.05)
+    await limiter.acquire()
+    limiter.release(LimitOutcome.ERROR, 0.01)
+    assert limiter.limit == 4
+    
+    for _ in range(5):
+        await limiter.acquire()
+        limiter.release(LimitOutcome.ERROR, 0.01)
+    assert limiter.limit == 2
+
+async def test_cancelled_waiter_gives_up_its_place(limiter):
+    """Test cancelling a queued acquire leaves permits consistent."""
+    for _ in range(4):
+        await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    
+    assert limiter.queued == 0
+    limiter.release(LimitOutcome.IGNORED)
+    assert limiter.in_flight == 3
@@ -4,6 +4,7 @@ import logging
 from unittest.mock import Mock, AsyncMock
 from core.interfaces import Intent, Task
 from core.components import AnthropicNLU, SimpleTaskPlanner, SmartResponseBuilder
+from core.intent_cache import IntentCache
 
 class TestAnthropicNLU:
     @pytest.mark.asyncio
@@ -31,6 +32,20 @@ class TestAnthropicNLU:
         
         with pytest.raises(Exception):
             await nlu.parse("Test query")
+    
+    @pytest.mark.asyncio
+    async def test_parse_uses_intent_cache(self, mock_anthropic_client):
+        mock_message = Mock()
+        mock_message.content = [Mock(text='{"name": "book_table", "confidence": 0.9, "parameters": {"people": 2}}')]
+        create = AsyncMock(return_value=mock_message)
+        mock_anthropic_client.return_value.messages.create = create
+        nlu = AnthropicNLU("test_api_key", intent_cache=IntentCache())
+        
+        first = await nlu.parse("Book a table for two")
+        second = await nlu.parse("book a table for 2!")
+        
+        assert first == second
+        assert create.await_count == 1
 
 class TestSimpleTaskPlanner:
     @pytest.mark.asyncio
@@ -95,6 +110,29 @@ class TestSmartResponseBuilder:
         assert "Successfully test action" in response
         assert "Test completed successfully" in response
     
+    @pytest.mark.asyncio
+    async def test_build_response_stream(self, response_builder):
+        async def results():
+            yield {"action": "fetch_data", "status": "completed", "result": "3 rows"}
+            yield {"action": "send_email", "status": "failed"}
+        
+        fragments = [f async for f in response_builder.build_response_stream(results())]
+        
+        assert fragments == ["Successfully fetch data. 3 rows", "Could not complete send_email"]
+        assert ". ".join(fragments) == await response_builder.build_response([
+            {"action": "fetch_data", "status": "completed", "result": "3 rows"},
+            {"action": "send_email", "status": "failed"}
+        ])
+    
+    @pytest.mark.asyncio
+    async def test_build_response_stream_empty(self, response_builder):
+        async def results():
+            return
+            yield
+        
+        fragments = [f async for f in response_builder.build_response_stream(results())]
+        assert fragments == ["No results to report."]
+    
     @pytest.mark.asyncio
     async def test_build_error_response(self, response_builder):
         error = Exception("Test error")
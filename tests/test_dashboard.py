@@ -0,0 +1,71 @@
+"""Tests for the monitoring dashboard API."""
+
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+import monitoring.dashboard as dashboard_module
+from core.agent_registry import AgentRegistry
+from core.error_handling import ErrorHandler
+from core.metrics_archive import MetricsArchive
+from core.monitoring import MetricsCollector, MetricType
+
+@pytest.fixture
+async def archived_dashboard(tmp_path, monkeypatch):
+    """Dashboard over a collector with a temporary metrics archive."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    metrics = MetricsCollector(archive=archive, archive_interval=3600)
+    error_handler = ErrorHandler()
+    dashboard = dashboard_module.Dashboard(
+        AgentRegistry(metrics, error_handler),
+        metrics,
+        error_handler
+    )
+    monkeypatch.setattr(dashboard_module, "dashboard", dashboard)
+    yield dashboard
+    await archive.close()
+
+async def test_get_metric_history(archived_dashboard):
+    """Test archived rollups are returned as point dicts."""
+    metrics = archived_dashboard.metrics
+    for value in (1.0, 2.0, 3.0):
+        metrics.record("queue_depth", value, MetricType.GAUGE, "test", labels={"queue": "a"})
+    await metrics.archive_metrics()
+    
+    points = await archived_dashboard.get_metric_history(
+        'queue_depth{queue="a"}',
+        datetime.now() - timedelta(minutes=5)
+    )
+    assert sum(point["count"] for point in points) == 3
+    assert sum(point["sum"] for point in points) == pytest.approx(6.0)
+    assert min(point["min"] for point in points) == 1.0
+    assert max(point["max"] for point in points) == 3.0
+    assert await archived_dashboard.get_metric_history("missing", datetime.now()) == []
+
+async def test_get_metric_history_without_archive():
+    """Test a collector without an archive has no history."""
+    metrics = MetricsCollector()
+    error_handler = ErrorHandler()
+    dashboard = dashboard_module.Dashboard(
+        AgentRegistry(metrics, error_handler),
+        metrics,
+        error_handler
+    )
+    assert await dashboard.get_metric_history("latency", datetime.now()) == []
+
+async def test_metric_history_endpoint(archived_dashboard):
+    """Test /api/metrics/history serves a series' archived history."""
+    metrics = archived_dashboard.metrics
+    for value in (4.0, 6.0):
+        metrics.record("latency", value, MetricType.HISTOGRAM, "test")
+    await metrics.archive_metrics()
+    
+    client = TestClient(dashboard_module.app)
+    response = client.get("/api/metrics/history", params={"series": "latency", "hours": 1})
+    assert response.status_code == 200
+    points = response.json()
+    assert sum(point["count"] for point in points) == 2
+    assert sum(point["sum"] for point in points) == pytest.approx(10.0)
+    
+    response = client.get("/api/metrics/history", params={"series": "missing"})
+    assert response.json() == []
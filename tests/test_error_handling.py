@@ -72,6 +72,22 @@ async def test_handle_error(error_handler):
     
     assert handled
 
+async def test_retry_policies_follow_recovery_strategy(error_handler):
+    """Test RETRY and BACKOFF strategies provide retry policies."""
+    backoff = error_handler.retry_policies[RecoveryStrategy.BACKOFF]
+    assert error_handler.get_retry_policy(TimeoutError()) is backoff
+    assert error_handler.get_retry_policy(ValueError()) is None
+    
+    try:
+        raise TimeoutError("slow dependency")
+    except Exception as e:
+        assert await error_handler.handle_error(e, {"component": "test"}) is backoff
+    
+    error_handler.set_recovery_strategy(ErrorCategory.RESOURCE, RecoveryStrategy.RETRY)
+    retry = error_handler.get_retry_policy(MemoryError())
+    assert retry is error_handler.retry_policies[RecoveryStrategy.RETRY]
+    assert retry.next_delay(retry.next_delay()) == retry.base_delay
+
 async def test_circuit_breaker_normal_operation(circuit_breaker):
     """Test circuit breaker under normal operation."""
     async def success_operation():
@@ -0,0 +1,161 @@
+"""Tests for the NLU intent cache."""
+
+import pytest
+import asyncio
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from core.caching import SQLiteCacheBackend
+from core.intent_cache import IntentCache, char_ngrams, normalize_query
+from core.interfaces import Intent
+from core.monitoring import MetricsCollector
+
+def _intent(name="book_table", **parameters):
+    return Intent(name=name, confidence=0.9, parameters=parameters)
+
+def test_normalize_query():
+    assert normalize_query("Book a table for Two tonight!") == "book a table for 2 tonight"
+    assert normalize_query("  book   a TABLE for 2, tonight ") == "book a table for 2 tonight"
+    assert normalize_query("Transfer 1,000 dollars") == "transfer 1000 dollars"
+    assert normalize_query("twenty-one guests at 07:30") == "21 guests at 07:30"
+    assert normalize_query("Ｃafé №5") == "café no 5"
+
+def test_char_ngrams():
+    assert char_ngrams("ab") == {" ab", "ab "}
+    assert char_ngrams("") == {"  "}
+
+async def test_exact_hit_after_normalization():
+    cache = IntentCache()
+    await cache.put("Book a table for two tonight", _intent(people=2))
+    
+    intent = await cache.get("book a table for 2 TONIGHT.")
+    
+    assert intent == _intent(people=2)
+    assert cache.stats == {"exact_hits": 1, "similar_hits": 0, "misses": 0}
+
+async def test_hits_are_copies():
+    cache = IntentCache()
+    await cache.put("weather in paris", _intent("weather", city="Paris"))
+    
+    (await cache.get("weather in paris")).parameters["city"] = "Rome"
+    
+    assert (await cache.get("weather in paris")).parameters == {"city": "Paris"}
+
+async def test_near_duplicates_hit_only_with_same_numbers():
+    cache = IntentCache(similarity_threshold=0.7)
+    await cache.put("book a table for 2 tonight", _intent(people=2))
+    
+    assert await cache.get("please book a table for 2 tonight") == _intent(people=2)
+    assert await cache.get("book a table for 4 tonight") is None
+    assert await cache.get("what is the weather tomorrow") is None
+    assert cache.stats == {"exact_hits": 0, "similar_hits": 1, "misses": 2}
+    assert cache.hit_rate == pytest.approx(1 / 3)
+    
+    exact_only = IntentCache(similarity_threshold=None)
+    await exact_only.put("book a table for 2 tonight", _intent(people=2))
+    assert await exact_only.get("please book a table for 2 tonight") is None
+
+async def test_near_duplicates_keep_their_own_entities():
+    cache = IntentCache()
+    await cache.put(
+        "please schedule a meeting with joan smith tomorrow afternoon",
+        _intent("schedule_meeting", person="Joan Smith", when="tomorrow afternoon")
+    )
+    
+    assert await cache.get("please schedule a meeting with john smith tomorrow afternoon") is None
+    assert await cache.get("please schedule a meeting with joan smith tomorrow afternoon!") is not None
+    similar = await cache.get("schedule a meeting with joan smith tomorrow afternoon")
+    assert similar.parameters["person"] == "Joan Smith"
+    assert cache.stats == {"exact_hits": 1, "similar_hits": 1, "misses": 1}
+
+async def test_ttl_and_confidence():
+    cache = IntentCache(ttl=timedelta(milliseconds=50), min_confidence=0.5)
+    await cache.put("book a table", _intent())
+    await cache.put("maybe something", Intent(name="unclear", confidence=0.2, parameters={}))
+    
+    assert await cache.get("maybe something") is None
+    assert await cache.get("book a table") is not None
+    await asyncio.sleep(0.1)
+    assert await cache.get("book a table") is None
+    assert await cache.get("book a table please") is None
+    assert "book a table" not in cache._grams
+
+async def test_persistence(tmp_path):
+    path = str(tmp_path / "intents.db")
+    cache = IntentCache(backend=SQLiteCacheBackend(path))
+    await cache.put("book a table for 2", _intent(people=2))
+    await cache.close()
+    
+    reopened = IntentCache(backend=SQLiteCacheBackend(path))
+    assert await reopened.get("Book a table for two") == _intent(people=2)
+    await reopened.close()
+
+async def test_hit_rate_metrics():
+    metrics = MetricsCollector()
+    cache = IntentCache(metrics=metrics)
+    await cache.put("book a table", _intent())
+    
+    await cache.get("book a table")
+    await cache.get("cancel my booking")
+    
+    assert metrics.aggregator.get_statistics("intent_cache_exact_hits_total")["sum"] == 1
+    assert metrics.aggregator.get_statistics("intent_cache_misses_total")["sum"] == 1
+    assert metrics.aggregator.get_statistics("intent_cache_hit_rate")["min"] == 0.5
+
+@pytest.mark.slow
+async def test_intent_cache_repeat_traffic_benchmark():
+    """LLM calls and p50 latency for repeat-heavy traffic, with and without the cache."""
+    rng = random.Random(3)
+    templates = [
+        "book a table for {n} tonight",
+        "what is the weather in {city}",
+        "remind me to call {name} tomorrow",
+        "play some {genre} music",
+    ]
+    fillers = {
+        "n": ["2", "two", "4", "6"],
+        "city": ["Paris", "paris", "Tokyo", "Berlin"],
+        "name": ["Ana", "Sam", "Lee"],
+        "genre": ["jazz", "Jazz", "rock"],
+    }
+    prefixes = ["", "", "please ", "hey, ", "Could you "]
+    queries = [
+        rng.choice(prefixes) + rng.choice(templates).format(
+            **{key: rng.choice(values) for key, values in fillers.items()}
+        )
+        for _ in range(400)
+    ]
+    
+    calls = 0
+    
+    async def llm_parse(query):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)   # Stand-in for a Claude round trip
+        return _intent("parsed", query=normalize_query(query))
+    
+    async def run(cache):
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            intent = await cache.get(query) if cache else None
+            if intent is None:
+                intent = await llm_parse(query)
+                if cache:
+                    await cache.put(query, intent)
+            latencies.append(time.perf_counter() - start)
+        return statistics.median(latencies)
+    
+    uncached_p50 = await run(None)
+    uncached_calls, calls = calls, 0
+    cache = IntentCache()
+    cached_p50 = await run(cache)
+    
+    print(
+        f"LLM calls {uncached_calls} -> {calls}, hit rate {cache.hit_rate:.0%}, "
+        f"p50 {uncached_p50 * 1000:.1f} ms -> {cached_p50 * 1000:.2f} ms"
+    )
+    assert calls < uncached_calls / 2
+    assert cached_p50 < uncached_p50 / 10
@@ -0,0 +1,110 @@
+"""Tests for the local intent classifier."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+import statistics
+import time
+
+from core.intent_classifier import (
+    FastPathNLU,
+    IntentClassifier,
+    TrainingExample,
+    load_nlu_examples,
+    parse_example,
+    split_examples
+)
+from core.interfaces import Intent
+from core.monitoring import MetricsCollector
+
+@pytest.fixture(scope="module")
+def examples():
+    return load_nlu_examples("data/nlu.yml")
+
+@pytest.fixture(scope="module")
+def classifier(examples):
+    return IntentClassifier().fit(examples)
+
+def test_parse_example():
+    example = parse_example("add a new agent called [AgentX](agent_name)", "create_agent")
+    assert example == TrainingExample(
+        "add a new agent called AgentX", "create_agent", {"agent_name": "AgentX"}
+    )
+    
+    example = parse_example('fly to [New York]{"entity": "city", "role": "to"}', "book")
+    assert example.text == "fly to New York"
+    assert example.entities == {"city": "New York"}
+
+def test_load_nlu_examples(examples):
+    assert {example.intent for example in examples} == {"greet", "create_agent", "ask_help"}
+    assert all("[" not in example.text for example in examples)
+
+def test_split_keeps_every_intent_in_training(examples):
+    train, test = split_examples(examples, test_fraction=0.5, seed=1)
+    
+    assert len(train) + len(test) == len(examples)
+    assert {e.intent for e in train} == {e.intent for e in examples}
+    assert not {e.text for e in train} & {e.text for e in test}
+
+def test_confident_predictions(classifier):
+    assert classifier.predict("Hey!").name == "greet"
+    assert classifier.predict("I need some assistance please").name == "ask_help"
+    
+    intent = classifier.predict("please create an agent named AgentX")
+    assert intent.name == "create_agent"
+    assert intent.confidence >= classifier.threshold
+    assert intent.parameters == {"agent_name": "AgentX"}
+
+def test_unfamiliar_queries_are_not_answered(classifier):
+    name, confidence, coverage = classifier.classify("what's the weather in Paris")
+    
+    assert coverage < classifier.min_coverage
+    assert classifier.predict("what's the weather in Paris") is None
+    assert classifier.predict("") is None
+    
+    with pytest.raises(ValueError):
+        IntentClassifier().fit([])
+
+async def test_fast_path_falls_back_below_threshold(classifier):
+    fallback = Mock()
+    fallback.parse = AsyncMock(return_value=Intent(name="weather", confidence=0.9, parameters={}))
+    metrics = MetricsCollector()
+    nlu = FastPathNLU(classifier, fallback, metrics=metrics)
+    
+    assert (await nlu.parse("hello")).name == "greet"
+    assert (await nlu.parse("what's the weather in Paris")).name == "weather"
+    
+    fallback.parse.assert_awaited_once_with("what's the weather in Paris")
+    assert nlu.stats == {"local": 1, "fallback": 1}
+    local = metrics.aggregator.get_statistics("nlu_parse_duration_seconds", {"path": "local"})
+    assert local["count"] == 1
+
+@pytest.mark.slow
+def test_intent_classifier_latency_and_accuracy_report(examples, classifier):
+    """Classifier latency, plus accuracy on held-out examples over several splits."""
+    queries = [example.text for example in examples] + ["what's the weather in Paris"]
+    latencies = []
+    for _ in range(200):
+        for query in queries:
+            start = time.perf_counter()
+            classifier.predict(query)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"predict latency p50 {p50 * 1e6:.0f} us, p99 {p99 * 1e6:.0f} us")
+    
+    reports = []
+    for seed in range(10):
+        train, test = split_examples(examples, test_fraction=0.34, seed=seed)
+        reports.append(IntentClassifier().fit(train).evaluate(test))
+    accuracy = statistics.mean(report["accuracy"] for report in reports)
+    coverage = statistics.mean(report["coverage"] for report in reports)
+    answered = [report["answered_accuracy"] for report in reports if report["coverage"]]
+    print(
+        f"held-out accuracy {accuracy:.0%} over {len(reports)} splits of "
+        f"{len(examples)} examples; answered locally {coverage:.0%}, "
+        f"accuracy when answered {statistics.mean(answered):.0%}"
+    )
+    
+    assert p50 < 0.001
+    assert classifier.evaluate(examples)["accuracy"] == 1.0
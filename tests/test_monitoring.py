@@ -4,6 +4,10 @@ import pytest
 import asyncio
 from datetime import datetime, timedelta
 import json
+import random
+import numpy as np
+import statistics
+import time
 
 from core.monitoring import (
     MetricsCollector,
@@ -11,9 +15,23 @@ from core.monitoring import (
     Metric,
     SystemMetrics,
     MetricsAggregator,
+    MetricSeries,
     MetricsExporter,
-    Timer
+    QuantileSketch,
+    Timer,
+    TimerHandle
 )
+from core.metrics_archive import (
+    MetricsArchive,
+    RollupPoint,
+    decode_chunk,
+    decode_floats,
+    decode_timestamps,
+    encode_chunk,
+    encode_floats,
+    encode_timestamps
+)
+from core.system_sampler import SystemSampler
 
 @pytest.fixture
 async def metrics_collector():
@@ -203,3 +221,657 @@ async def test_timer_with_error(metrics_collector):
     error_stats = metrics_collector.aggregator.get_statistics("test_operation_errors_total")
     assert error_stats["count"] == 1
     assert error_stats["sum"] == 1
+
+
+def test_series_ring_buffer_wraps():
+    """Test ring buffer growth and overwrite of the oldest samples."""
+    series = MetricSeries("test_series", MetricType.GAUGE, capacity=8, initial_capacity=2)
+    now = time.time()
+    for i in range(12):
+        series.append(now + i, float(i))
+    
+    assert len(series) == 8
+    assert series.values().tolist() == [float(i) for i in range(4, 12)]
+    assert series.timestamps().tolist() == [now + i for i in range(4, 12)]
+    
+    # Trimming advances the head past expired samples
+    series.trim(now + 7)
+    assert series.values().tolist() == [8.0, 9.0, 10.0, 11.0]
+
+def test_statistics_match_statistics_module(metrics_aggregator):
+    """Test ring-buffer statistics against the statistics module."""
+    rng = random.Random(42)
+    values = [rng.uniform(0, 100) for _ in range(501)]
+    for value in values:
+        metrics_aggregator.add_sample(
+            "test_metric", MetricType.HISTOGRAM, value, time.time(), {}
+        )
+    
+    stats = metrics_aggregator.get_statistics("test_metric")
+    assert stats["count"] == len(values)
+    assert stats["min"] == min(values)
+    assert stats["max"] == max(values)
+    assert stats["median"] == statistics.median(values)
+    assert stats["mean"] == pytest.approx(statistics.mean(values))
+    assert stats["sum"] == pytest.approx(sum(values))
+    assert stats["stddev"] == pytest.approx(statistics.stdev(values))
+
+def test_late_sample_outside_window_is_dropped(metrics_aggregator):
+    """Test that a sample stamped before the window is not stored."""
+    now = time.time()
+    metrics_aggregator.add_sample("test_metric", MetricType.GAUGE, 1.0, now, {})
+    metrics_aggregator.add_sample("test_metric", MetricType.GAUGE, 2.0, now - 120, {})
+    
+    stats = metrics_aggregator.get_statistics("test_metric")
+    assert stats["count"] == 1
+    assert stats["stddev"] == 0.0
+
+def test_quantile_sketch_accuracy():
+    """Test sketch quantiles stay within the relative error bound."""
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(0, 1) for _ in range(20_000))
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert sketch.quantile(0) == values[0]
+    assert sketch.quantile(1) == values[-1]
+    assert sketch.count == len(values)
+
+def test_quantile_sketch_merge_and_serialization():
+    """Test merging partial sketches matches a single sketch."""
+    rng = random.Random(11)
+    values = [rng.uniform(-50, 50) for _ in range(5_000)] + [0.0] * 10
+    whole = QuantileSketch()
+    parts = [QuantileSketch() for _ in range(4)]
+    for i, value in enumerate(values):
+        whole.add(value)
+        parts[i % 4].add(value)
+    
+    # Ship partial sketches as if from worker processes
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(QuantileSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+    
+    for q in (0.01, 0.25, 0.5, 0.95, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+    assert merged.count == whole.count
+    
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+async def test_quantiles_in_exports(metrics_collector, metrics_exporter):
+    """Test p50/p95/p99 in statistics, JSON and Prometheus output."""
+    for i in range(1, 101):
+        metrics_collector.record(
+            name="test_latency",
+            value=i / 1000,
+            metric_type=MetricType.TIMER,
+            component="test"
+        )
+    
+    stats = metrics_collector.aggregator.get_statistics("test_latency")
+    assert stats["p50"] == pytest.approx(0.050, rel=0.03)
+    assert stats["p99"] == pytest.approx(0.099, rel=0.03)
+    
+    data = json.loads(metrics_exporter.export_json())
+    assert data["test_latency"]["p95"] == pytest.approx(0.095, rel=0.03)
+    
+    prometheus_output = metrics_exporter.export_prometheus()
+    assert "# TYPE test_latency summary" in prometheus_output
+    assert 'test_latency{quantile="0.99"}' in prometheus_output
+    assert "test_latency_count 100" in prometheus_output
+
+async def test_label_sets_are_separate_series(metrics_collector):
+    """Test that series are keyed by interned label sets."""
+    for agent, count in (("alpha", 3), ("beta", 2)):
+        for _ in range(count):
+            metrics_collector.record(
+                name="messages_sent",
+                value=1,
+                metric_type=MetricType.COUNTER,
+                component="test",
+                labels={"agent": agent, "kind": "direct"}
+            )
+    
+    aggregator = metrics_collector.aggregator
+    family = aggregator.metrics["messages_sent"]
+    assert len(family.series) == 2
+    
+    # Label order does not matter and tuples are shared
+    labels = aggregator.intern_labels({"kind": "direct", "agent": "alpha"})
+    assert labels is family.series[labels].labels
+    
+    assert aggregator.get_statistics("messages_sent")["count"] == 5
+    assert aggregator.get_statistics("messages_sent", {"agent": "beta", "kind": "direct"})["sum"] == 2
+    assert aggregator.get_statistics("messages_sent", {"agent": "gamma"}) == {}
+
+async def test_prometheus_exposition(metrics_collector, metrics_exporter):
+    """Test running values, histogram buckets and label escaping."""
+    for _ in range(1000):
+        metrics_collector.record(
+            name="requests_total",
+            value=1,
+            metric_type=MetricType.COUNTER,
+            component="test",
+            labels={"path": 'say "hi"\n'}
+        )
+    for value in (3.0, 7.0):
+        metrics_collector.record(
+            name="queue.depth",
+            value=value,
+            metric_type=MetricType.GAUGE,
+            component="test"
+        )
+    for value in (0.003, 0.2, 0.2, 42.0):
+        metrics_collector.record(
+            name="payload_seconds",
+            value=value,
+            metric_type=MetricType.HISTOGRAM,
+            component="test",
+            labels={"agent": "alpha"}
+        )
+    
+    lines = metrics_exporter.export_prometheus().split("\n")
+    
+    assert 'requests_total{path="say \\"hi\\"\\n"} 1000.0' in lines
+    assert sum(line.startswith("requests_total") for line in lines) == 1
+    assert "# TYPE queue_depth gauge" in lines
+    assert "queue_depth 7.0" in lines
+    assert "# TYPE payload_seconds histogram" in lines
+    assert 'payload_seconds_bucket{agent="alpha",le="0.005"} 1' in lines
+    assert 'payload_seconds_bucket{agent="alpha",le="0.25"} 3' in lines
+    assert 'payload_seconds_bucket{agent="alpha",le="10.0"} 3' in lines
+    assert 'payload_seconds_bucket{agent="alpha",le="+Inf"} 4' in lines
+    assert 'payload_seconds_count{agent="alpha"} 4' in lines
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def _fake_proc(root, cpu_line, cgroup="0::/app\n"):
+    _write(root / "stat", cpu_line)
+    _write(root / "meminfo", "MemTotal:       8000000 kB\nMemAvailable:   6000000 kB\n")
+    _write(root / "self" / "status", "Name:\tpython\nThreads:\t7\nVmRSS:\t  102400 kB\n")
+    _write(root / "self" / "cgroup", cgroup)
+    for fd in ("0", "1", "2"):
+        _write(root / "self" / "fd" / fd, "")
+
+def test_sampler_reports_cgroup_limits(tmp_path):
+    """Test container-aware CPU and memory from cgroup v2 files."""
+    proc = tmp_path / "proc"
+    cgroup = tmp_path / "cgroup" / "app"
+    _fake_proc(proc, "cpu  100 0 100 800 0 0 0 0 0 0\n")
+    _write(cgroup / "cpu.max", "50000 100000\n")
+    _write(cgroup / "cpu.stat", "usage_usec 1000000\n")
+    _write(cgroup / "memory.max", str(1024 ** 3))
+    _write(cgroup / "memory.current", str(600 * 1024 ** 2))
+    _write(cgroup / "memory.stat", f"anon 1\ninactive_file {88 * 1024 ** 2}\n")
+    
+    sampler = SystemSampler(proc_root=str(proc), cgroup_root=str(tmp_path / "cgroup"))
+    snapshot = sampler.sample()
+    
+    assert snapshot.containerized
+    assert snapshot.cpu_count == 0.5
+    assert snapshot.memory_total == 1024 ** 3
+    assert snapshot.memory_used == 512 * 1024 ** 2
+    assert snapshot.memory_percent == 50.0
+    assert snapshot.thread_count == 7
+    assert snapshot.open_files == 3
+    assert snapshot.process_memory_percent == pytest.approx(9.8, abs=0.1)
+
+def test_sampler_host_cpu_from_proc_stat(tmp_path):
+    """Test host CPU share from successive /proc/stat readings."""
+    proc = tmp_path / "proc"
+    _fake_proc(proc, "cpu  100 0 100 800 0 0 0 0 0 0\n", cgroup="1:cpu:/\n")
+    sampler = SystemSampler(proc_root=str(proc), cgroup_root=str(tmp_path / "cgroup"))
+    
+    assert sampler.sample().cpu_percent == 0.0
+    # 300 busy ticks out of 1000 since the previous sample
+    _write(proc / "stat", "cpu  300 0 200 1500 0 0 0 0 0 0\n")
+    snapshot = sampler.sample()
+    assert not snapshot.containerized
+    assert snapshot.cpu_percent == pytest.approx(30.0)
+    assert snapshot.memory_total == 8000000 * 1024
+    assert snapshot.memory_percent == 25.0
+
+async def test_shared_sampler_lifecycle():
+    """Test that collectors share one sampling thread."""
+    sampler = SystemSampler(interval=0.05)
+    first = MetricsCollector(system_metrics_interval=0.05, sampler=sampler)
+    second = MetricsCollector(system_metrics_interval=0.05, sampler=sampler)
+    
+    await first.start()
+    await second.start()
+    assert sampler.running
+    initial = sampler.snapshot
+    
+    await asyncio.sleep(0.2)
+    assert sampler.snapshot is not initial
+    assert first.aggregator.get_statistics("system_cpu_percent")["count"] >= 1
+    
+    await first.stop()
+    assert sampler.running
+    await second.stop()
+    assert not sampler.running
+
+def test_sampler_release_does_not_wait_for_thread():
+    """Test release returns at once and a quick re-acquire stops the old thread."""
+    sampler = SystemSampler(interval=5.0)
+    sampler.acquire()
+    old_thread = sampler._thread
+    
+    start = time.perf_counter()
+    sampler.release()
+    assert time.perf_counter() - start < 0.5
+    assert not sampler.running
+    
+    sampler.acquire()
+    old_thread.join(timeout=1)
+    assert not old_thread.is_alive()
+    assert sampler.running
+    sampler.release()
+
+def test_series_batch_extend_matches_appends():
+    """Test that vectorized batches match per-sample recording."""
+    rng = random.Random(3)
+    now = time.time()
+    samples = [(now + i * 0.01, rng.uniform(-1, 20)) for i in range(700)]
+    single = MetricSeries("s", MetricType.HISTOGRAM, capacity=512, slot_width=2.0)
+    batched = MetricSeries("s", MetricType.HISTOGRAM, capacity=512, slot_width=2.0)
+    
+    for timestamp, value in samples:
+        single.observe(value)
+        single.append(timestamp, value)
+    for start in range(0, len(samples), 300):
+        chunk = samples[start:start + 300]
+        batched.extend(
+            np.array([t for t, _ in chunk]),
+            np.array([v for _, v in chunk])
+        )
+    
+    assert batched.values().tolist() == single.values().tolist()
+    assert batched.timestamps().tolist() == single.timestamps().tolist()
+    assert batched.bucket_counts == single.bucket_counts
+    assert batched.observations == single.observations
+    assert batched.total == pytest.approx(single.total)
+    for q in (0.1, 0.5, 0.99):
+        assert batched.sketch().quantile(q) == single.sketch().quantile(q)
+
+async def test_timer_handle_decorator(metrics_collector):
+    """Test timing sync and async functions through a handle."""
+    handle = metrics_collector.timer("test_op", "test", {"path": "hot"})
+    assert metrics_collector.timer("test_op", "test", {"path": "hot"}) is handle
+    
+    @handle
+    def compute(x):
+        return x * 2
+    
+    @handle
+    async def fetch(x):
+        await asyncio.sleep(0.01)
+        return x
+    
+    assert compute(21) == 42
+    assert await fetch(7) == 7
+    
+    stats = metrics_collector.aggregator.get_statistics(
+        "test_op_duration_seconds", {"path": "hot"}
+    )
+    assert stats["count"] == 2
+    assert 0.01 <= stats["max"] < 0.5
+    assert fetch.__name__ == "fetch"
+
+async def test_timer_handle_context_and_errors(metrics_collector):
+    """Test sync/async context use and error counting."""
+    handle = metrics_collector.timer("test_ctx", "test")
+    
+    with handle.time():
+        pass
+    with pytest.raises(KeyError):
+        async with handle.time():
+            raise KeyError("missing")
+    
+    aggregator = metrics_collector.aggregator
+    assert aggregator.get_statistics("test_ctx_duration_seconds")["count"] == 2
+    assert aggregator.get_statistics("test_ctx_errors_total")["sum"] == 1
+
+async def test_timer_handle_sampling(metrics_collector):
+    """Test that sampled timers weight running totals."""
+    handle = metrics_collector.timer("test_sampled", "test", sample_rate=0.1)
+    
+    @handle
+    def fail_sometimes(i):
+        if i % 50 == 0:
+            raise ValueError(i)
+    
+    for i in range(1, 1001):
+        try:
+            fail_sometimes(i)
+        except ValueError:
+            pass
+    
+    aggregator = metrics_collector.aggregator
+    aggregator.flush()
+    series = aggregator.get_series("test_sampled_duration_seconds")
+    assert len(series) == 100
+    assert series.observations == 1000
+    assert aggregator.get_statistics("test_sampled_errors_total")["sum"] == 20
+    
+    with pytest.raises(ValueError):
+        TimerHandle(metrics_collector, "bad", "test", sample_rate=0)
+
+async def test_metrics_by_component_and_label(metrics_collector):
+    """Test component and label indexes used by the dashboard."""
+    for agent in ("memory_agent", "resource_agent"):
+        metrics_collector.record(
+            name="agent_requests",
+            value=1,
+            metric_type=MetricType.COUNTER,
+            component=agent,
+            labels={"agent": agent}
+        )
+    metrics_collector.record(
+        name="agent_queue_depth",
+        value=4,
+        metric_type=MetricType.GAUGE,
+        component="memory_agent"
+    )
+    with metrics_collector.timer("agent_step", "memory_agent", {"agent": "memory_agent"}).time():
+        pass
+    
+    memory = metrics_collector.get_metrics_by_component("memory_agent")
+    assert set(memory) == {
+        'agent_requests{agent="memory_agent"}',
+        "agent_queue_depth",
+        'agent_step_duration_seconds{agent="memory_agent"}'
+    }
+    assert memory["agent_queue_depth"]["value"] == 4
+    assert memory['agent_step_duration_seconds{agent="memory_agent"}']["window"]["count"] == 1
+    assert metrics_collector.get_metrics_by_component("unknown") == {}
+    
+    labelled = metrics_collector.get_metrics_by_label("agent", "resource_agent")
+    assert list(labelled) == ['agent_requests{agent="resource_agent"}']
+    assert labelled['agent_requests{agent="resource_agent"}']["value"] == 1
+
+async def test_summary_snapshots_are_cached(metrics_collector):
+    """Test that summaries are reused until their series change."""
+    def record(value):
+        metrics_collector.record(
+            name="test_latency",
+            value=value,
+            metric_type=MetricType.HISTOGRAM,
+            component="test"
+        )
+    
+    record(0.1)
+    record(0.3)
+    first = metrics_collector.get_summary()
+    assert first["components"]["test"] == 1
+    assert first["metrics"]["test_latency"]["observations"] == 2
+    assert first["metrics"]["test_latency"]["total"] == pytest.approx(0.4)
+    
+    series = metrics_collector.aggregator.get_series("test_latency")
+    snapshot = series.summary()
+    assert series.summary() is snapshot
+    assert metrics_collector.get_summary()["metrics"]["test_latency"] is first["metrics"]["test_latency"]
+    
+    record(0.5)
+    assert series.summary() is not snapshot
+    assert series.summary()["window"]["count"] == 3
+    assert metrics_collector.get_summary()["metrics"]["test_latency"]["observations"] == 3
+
+def test_archive_codecs_round_trip():
+    """Test delta-of-delta timestamps and XOR floats decode exactly."""
+    timestamps = [1_700_000_000, 1_700_000_010, 1_700_000_020, 1_700_000_031,
+                  1_700_000_100, 1_700_005_000, 1_600_000_000]
+    assert decode_timestamps(encode_timestamps(timestamps), len(timestamps)) == timestamps
+    
+    values = [0.0, 1.5, 1.5, -0.0, 1e-300, float("inf"), -3.25, 12345.678]
+    decoded = decode_floats(encode_floats(values), len(values))
+    assert [np.float64(v).tobytes() for v in decoded] == [np.float64(v).tobytes() for v in values]
+    
+    start = 1_700_000_000
+    points = [
+        RollupPoint(start + 10 * i, 5, 5.0 * i, 25.0 * i * i, i - 1.0, i + 1.0)
+        for i in range(360)
+    ]
+    blob = encode_chunk(points)
+    assert decode_chunk(blob) == points
+    assert len(blob) < 360 * 6 * 8 / 4
+
+def _archive_batch(key, start, count, step=1.0):
+    timestamps = start + np.arange(count) * step
+    return key, timestamps, np.arange(count, dtype=np.float64)
+
+async def test_archive_rolls_up_resolutions(tmp_path):
+    """Test 10s points roll up into minute and hour points."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    start = (time.time() // 3600 - 2) * 3600
+    
+    # Two hours of one sample per second
+    await archive.write([_archive_batch("latency", start, 7200)], now=start + 7200)
+    begin = datetime.fromtimestamp(start)
+    end = datetime.fromtimestamp(start + 7199)
+    
+    tens = await archive.query("latency", begin, end, resolution=10)
+    minutes = await archive.query("latency", begin, end, resolution=60)
+    hours = await archive.query("latency", begin, end, resolution=3600)
+    assert (len(tens), len(minutes), len(hours)) == (720, 120, 2)
+    for points in (tens, minutes, hours):
+        assert sum(p.count for p in points) == 7200
+        assert sum(p.sum for p in points) == pytest.approx(7199 * 7200 / 2)
+    assert hours[1].min == 3600 and hours[1].max == 7199
+    
+    # Unspecified resolution picks the finest one within max_points
+    assert len(await archive.query("latency", begin, end, max_points=200)) == 120
+    assert len(await archive.query("latency", begin, end, max_points=10)) == 2
+    
+    summary = await archive.summarize("latency", begin, end)
+    assert summary["count"] == 7200
+    assert summary["mean"] == pytest.approx(np.arange(7200).mean())
+    assert summary["stddev"] == pytest.approx(np.arange(7200).std(ddof=1))
+    assert summary["min"] == 0 and summary["max"] == 7199
+    await archive.close()
+
+async def test_archive_persists_across_restarts(tmp_path):
+    """Test open buckets survive close and merge with later writes."""
+    path = str(tmp_path / "metrics.db")
+    start = (time.time() // 60 - 10) * 60
+    begin = datetime.fromtimestamp(start)
+    
+    archive = MetricsArchive(path, chunk_points=4)
+    await archive.write([_archive_batch("requests", start, 25)], now=start + 25)
+    await archive.close()
+    
+    # Reopen and continue the same 10s bucket the first run force-closed
+    archive = MetricsArchive(path, chunk_points=4)
+    batch = ("requests", start + 25 + np.arange(35.0), np.ones(35))
+    await archive.write([batch], now=start + 60)
+    assert await archive.series_keys() == ["requests"]
+    
+    points = await archive.query("requests", begin, begin + timedelta(seconds=59), resolution=10)
+    assert [p.timestamp for p in points] == [start + 10 * i for i in range(6)]
+    assert points[2].count == 10
+    assert points[2].sum == pytest.approx(20 + 21 + 22 + 23 + 24 + 5)
+    assert sum(p.count for p in points) == 60
+    await archive.close()
+
+async def test_archive_keeps_late_points_in_their_bucket(tmp_path):
+    """Test a late sample lands in its own bucket, not the open one."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    start = (time.time() // 60 - 10) * 60
+    begin = datetime.fromtimestamp(start)
+    
+    await archive.write([_archive_batch("late", start, 30)], now=start + 25)
+    late = ("late", np.array([start + 5.0]), np.array([100.0]))
+    await archive.write([late], now=start + 30)
+    
+    points = await archive.query("late", begin, begin + timedelta(seconds=29), resolution=10)
+    assert [p.timestamp for p in points] == [start, start + 10, start + 20]
+    assert [p.count for p in points] == [11, 10, 10]
+    assert points[0].max == 100.0
+    assert points[2].max == 29.0
+    
+    await archive.close()
+    minutes = await archive.query("late", begin, begin + timedelta(seconds=59), resolution=60)
+    assert sum(p.count for p in minutes) == 31
+    await archive.close()
+
+async def test_archive_counts_samples_beyond_ring_buffer(tmp_path):
+    """Test archived counts include samples the ring buffer overwrote."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    collector = MetricsCollector(archive=archive, archive_interval=3600)
+    collector.aggregator.series_capacity = 1024
+    for i in range(10_000):
+        collector.record("burst", float(i % 10), MetricType.HISTOGRAM, "test")
+    series = collector.aggregator.get_series("burst")
+    assert len(series) == 1024
+    await collector.archive_metrics()
+    
+    summary = await archive.summarize("burst", datetime.now() - timedelta(minutes=1))
+    assert summary["count"] == series.observations == 10_000
+    assert summary["sum"] == pytest.approx(45_000)
+    assert summary["min"] == 0 and summary["max"] == 9
+    await archive.close()
+
+async def test_compare_with_history(tmp_path):
+    """Test values are scored against the archived baseline."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    collector = MetricsCollector(archive=archive, archive_interval=3600)
+    assert await collector.compare_with_history("latency", 5.0) is None
+    
+    for value in (1.0, 2.0, 3.0) * 10:
+        collector.record("latency", value, MetricType.HISTOGRAM, "test")
+    await collector.archive_metrics()
+    
+    # Recent samples are still in the open 10s bucket, so look back an hour
+    hour = timedelta(hours=1)
+    deviation = await collector.compare_with_history("latency", 12.0, hour)
+    assert deviation["baseline_count"] == 30
+    assert deviation["baseline_mean"] == pytest.approx(2.0)
+    assert deviation["zscore"] == pytest.approx(10 / deviation["baseline_stddev"])
+    assert await collector.compare_with_history("latency", 12.0, hour, min_samples=31) is None
+    assert await collector.compare_with_history("missing", 12.0, hour) is None
+    await archive.close()
+
+async def test_archive_weights_sampled_timers(tmp_path):
+    """Test archived counts and sums include the timer sampling weight."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    collector = MetricsCollector(archive=archive, archive_interval=3600)
+    handle = collector.timer("sampled_op", "test", sample_rate=0.25)
+    for _ in range(8):
+        handle.record_ns(2_000_000)
+    await collector.archive_metrics()
+    
+    summary = await archive.summarize(
+        "sampled_op_duration_seconds",
+        datetime.now() - timedelta(minutes=1)
+    )
+    assert summary["count"] == 32
+    assert summary["sum"] == pytest.approx(32 * 0.002)
+    assert summary["mean"] == pytest.approx(0.002)
+    await archive.close()
+
+async def test_archive_retention(tmp_path):
+    """Test chunks past their resolution's retention are dropped."""
+    archive = MetricsArchive(
+        str(tmp_path / "metrics.db"),
+        retention={
+            10: timedelta(minutes=5),
+            60: timedelta(hours=1),
+            3600: timedelta(days=1)
+        },
+        chunk_points=6
+    )
+    start = (time.time() // 3600 - 3) * 3600
+    await archive.write([_archive_batch("cpu", start, 600)], now=start + 600)
+    await archive.write([_archive_batch("cpu", start + 3000, 600)], now=start + 3600)
+    
+    begin = datetime.fromtimestamp(start)
+    tens = await archive.query("cpu", begin, resolution=10)
+    assert tens and min(p.timestamp for p in tens) >= start + 3000 - 60
+    assert len(await archive.query("cpu", begin, resolution=60)) == 20
+    await archive.close()
+
+async def test_collector_archives_new_samples(tmp_path):
+    """Test the collector archives each sample once."""
+    archive = MetricsArchive(str(tmp_path / "metrics.db"))
+    collector = MetricsCollector(archive=archive, archive_interval=3600)
+    await collector.start()
+    
+    for value in (1.0, 2.0, 3.0):
+        collector.record("queue_depth", value, MetricType.GAUGE, "test", labels={"queue": "a"})
+    await collector.archive_metrics()
+    collector.record("queue_depth", 4.0, MetricType.GAUGE, "test", labels={"queue": "a"})
+    await collector.archive_metrics()
+    
+    key = 'queue_depth{queue="a"}'
+    assert key in await archive.series_keys()
+    summary = await archive.summarize(key, datetime.now() - timedelta(minutes=1))
+    assert summary["count"] == 4
+    assert summary["sum"] == pytest.approx(10.0)
+    
+    await collector.stop()
+    assert archive._conn is None
+
+@pytest.mark.slow
+def test_add_metric_throughput_benchmark():
+    """Benchmark add_metric cost against the window size."""
+    for window in (1_000, 10_000):
+        aggregator = MetricsAggregator(series_capacity=window)
+        metric = Metric(
+            name="bench_metric",
+            type=MetricType.TIMER,
+            value=0.5,
+            timestamp=datetime.now(),
+            labels={},
+            component="bench"
+        )
+        for _ in range(window):
+            aggregator.add_metric(metric)
+        
+        start = time.perf_counter()
+        for _ in range(10_000):
+            aggregator.add_metric(metric)
+        elapsed = time.perf_counter() - start
+        print(f"window={window}: {elapsed / 10_000 * 1e6:.2f}us per add_metric")
+        assert len(aggregator.get_series("bench_metric")) == window
+
+@pytest.mark.slow
+def test_timer_overhead_benchmark():
+    """Benchmark instrumentation overhead per call."""
+    collector = MetricsCollector()
+    calls = 100_000
+    
+    def plain():
+        return None
+    
+    def measure(func):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            func()
+        return (time.perf_counter_ns() - start) / calls
+    
+    def with_context(handle):
+        def run():
+            with handle.time():
+                pass
+        return run
+    
+    baseline = measure(plain)
+    results = {
+        "decorator": measure(collector.timer("bench_full", "bench")(plain)),
+        "decorator (1% sampled)": measure(
+            collector.timer("bench_sampled", "bench", sample_rate=0.01)(plain)
+        ),
+        "context manager": measure(with_context(collector.timer("bench_ctx", "bench"))),
+    }
+    
+    print(f"baseline call: {baseline:.0f}ns")
+    for name, cost in results.items():
+        print(f"{name}: {cost - baseline:.0f}ns overhead per call")
+    assert results["decorator (1% sampled)"] < results["decorator"]
@@ -0,0 +1,479 @@
+"""Tests for the Orchestrator and its agent pools."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+import asyncio
+import json
+import pickle
+import time
+
+from core.components import SmartResponseBuilder
+from core.interfaces import Intent, Task
+from core.monitoring import MetricsCollector
+from core.orchestrator import DEPENDENCY_RESULTS, AgentPool, AgentRegistry, Orchestrator
+from core.retry import RetryBudget
+from core.task_executor import TaskExecutor
+
+class CountingAgent:
+    """Agent that counts its instances and can be told to go unhealthy."""
+    instances = 0
+    init_delay = 0.0
+    
+    def __init__(self):
+        type(self).instances += 1
+        self.healthy = True
+        self.closed = False
+        self.executions = 0
+    
+    async def initialize(self):
+        await asyncio.sleep(self.init_delay)
+    
+    def health_check(self):
+        return self.healthy
+    
+    async def close(self):
+        self.closed = True
+    
+    async def validate(self, task):
+        return True
+    
+    async def execute(self, task):
+        self.executions += 1
+        if task.parameters.get("fail"):
+            self.healthy = False
+            raise RuntimeError("agent broke")
+        await asyncio.sleep(task.parameters.get("delay", 0))
+        return {"action": task.action, "status": "completed", "result": id(self)}
+
+@pytest.fixture
+def agent_cls():
+    return type("PooledAgent", (CountingAgent,), {"instances": 0})
+
+def _orchestrator(registry, tasks, nlu_delay=0.0, **kwargs):
+    async def parse(query):
+        await asyncio.sleep(nlu_delay)
+        return Intent(name="test", confidence=1.0, parameters={})
+    
+    nlu = Mock()
+    nlu.parse = AsyncMock(side_effect=parse)
+    planner = Mock()
+    planner.plan = AsyncMock(return_value=tasks)
+    planner.validate_dependencies = AsyncMock(return_value=True)
+    return Orchestrator(nlu, planner, SmartResponseBuilder(), registry, **kwargs)
+
+class TestAgentPool:
+    @pytest.mark.asyncio
+    async def test_instances_are_reused_across_queries(self, agent_cls):
+        registry = AgentRegistry()
+        registry.register("work", agent_cls)
+        orchestrator = _orchestrator(registry, [Task(action="work", parameters={})])
+        
+        for _ in range(5):
+            await orchestrator.process_query("do work")
+        
+        assert agent_cls.instances == 1
+        assert registry.get_pool("work").idle == 1
+    
+    @pytest.mark.asyncio
+    async def test_max_size_caps_instances(self, agent_cls):
+        pool = AgentPool(agent_cls, max_size=2)
+        task = Task(action="work", parameters={"delay": 0.05})
+        
+        async def run():
+            async with pool.checkout() as agent:
+                return await agent.execute(task)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*[run() for _ in range(4)])
+        
+        assert agent_cls.instances == 2
+        assert pool.size == 2
+        assert time.perf_counter() - start >= 0.1  # Two rounds of two
+    
+    @pytest.mark.asyncio
+    async def test_unhealthy_instances_are_replaced(self, agent_cls):
+        pool = AgentPool(agent_cls, max_size=1)
+        
+        with pytest.raises(RuntimeError):
+            async with pool.checkout() as agent:
+                await agent.execute(Task(action="work", parameters={"fail": True}))
+        
+        assert agent.closed
+        assert pool.size == 0
+        
+        async with pool.checkout() as replacement:
+            assert replacement is not agent
+        
+        # Idle instances are checked again on checkout
+        replacement.healthy = False
+        async with pool.checkout() as third:
+            assert third is not replacement
+        assert replacement.closed
+        assert agent_cls.instances == 3
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_and_idle_reaping(self, agent_cls):
+        registry = AgentRegistry(min_instances=2, idle_timeout=60.0)
+        registry.register("work", agent_cls, max_instances=4)
+        await registry.start()
+        pool = registry.get_pool("work")
+        assert pool.size == pool.idle == 2
+        
+        agents = [await pool.acquire() for _ in range(4)]
+        for agent in agents:
+            await pool.release(agent)
+        assert pool.size == 4
+        
+        assert await pool.reap_idle() == 0
+        assert await pool.reap_idle(now=time.monotonic() + 61) == 2
+        assert pool.size == 2
+        assert sum(agent.closed for agent in agents) == 2
+        
+        await registry.close()
+        assert pool.size == 0
+        assert all(agent.closed for agent in agents)
+    
+    def test_invalid_sizes(self, agent_cls):
+        with pytest.raises(ValueError):
+            AgentPool(agent_cls, min_size=3, max_size=2)
+        with pytest.raises(KeyError):
+            AgentRegistry().get_pool("missing")
+
+class RecordingAgent:
+    """Agent that logs when each task starts and finishes."""
+    log = []
+    
+    async def validate(self, task):
+        return True
+    
+    async def execute(self, task):
+        self.log.append(("start", task.action, time.perf_counter()))
+        await asyncio.sleep(task.parameters.get("delay", 0.01))
+        self.log.append(("end", task.action, time.perf_counter()))
+        upstream = task.parameters.get(DEPENDENCY_RESULTS, {})
+        return {
+            "action": task.action,
+            "status": "completed",
+            "result": task.action,
+            "depth": 1 + max((r["depth"] for r in upstream.values()), default=0),
+            "upstream": upstream
+        }
+
+def _graph_orchestrator(tasks):
+    RecordingAgent.log = []
+    registry = AgentRegistry()
+    for task in tasks:
+        registry.register(task.action, RecordingAgent)
+    return _orchestrator(registry, tasks)
+
+def _times(event):
+    return {action: at for kind, action, at in RecordingAgent.log if kind == event}
+
+class TestDependencyGraph:
+    @pytest.mark.asyncio
+    async def test_deep_chain_runs_in_order(self):
+        tasks = [
+            Task(action="d", parameters={}, dependencies=["c"]),
+            Task(action="c", parameters={}, dependencies=["b"]),
+            Task(action="b", parameters={}, dependencies=["a"]),
+            Task(action="a", parameters={}),
+        ]
+        orchestrator = _graph_orchestrator(tasks)
+        
+        results = await orchestrator._execute_tasks(tasks)
+        
+        assert [r["action"] for r in results] == ["d", "c", "b", "a"]
+        assert [r["depth"] for r in results] == [4, 3, 2, 1]
+        starts, ends = _times("start"), _times("end")
+        assert ends["a"] <= starts["b"] and ends["b"] <= starts["c"] and ends["c"] <= starts["d"]
+    
+    @pytest.mark.asyncio
+    async def test_tasks_start_when_own_dependencies_finish(self):
+        tasks = [
+            Task(action="fast", parameters={"delay": 0.01}),
+            Task(action="slow", parameters={"delay": 0.2}),
+            Task(action="after_fast", parameters={"delay": 0.01}, dependencies=["fast"]),
+        ]
+        orchestrator = _graph_orchestrator(tasks)
+        
+        await orchestrator._execute_tasks(tasks)
+        
+        assert _times("end")["after_fast"] < _times("end")["slow"]
+    
+    @pytest.mark.asyncio
+    async def test_dependency_results_are_plain_copies(self):
+        tasks = [
+            Task(action="fetch", parameters={}),
+            Task(action="summarize", parameters={"style": "short"}, dependencies=["fetch"]),
+        ]
+        orchestrator = _graph_orchestrator(tasks)
+        
+        fetched, summary = await orchestrator._execute_tasks(tasks)
+        
+        upstream = summary["upstream"]["fetch"]
+        assert type(upstream) is dict
+        assert upstream["result"] == "fetch"
+        fetched["result"] = "updated"
+        assert upstream["result"] == "fetch"  # A copy, not a view
+        assert tasks[1].parameters == {"style": "short"}
+        
+        # Tasks handed downstream can cross a process boundary
+        downstream = orchestrator._with_dependency_results(tasks[1], [0], tasks, {0: fetched})
+        assert pickle.loads(pickle.dumps(downstream)).parameters == downstream.parameters
+        json.dumps(downstream.parameters)
+    
+    @pytest.mark.asyncio
+    async def test_cycles_produce_error_response(self):
+        tasks = [
+            Task(action="a", parameters={}, dependencies=["b"]),
+            Task(action="b", parameters={}, dependencies=["a"]),
+        ]
+        orchestrator = _graph_orchestrator(tasks)
+        
+        response = await orchestrator.process_query("loop")
+        
+        assert "Circular dependency" in response
+        assert RecordingAgent.log == []
+
+class TestQueryPipeline:
+    @pytest.mark.asyncio
+    async def test_saturated_queue_sheds_immediately(self, agent_cls):
+        registry = AgentRegistry()
+        registry.register("work", agent_cls)
+        metrics = MetricsCollector()
+        orchestrator = _orchestrator(
+            registry,
+            [Task(action="work", parameters={})],
+            nlu_delay=0.1,
+            metrics=metrics,
+            max_concurrent_queries=1,
+            max_queued_queries=1
+        )
+        
+        running = asyncio.create_task(orchestrator.process_query("first"))
+        queued = asyncio.create_task(orchestrator.process_query("second"))
+        await asyncio.sleep(0.01)
+        assert (orchestrator.in_flight, orchestrator.queued) == (1, 1)
+        
+        start = time.perf_counter()
+        rejected = await orchestrator.process_query("third")
+        assert time.perf_counter() - start < 0.01
+        assert "Too many queries" in rejected
+        
+        for response in await asyncio.gather(running, queued):
+            assert "Too many queries" not in response
+        assert (orchestrator.in_flight, orchestrator.queued) == (0, 0)
+        assert metrics.aggregator.get_statistics("queries_shed")["sum"] == 1
+        nlu = metrics.aggregator.get_statistics("query_stage_duration_seconds", {"stage": "nlu"})
+        assert nlu["count"] == 2 and nlu["min"] >= 0.1
+    
+    @pytest.mark.asyncio
+    async def test_queue_timeout_sheds_stale_queries(self, agent_cls):
+        registry = AgentRegistry()
+        registry.register("work", agent_cls)
+        orchestrator = _orchestrator(
+            registry,
+            [Task(action="work", parameters={})],
+            nlu_delay=0.2,
+            max_concurrent_queries=1,
+            queue_timeout=0.05
+        )
+        
+        first, second = await asyncio.gather(
+            orchestrator.process_query("first"),
+            orchestrator.process_query("second")
+        )
+        
+        assert "Too many queries" not in first
+        assert "waited over 0.05 seconds" in second
+        assert orchestrator.queued == 0
+    
+    @pytest.mark.asyncio
+    async def test_stage_limits(self, agent_cls):
+        registry = AgentRegistry()
+        registry.register("work", agent_cls)
+        orchestrator = _orchestrator(
+            registry,
+            [Task(action="work", parameters={})],
+            stage_limits={"nlu": 2}
+        )
+        active = peak = 0
+        
+        async def parse(query):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return Intent(name="test", confidence=1.0, parameters={})
+        
+        orchestrator.nlu.parse.side_effect = parse
+        await asyncio.gather(*[orchestrator.process_query(f"q{i}") for i in range(6)])
+        
+        assert peak == 2
+        # Execution has no limit here, so the pool grew to meet demand
+        assert registry.get_pool("work").size <= 2
+
+class FlakyAgent:
+    """Agent whose first ``failures`` calls raise ``ConnectionError``."""
+    failures = 0
+    calls = 0
+    
+    async def validate(self, task):
+        return True
+    
+    async def execute(self, task):
+        type(self).calls += 1
+        if type(self).calls <= self.failures:
+            raise ConnectionError("dependency unavailable")
+        await asyncio.sleep(task.parameters.get("delay", 0))
+        return {"action": task.action, "status": "completed", "result": "done"}
+
+def _flaky_orchestrator(failures, executor, **kwargs):
+    agent_cls = type("Flaky", (FlakyAgent,), {"failures": failures, "calls": 0})
+    registry = AgentRegistry()
+    registry.register("work", agent_cls)
+    orchestrator = _orchestrator(
+        registry,
+        [Task(action="work", parameters=kwargs.pop("parameters", {}))],
+        task_executor=executor,
+        **kwargs
+    )
+    return orchestrator, agent_cls
+
+class TestQueryRetries:
+    @pytest.mark.asyncio
+    async def test_failed_tasks_are_retried_with_backoff(self):
+        budget = RetryBudget()
+        executor = TaskExecutor(retry_delay=0.01, retry_budget=budget)
+        orchestrator, agent_cls = _flaky_orchestrator(2, executor)
+        
+        response = await orchestrator.process_query("do work")
+        
+        assert "done" in response
+        assert agent_cls.calls == 3
+        assert budget.requests == 1 and budget.retries == 2
+    
+    @pytest.mark.asyncio
+    async def test_retry_budget_stops_retry_storms(self):
+        budget = RetryBudget(ratio=0.0, min_retries_per_second=0.0)
+        executor = TaskExecutor(retry_delay=0.01, retry_budget=budget)
+        orchestrator, agent_cls = _flaky_orchestrator(1, executor)
+        
+        response = await orchestrator.process_query("do work")
+        
+        assert "dependency unavailable" in response
+        assert agent_cls.calls == 1
+    
+    @pytest.mark.asyncio
+    async def test_query_deadline_bounds_tasks(self):
+        executor = TaskExecutor(retry_delay=0.01, retry_budget=RetryBudget())
+        orchestrator, agent_cls = _flaky_orchestrator(
+            0, executor, query_timeout=0.1, parameters={"delay": 1.0}
+        )
+        
+        start = time.perf_counter()
+        response = await orchestrator.process_query("do work")
+        
+        assert time.perf_counter() - start < 0.5
+        assert "timed out" in response
+        assert agent_cls.calls == 1
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_query_pipeline_overload_benchmark():
+    """Sustained overload against a backend that slows down as load rises."""
+    active = 0
+    slo = 0.25
+    
+    class ContendedAgent:
+        async def validate(self, task):
+            return True
+        
+        async def execute(self, task):
+            nonlocal active
+            active += 1
+            try:
+                # Calls slow down faster than concurrency grows, like a
+                # browser farm that starts swapping
+                await asyncio.sleep(0.0002 * active ** 1.5)
+            finally:
+                active -= 1
+            return {"action": task.action, "status": "completed", "result": "done"}
+    
+    async def overload(**kwargs):
+        registry = AgentRegistry(max_instances=10000)
+        registry.register("work", ContendedAgent)
+        orchestrator = _orchestrator(registry, [Task(action="work", parameters={})], **kwargs)
+        latencies = []
+        
+        async def query():
+            start = time.perf_counter()
+            response = await orchestrator.process_query("work")
+            if "Too many queries" not in response:
+                latencies.append(time.perf_counter() - start)
+        
+        # About 3000 queries/s for half a second, well over capacity
+        start = time.perf_counter()
+        queries = []
+        for _ in range(50):
+            queries += [asyncio.create_task(query()) for _ in range(30)]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*queries)
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        goodput = sum(latency <= slo for latency in latencies) / elapsed
+        return len(latencies), goodput, latencies[int(len(latencies) * 0.95)]
+    
+    unbounded = await overload(
+        max_concurrent_queries=100000,
+        max_queued_queries=100000,
+        stage_limits={}
+    )
+    bounded = await overload(
+        max_concurrent_queries=16,
+        max_queued_queries=64,
+        stage_limits={"execute": 8}
+    )
+    
+    for name, (served, goodput, p95) in (("unbounded", unbounded), ("pipeline", bounded)):
+        print(
+            f"{name}: served {served}/1500, {goodput:.0f} queries/s within "
+            f"{slo * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms"
+        )
+    assert bounded[2] < unbounded[2]
+    assert bounded[1] > unbounded[1]
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_agent_pool_query_latency_benchmark(agent_cls):
+    """Per-query latency for an agent with a 200ms init cost, pooled and not."""
+    agent_cls.init_delay = 0.2
+    task = Task(action="work", parameters={"delay": 0.005})
+    
+    async def unpooled_query():
+        # Previous behaviour: a fresh agent for every task
+        agent = agent_cls()
+        await agent.initialize()
+        await agent.validate(task)
+        return await agent.execute(task)
+    
+    registry = AgentRegistry(min_instances=1)
+    registry.register("work", agent_cls)
+    orchestrator = _orchestrator(registry, [task])
+    await registry.start()
+    
+    async def timed(query, runs=10):
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await query()
+            latencies.append(time.perf_counter() - start)
+        return sum(latencies) / len(latencies)
+    
+    unpooled = await timed(unpooled_query)
+    pooled = await timed(lambda: orchestrator.process_query("do work"))
+    await registry.close()
+    
+    print(f"per-query latency: unpooled {unpooled * 1000:.0f} ms, pooled {pooled * 1000:.0f} ms")
+    assert pooled < 0.05 < 0.2 <= unpooled
@@ -0,0 +1,107 @@
+"""Tests for retry policies, budgets and deadlines."""
+
+import pytest
+import asyncio
+import random
+import time
+
+from core.retry import (
+    NO_RETRY,
+    RetryBudget,
+    RetryPolicy,
+    current_deadline,
+    deadline_scope,
+    policy_for,
+    time_remaining
+)
+
+def test_decorrelated_jitter_delays():
+    """Test jittered delays stay within their growing bounds."""
+    policy = RetryPolicy(base_delay=0.1, max_delay=2.0)
+    rng = random.Random(1)
+    delay = None
+    delays = []
+    for _ in range(50):
+        upper = max(0.1, (delay or 0.1) * 3)
+        delay = policy.next_delay(delay, rng)
+        assert 0.1 <= delay <= min(2.0, upper)
+        delays.append(delay)
+    
+    assert max(delays) == pytest.approx(2.0)
+    
+    # Clients failing together spread their first retries out
+    first = {policy.next_delay(None, random.Random(seed)) for seed in range(5)}
+    assert len(first) == 5
+
+def test_fixed_and_exponential_delays():
+    """Test delays without jitter."""
+    exponential = RetryPolicy(base_delay=0.5, multiplier=2.0, max_delay=3.0, jitter=False)
+    delays = []
+    delay = None
+    for _ in range(5):
+        delay = exponential.next_delay(delay)
+        delays.append(delay)
+    assert delays == [0.5, 1.0, 2.0, 3.0, 3.0]
+    
+    fixed = RetryPolicy(base_delay=1.0, multiplier=1.0, jitter=False)
+    assert fixed.next_delay(fixed.next_delay()) == 1.0
+
+def test_policy_limits():
+    """Test attempt and elapsed-time limits."""
+    policy = RetryPolicy(max_attempts=3, max_elapsed=10.0)
+    assert policy.allows(attempts=1, elapsed=0.0, delay=1.0)
+    assert not policy.allows(attempts=3, elapsed=0.0, delay=1.0)
+    assert not policy.allows(attempts=1, elapsed=9.5, delay=1.0)
+    assert not NO_RETRY.allows(attempts=1, elapsed=0.0, delay=0.0)
+
+def test_policy_for_uses_most_specific_class():
+    """Test policies are looked up along the exception's class hierarchy."""
+    slow = RetryPolicy(base_delay=5.0)
+    policies = {Exception: RetryPolicy(), ConnectionError: slow, ValueError: NO_RETRY}
+    assert policy_for(ConnectionResetError(), policies) is slow
+    assert policy_for(ValueError(), policies) is NO_RETRY
+    assert policy_for(RuntimeError(), policies) is policies[Exception]
+    assert policy_for(KeyboardInterrupt(), policies) is None
+
+def test_retry_budget_caps_retries():
+    """Test retries are capped at a fraction of recent requests."""
+    budget = RetryBudget(ratio=0.1, min_retries_per_second=0.5, window=2.0)
+    for _ in range(100):
+        budget.record_request()
+    
+    granted = sum(budget.try_acquire() for _ in range(100))
+    assert granted == 11
+    assert budget.requests == 100
+    assert budget.retries == 11
+
+def test_retry_budget_window_slides(monkeypatch):
+    """Test old requests and retries leave the window."""
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0.0, window=3.0)
+    
+    for _ in range(10):
+        budget.record_request()
+    assert sum(budget.try_acquire() for _ in range(10)) == 5
+    
+    clock[0] += 5
+    assert budget.requests == 0 and budget.retries == 0
+    assert not budget.try_acquire()
+
+async def test_deadline_scope_propagates_to_tasks():
+    """Test deadlines nest, only tighten and reach child tasks."""
+    assert current_deadline() is None
+    assert time_remaining() is None
+    
+    with deadline_scope(10.0) as outer:
+        with deadline_scope(60.0) as inner:
+            assert inner == outer
+        with deadline_scope(1.0) as inner:
+            assert inner < outer
+            child = await asyncio.create_task(asyncio.sleep(0, current_deadline()))
+            assert child == inner
+            assert 0 < time_remaining() <= 1.0
+            assert time_remaining(time.monotonic() + 0.5) <= 0.5
+        assert current_deadline() == outer
+    
+    assert current_deadline() is None
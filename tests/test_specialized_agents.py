@@ -2,7 +2,7 @@
 
 import pytest
 import asyncio
-import psutil
+from dataclasses import replace
 from datetime import timedelta
 from typing import Dict, Any
 
@@ -11,6 +11,7 @@ from agents.resource_agent import ResourceAgent, ResourceThresholds
 from agents.coordinator_agent import CoordinatorAgent, TaskStatus
 from core.monitoring import MetricsCollector
 from core.error_handling import ErrorHandler
+from core.system_sampler import SystemSampler
 
 @pytest.fixture
 async def metrics_collector():
@@ -80,6 +81,20 @@ async def test_memory_consolidation(memory_agent):
     long_term_data = await memory_agent.retrieve_memory(key, long_term=True)
     assert long_term_data == test_data
 
+async def test_consolidated_memories_keep_tags(memory_agent):
+    """Test tag invalidation reaches memories promoted to long-term."""
+    await memory_agent.store_memory("tagged_key", {"topic": "a"}, tags=["session"])
+    await memory_agent.store_memory("other_key", {"topic": "b"})
+    for _ in range(6):
+        await memory_agent.retrieve_memory("tagged_key")
+        await memory_agent.retrieve_memory("other_key")
+    
+    await memory_agent.consolidate_memories()
+    await memory_agent.invalidate_memories("session")
+    
+    assert await memory_agent.retrieve_memory("tagged_key", long_term=True) is None
+    assert await memory_agent.retrieve_memory("other_key", long_term=True) == {"topic": "b"}
+
 async def test_memory_search(memory_agent):
     """Test memory search functionality."""
     await memory_agent.store_memory("key1", {"content": "apple"})
@@ -105,11 +120,9 @@ async def test_resource_monitoring(resource_agent):
 
 async def test_resource_thresholds(resource_agent, monkeypatch):
     """Test resource threshold detection."""
-    # Mock high CPU usage
-    def mock_cpu_percent(*args, **kwargs):
-        return 95.0
-    
-    monkeypatch.setattr(psutil, "cpu_percent", mock_cpu_percent)
+    # Mock high CPU usage in the sampler snapshot
+    snapshot = replace(resource_agent.sampler.snapshot, cpu_percent=95.0)
+    monkeypatch.setattr(SystemSampler, "snapshot", property(lambda self: snapshot))
     
     # Trigger resource check
     await resource_agent._check_resources()
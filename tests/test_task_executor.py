@@ -4,8 +4,15 @@ import pytest
 from unittest.mock import AsyncMock, Mock
 from datetime import datetime, timedelta
 import asyncio
+import os
+import threading
+import time
 
+from core.error_handling import ErrorHandler, RecoveryStrategy
+from core.execution_lanes import ExecutionLane, LanePools
 from core.interfaces import Task
+from core.monitoring import MetricsCollector
+from core.retry import RetryBudget, RetryPolicy, deadline_scope
 from core.task_executor import TaskExecutor, TaskStatus, TaskResult
 
 @pytest.fixture
@@ -14,6 +21,25 @@ def mock_agent():
     agent.execute = AsyncMock()
     return agent
 
+def _count_primes(task):
+    """CPU-bound work for the process lane."""
+    limit = task.parameters["limit"]
+    count = sum(all(n % d for d in range(2, int(n ** 0.5) + 1)) for n in range(2, limit))
+    return {"status": "success", "primes": count, "pid": os.getpid()}
+
+class PrimeAgent:
+    """Picklable CPU-bound agent."""
+    execution_lane = ExecutionLane.PROCESS
+    execute_sync = staticmethod(_count_primes)
+
+class BlockingAgent:
+    """Agent making a blocking call."""
+    execution_lane = ExecutionLane.THREAD
+    
+    def execute_sync(self, task):
+        time.sleep(task.parameters["seconds"])
+        return {"status": "success", "thread": threading.current_thread().name}
+
 @pytest.fixture
 def task_executor():
     return TaskExecutor(
@@ -133,3 +159,365 @@ class TestTaskExecutor:
         assert all(r.status == TaskStatus.COMPLETED for r in results)
         # With max_concurrent_tasks=2, it should take at least 2 rounds
         assert duration >= 0.2  # Two rounds of 0.1 seconds each
+    
+    @pytest.mark.asyncio
+    async def test_dependents_start_when_their_dependencies_finish(self, task_executor):
+        # "fast" -> "after_fast" should not wait for the unrelated "slow" task
+        finished = {}
+        delays = {"slow": 0.3, "fast": 0.05, "after_fast": 0.05}
+        
+        async def execute(task):
+            await asyncio.sleep(delays[task.action])
+            finished[task.action] = asyncio.get_running_loop().time()
+            return {"status": "success"}
+        
+        agent = Mock()
+        agent.execute = AsyncMock(side_effect=execute)
+        tasks = [
+            Task(action="slow", parameters={}),
+            Task(action="fast", parameters={}),
+            Task(action="after_fast", parameters={}, dependencies=["fast"])
+        ]
+        
+        results = await task_executor.execute_tasks(tasks, {t.action: agent for t in tasks})
+        
+        assert [r.task.action for r in results] == ["slow", "fast", "after_fast"]
+        assert all(r.status == TaskStatus.COMPLETED for r in results)
+        assert finished["after_fast"] < finished["slow"]
+    
+    @pytest.mark.asyncio
+    async def test_execute_tasks_stream_yields_in_completion_order(self, task_executor):
+        delays = {"slow": 0.3, "fast": 0.01, "after_fast": 0.01}
+        
+        async def execute(task):
+            await asyncio.sleep(delays[task.action])
+            return {"status": "success"}
+        
+        agent = Mock()
+        agent.execute = AsyncMock(side_effect=execute)
+        tasks = [
+            Task(action="slow", parameters={}),
+            Task(action="fast", parameters={}),
+            Task(action="after_fast", parameters={}, dependencies=["fast"])
+        ]
+        
+        start = time.perf_counter()
+        first_result_at = None
+        order = []
+        async for result in task_executor.execute_tasks_stream(tasks, {t.action: agent for t in tasks}):
+            first_result_at = first_result_at or time.perf_counter() - start
+            order.append(result.task.action)
+        
+        assert order == ["fast", "after_fast", "slow"]
+        assert first_result_at < 0.15
+    
+    @pytest.mark.asyncio
+    async def test_closing_the_stream_cancels_running_tasks(self, task_executor):
+        cancelled = []
+        
+        async def execute(task):
+            try:
+                await asyncio.sleep(0 if task.action == "quick" else 5)
+            except asyncio.CancelledError:
+                cancelled.append(task.action)
+                raise
+            return {"status": "success"}
+        
+        agent = Mock()
+        agent.execute = AsyncMock(side_effect=execute)
+        tasks = [Task(action="quick", parameters={}), Task(action="stuck", parameters={})]
+        
+        stream = task_executor.execute_tasks_stream(tasks, {t.action: agent for t in tasks})
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        
+        assert first.task.action == "quick"
+        assert cancelled == ["stuck"]
+    
+    @pytest.mark.asyncio
+    async def test_ready_tasks_run_by_priority(self, mock_agent):
+        executor = TaskExecutor(max_concurrent_tasks=1)
+        order = []
+        
+        async def execute(task):
+            order.append(task.action)
+            return {"status": "success"}
+        
+        mock_agent.execute.side_effect = execute
+        tasks = [
+            Task(action="low", parameters={}, priority=0),
+            Task(action="high", parameters={}, priority=5),
+            Task(action="medium", parameters={}, priority=2),
+            Task(action="urgent_child", parameters={}, dependencies=["high"], priority=9)
+        ]
+        
+        await executor.execute_tasks(tasks, {t.action: mock_agent for t in tasks})
+        
+        assert order == ["high", "urgent_child", "medium", "low"]
+    
+    @pytest.mark.asyncio
+    async def test_invalid_dependency_graphs_are_rejected(self, task_executor, mock_agent):
+        cycle = [
+            Task(action="a", parameters={}, dependencies=["c"]),
+            Task(action="b", parameters={}, dependencies=["a"]),
+            Task(action="c", parameters={}, dependencies=["b"]),
+            Task(action="d", parameters={})
+        ]
+        with pytest.raises(ValueError, match="Circular dependency.*a, b, c"):
+            await task_executor.execute_tasks(cycle, {t.action: mock_agent for t in cycle})
+        
+        missing = [Task(action="a", parameters={}, dependencies=["unknown"])]
+        with pytest.raises(ValueError, match="Missing dependency"):
+            await task_executor.execute_tasks(missing, {"a": mock_agent})
+        
+        mock_agent.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_timeouts_lower_the_agent_limit(self):
+        metrics = MetricsCollector()
+        executor = TaskExecutor(max_retries=0, timeout=0.05, max_concurrent_tasks=4, metrics=metrics)
+        
+        class SlowAgent:
+            async def execute(self, task):
+                await asyncio.sleep(1)
+        
+        class FastAgent:
+            async def execute(self, task):
+                await asyncio.sleep(0.01)
+                return {"status": "success"}
+        
+        slow, fast = SlowAgent(), FastAgent()
+        tasks = [Task(action=f"slow{i}", parameters={}, priority=1) for i in range(6)]
+        tasks += [Task(action=f"fast{i}", parameters={}) for i in range(6)]
+        agents = {t.action: slow if t.action.startswith("slow") else fast for t in tasks}
+        
+        results = await executor.execute_tasks(tasks, agents)
+        
+        assert all(r.status == TaskStatus.FAILED for r in results[:6])
+        assert all(r.status == TaskStatus.COMPLETED for r in results[6:])
+        assert executor.limiters["SlowAgent"].limit < 4
+        assert executor.limiters["FastAgent"].limit == 4
+        
+        limits = metrics.get_metrics_by_label("agent", "SlowAgent")
+        assert limits['task_concurrency_limit{agent="SlowAgent"}']["value"] == executor.limiters["SlowAgent"].limit
+        assert limits['task_queue_depth{agent="SlowAgent"}']["value"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retries_follow_error_class_policies(self, mock_agent, sample_task):
+        executor = TaskExecutor(
+            retry_policies={
+                ConnectionError: RetryPolicy(max_attempts=4, base_delay=0.01, multiplier=2.0, jitter=False)
+            },
+            retry_budget=RetryBudget()
+        )
+        
+        mock_agent.execute.side_effect = ValueError("bad parameters")
+        result = await executor.execute_task(sample_task, mock_agent)
+        assert result.status == TaskStatus.FAILED
+        assert result.attempts == 1
+        
+        mock_agent.execute.side_effect = ConnectionError("unreachable")
+        start = time.perf_counter()
+        result = await executor.execute_task(sample_task, mock_agent)
+        assert result.attempts == 4
+        assert time.perf_counter() - start >= 0.01 + 0.02 + 0.04
+    
+    @pytest.mark.asyncio
+    async def test_error_handler_backoff_policy_applies(self, mock_agent, sample_task):
+        error_handler = ErrorHandler(metrics_collector=MetricsCollector())
+        error_handler.retry_policies[RecoveryStrategy.BACKOFF] = RetryPolicy(
+            max_attempts=2,
+            base_delay=0.01
+        )
+        executor = TaskExecutor(max_retries=5, timeout=0.05, error_handler=error_handler)
+        
+        async def hang(task):
+            await asyncio.sleep(1)
+        
+        mock_agent.execute.side_effect = hang
+        result = await executor.execute_task(sample_task, mock_agent)
+        
+        assert isinstance(result.error, TimeoutError)
+        assert result.attempts == 2
+    
+    @pytest.mark.asyncio
+    async def test_no_retry_past_the_callers_deadline(self, mock_agent, sample_task):
+        executor = TaskExecutor(max_retries=5, retry_delay=0.2, retry_budget=RetryBudget())
+        mock_agent.execute.side_effect = Exception("down")
+        
+        with deadline_scope(0.1):
+            result = await executor.execute_task(sample_task, mock_agent)
+        assert result.status == TaskStatus.FAILED
+        assert result.attempts == 1
+        
+        # Attempts are also cut off at the deadline
+        async def slow(task):
+            await asyncio.sleep(1)
+        
+        mock_agent.execute.side_effect = slow
+        start = time.perf_counter()
+        result = await executor.execute_task(sample_task, mock_agent, deadline=time.monotonic() + 0.1)
+        assert isinstance(result.error, TimeoutError)
+        assert time.perf_counter() - start < 0.5
+    
+    @pytest.mark.asyncio
+    async def test_retry_budget_stops_retry_storms(self, mock_agent):
+        metrics = MetricsCollector()
+        budget = RetryBudget(ratio=0.1, min_retries_per_second=0.0)
+        executor = TaskExecutor(
+            max_retries=3,
+            retry_delay=0.001,
+            max_concurrent_tasks=20,
+            metrics=metrics,
+            retry_budget=budget
+        )
+        mock_agent.execute.side_effect = ConnectionError("outage")
+        tasks = [Task(action=f"task{i}", parameters={}) for i in range(20)]
+        
+        results = await executor.execute_tasks(tasks, {t.action: mock_agent for t in tasks})
+        
+        assert all(r.status == TaskStatus.FAILED for r in results)
+        assert sum(r.attempts for r in results) == 22
+        assert metrics.aggregator.get_statistics("task_retries_rejected")["sum"] == 20
+    
+    @pytest.mark.asyncio
+    async def test_thread_lane_keeps_loop_responsive(self):
+        executor = TaskExecutor(max_concurrent_tasks=4)
+        tasks = [Task(action=f"block{i}", parameters={"seconds": 0.2}) for i in range(3)]
+        
+        start = time.perf_counter()
+        ticker = asyncio.create_task(asyncio.sleep(0.05))
+        results = await executor.execute_tasks(tasks, {t.action: BlockingAgent() for t in tasks})
+        
+        assert ticker.done()
+        assert time.perf_counter() - start < 0.5  # Ran side by side, not serially
+        assert all(r.result["thread"].startswith("arcana-thread-lane") for r in results)
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_process_lane_runs_in_worker_processes(self):
+        executor = TaskExecutor(max_concurrent_tasks=4, lanes=LanePools(process_workers=2))
+        await executor.warm_up()
+        task = Task(action="primes", parameters={"limit": 1000})
+        
+        result = await executor.execute_task(task, PrimeAgent())
+        
+        assert result.status == TaskStatus.COMPLETED
+        assert result.result["primes"] == 168
+        assert result.result["pid"] != os.getpid()
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_task_lane_overrides_agent_lane(self):
+        executor = TaskExecutor(max_concurrent_tasks=2, lanes=LanePools(process_workers=1))
+        task = Task(action="primes", parameters={"limit": 100}, lane="thread")
+        
+        assert LanePools.lane_for(task, PrimeAgent()) == ExecutionLane.THREAD
+        result = await executor.execute_task(task, PrimeAgent())
+        
+        assert result.result == {"status": "success", "primes": 25, "pid": os.getpid()}
+        assert LanePools.lane_for(Task(action="x", parameters={}), Mock()) == ExecutionLane.ASYNC
+        executor.shutdown()
+
+def _random_dag(rng, size, max_parents=3):
+    """Random DAG where each task depends on up to ``max_parents`` earlier tasks."""
+    tasks = []
+    for i in range(size):
+        parents = rng.sample(range(i), min(i, rng.randint(0, max_parents)))
+        tasks.append(Task(
+            action=f"task{i}",
+            parameters={},
+            dependencies=[f"task{p}" for p in parents] or None
+        ))
+    return tasks
+
+async def _run_by_levels(executor, tasks, agents):
+    """Previous level-by-level strategy, kept as the benchmark baseline."""
+    done = set()
+    remaining = list(tasks)
+    while remaining:
+        level = [t for t in remaining if all(d in done for d in t.dependencies or ())]
+        await asyncio.gather(*[executor.execute_task(t, agents[t.action]) for t in level])
+        done.update(t.action for t in level)
+        remaining = [t for t in remaining if t.action not in done]
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_dag_scheduler_makespan_benchmark():
+    """Compare makespan against level-by-level execution on skewed DAGs."""
+    import random
+    rng = random.Random(7)
+    
+    speedups = []
+    for _ in range(5):
+        tasks = _random_dag(rng, 40)
+        # Heavy-tailed latencies: most tasks are quick, a few are stragglers
+        delays = {t.action: min(rng.paretovariate(1.5) * 0.005, 0.2) for t in tasks}
+        
+        async def execute(task):
+            await asyncio.sleep(delays[task.action])
+            return {"status": "success"}
+        
+        agent = Mock()
+        agent.execute = AsyncMock(side_effect=execute)
+        agents = {t.action: agent for t in tasks}
+        executor = TaskExecutor(max_concurrent_tasks=8)
+        
+        start = time.perf_counter()
+        await _run_by_levels(executor, tasks, agents)
+        levels = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        results = await executor.execute_tasks(tasks, agents)
+        scheduled = time.perf_counter() - start
+        
+        assert all(r.status == TaskStatus.COMPLETED for r in results)
+        speedups.append(levels / scheduled)
+        print(f"levels {levels * 1000:.0f} ms, ready queue {scheduled * 1000:.0f} ms")
+    
+    print(f"mean makespan speedup {sum(speedups) / len(speedups):.2f}x")
+    assert sum(speedups) / len(speedups) > 1.0
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_process_lane_mixed_workload_benchmark():
+    """I/O-bound tasks alongside CPU-bound ones, with and without the process lane."""
+    workers = min(4, os.cpu_count() or 1)
+    
+    async def fetch(task):
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        return {"status": "success", "latency": time.perf_counter() - started}
+    
+    io_agent = Mock()
+    io_agent.execute = AsyncMock(side_effect=fetch)
+    
+    class InlinePrimeAgent:
+        async def execute(self, task):
+            return _count_primes(task)
+    
+    tasks = [Task(action=f"io{i}", parameters={}) for i in range(40)]
+    tasks += [Task(action=f"cpu{i}", parameters={"limit": 30000}) for i in range(workers * 2)]
+    
+    async def run(cpu_agent):
+        agents = {t.action: io_agent if t.action.startswith("io") else cpu_agent for t in tasks}
+        executor = TaskExecutor(
+            max_concurrent_tasks=len(tasks),
+            lanes=LanePools(process_workers=workers)
+        )
+        await executor.warm_up()
+        start = time.perf_counter()
+        results = await executor.execute_tasks(tasks, agents)
+        makespan = time.perf_counter() - start
+        executor.shutdown()
+        assert all(r.status == TaskStatus.COMPLETED for r in results)
+        io_latency = max(r.result["latency"] for r in results if "latency" in r.result)
+        return makespan, io_latency
+    
+    inline_makespan, inline_io = await run(InlinePrimeAgent())
+    lane_makespan, lane_io = await run(PrimeAgent())
+    
+    print(f"event loop: makespan {inline_makespan * 1000:.0f} ms, worst I/O {inline_io * 1000:.0f} ms")
+    print(f"process lane: makespan {lane_makespan * 1000:.0f} ms, worst I/O {lane_io * 1000:.0f} ms")
+    assert lane_io < inline_io